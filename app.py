@@ -1,67 +1,143 @@
-from flask import Flask, render_template
+from flask import Flask, Response, abort, jsonify, render_template, request
+from bot.candle_store import CandleStore
+from bot.dashboard import DashboardCache
 from bot.data_fetcher import DataFetcher
-from bot.strategy import MovingAverageCrossoverStrategy
-from bot.backtester import Backtester
+from bot.instrumentation import metrics
+from bot.jobs import BacktestJobs, JobQueue, QueueFullError
+from bot.resample import Resampler
 from bot.sentiment_analyzer import SentimentAnalyzer
-import os
 
 app = Flask(__name__)
+candle_store = CandleStore()
+# Shared across requests so that its cache spares repeated model calls.
+sentiment_analyzer = SentimentAnalyzer()
+# Backtests and plots are computed in the background; requests only read them.
+# Coarser timeframes are built from the stored hourly candles.
+dashboard = DashboardCache(Resampler(DataFetcher(store=candle_store)), sentiment_analyzer=sentiment_analyzer)
+# On-demand backtests and optimizations submitted through the JSON API.
+jobs = JobQueue(BacktestJobs(Resampler(DataFetcher(store=candle_store))).handlers())
+
+# Shown when no parameters are given: the optimized crossover windows.
+DEFAULT_PARAMS = {'strategy': 'ma_crossover', 'short_window': 25, 'long_window': 70}
+# Seconds the first request for a parameter set waits for its backtest.
+FIRST_RESULT_TIMEOUT = 10.0
+
+
+def _parse_number(value):
+    """Parses a query-string strategy parameter as an int or a float."""
+    try:
+        return int(value)
+    except ValueError:
+        return float(value)
+
+
+def _requested_params():
+    """Reads the dashboard parameters from the query string, falling back to the defaults."""
+    params = request.args.to_dict()
+    if 'strategy' not in params:
+        params = {**DEFAULT_PARAMS, **params}
+    for name, value in params.items():
+        if name not in ('symbol', 'timeframe', 'strategy') and isinstance(value, str):
+            try:
+                params[name] = _parse_number(value)
+            except ValueError:
+                abort(400, f"Parameter '{name}' must be a number.")
+    return params
+
+
+def _cache_key(params):
+    """Builds the dashboard cache key, answering 400 for invalid parameters."""
+    try:
+        return dashboard.key(**params)
+    except ValueError as e:
+        abort(400, str(e))
+
 
 @app.route('/')
 def home():
     """
-    Main route that runs the backtest and displays the results.
+    Main route that displays the latest backtest results.
     """
-    # --- Run the backtest ---
-    fetcher = DataFetcher()
-    ohlcv_data = fetcher.fetch_ohlcv(symbol='ETH/USD', timeframe='1d', limit=500)
-
-    if ohlcv_data is None or ohlcv_data.empty:
-        return "Error: Could not fetch data for the backtest.", 500
-
-    # Initialize sentiment analyzer
-    sentiment_analyzer = SentimentAnalyzer()
-
-    # Initialize strategy with the sentiment analyzer and optimal parameters
-    strategy = MovingAverageCrossoverStrategy(
-        short_window=25,
-        long_window=70,
-        sentiment_analyzer=sentiment_analyzer
-    )
-
-    backtester = Backtester(strategy, ohlcv_data, initial_cash=10000, commission=0.002)
-    portfolio = backtester.run(symbol='ETH/USD')
-
-    # --- Prepare results for the template ---
-    final_value = portfolio['total'].iloc[-1]
-    total_return = (final_value / backtester.initial_cash) - 1
-    total_trades = portfolio['trades'].sum()
-
-    results = {
-        'initial_cash': f"${backtester.initial_cash:,.2f}",
-        'final_value': f"${final_value:,.2f}",
-        'total_return': f"{total_return:.2%}",
-        'total_trades': total_trades
-    }
-
-    # --- Generate and save the plot ---
-    # The plot will be saved in the `static` directory for Flask to serve it.
-    if not os.path.exists('static'):
-        os.makedirs('static')
-    plot_path = 'static/portfolio_performance.png'
+    params = _requested_params()
+    entry = dashboard.get(_cache_key(params), timeout=FIRST_RESULT_TIMEOUT)
+
+    if entry is None:
+        # Still being computed (or the data could not be fetched yet)
+        return render_template('index.html', results=None, plot_url=None, pending=True), 503
+
+    plot_url = None
+    if entry['plot'] is not None:
+        plot_url = f"/plot.png?{request.query_string.decode()}" if request.args else '/plot.png'
+    return render_template('index.html', results=entry['results'], plot_url=plot_url, pending=False)
+
+
+@app.route('/plot.png')
+def plot():
+    """
+    Serves the portfolio plot of a parameter set from memory.
+
+    Only entries that a page request already created are served; plots
+    never schedule new backtests.
+    """
+    entry = dashboard.peek(_cache_key(_requested_params()))
+    if entry is None or entry['plot'] is None:
+        abort(404)
+    return Response(entry['plot'], mimetype='image/png',
+                    headers={'Cache-Control': f"max-age={int(dashboard.refresh_interval)}"})
+
 
+def _submit_job(kind):
+    """Submits a job from the JSON request body and answers with its state."""
+    params = request.get_json(silent=True)
+    if params is None:
+        params = {}
+    if not isinstance(params, dict):
+        return jsonify({'error': "The request body must be a JSON object."}), 400
     try:
-        import matplotlib.pyplot as plt
-        plt.figure(figsize=(12, 6))
-        plt.plot(portfolio['total'], label='Portfolio Value')
-        plt.title('Portfolio Value Over Time')
-        plt.legend()
-        plt.savefig(plot_path)
-        plt.close() # Close the plot to free up memory
-    except ImportError:
-        plot_path = None # Or a placeholder image path
-
-    return render_template('index.html', results=results, plot_image=plot_path)
+        job = jobs.submit(kind, params)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except QueueFullError as e:
+        return jsonify({'error': str(e)}), 503
+
+    status_code = 200 if job['status'] == 'done' else 202
+    return jsonify(job), status_code, {'Location': f"/api/jobs/{job['id']}"}
+
+
+@app.route('/api/backtests', methods=['POST'])
+def submit_backtest():
+    """
+    Submits a backtest job. Identical submissions share one job and its cached result.
+    """
+    return _submit_job('backtest')
+
+
+@app.route('/api/optimizations', methods=['POST'])
+def submit_optimization():
+    """
+    Submits a parameter optimization job.
+    """
+    return _submit_job('optimize')
+
+
+@app.route('/api/jobs/<job_id>')
+def job_status(job_id):
+    """
+    Reports a job's status, with its result once done.
+    """
+    job = jobs.status(job_id)
+    if job is None:
+        return jsonify({'error': f"Unknown job '{job_id}'."}), 404
+    return jsonify(job)
+
+
+@app.route('/metrics')
+def prometheus_metrics():
+    """
+    Exposes the bot's stage timings and counters in the Prometheus text format.
+    """
+    return Response(metrics.to_prometheus(), mimetype='text/plain; version=0.0.4')
+
 
 if __name__ == '__main__':
     app.run(debug=True, port=5001)
@@ -0,0 +1,214 @@
+"""
+Benchmarks for the strategy, backtester, optimizer, fetcher and app hot paths.
+
+Every case runs on seeded synthetic OHLCV data (and a fake exchange), so runs
+are reproducible and need no network access. Results are written as JSON and
+can be compared against a stored baseline:
+
+    python benchmarks/bench.py --output bench.json
+    python benchmarks/bench.py --sizes 1k,100k,10m --output baseline.json
+    python benchmarks/bench.py --compare baseline.json --tolerance 1.5
+
+The comparison exits with status 1 if any case got slower (or used more
+memory) than the baseline by more than the tolerance factor.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from bot.backtester import Backtester
+from bot.candle_store import ohlcv_frame
+from bot.data_fetcher import DataFetcher
+from bot.robustness import monte_carlo
+from bot.strategy import MovingAverageCrossoverStrategy
+from bot.sweep import sweep_ma_crossover
+from tests.fake_exchange import FakeExchange
+
+SIZES = {'1k': 1_000, '100k': 100_000, '10m': 10_000_000}
+OPTIMIZER_SHORT_WINDOWS = np.arange(10, 60, 5)
+OPTIMIZER_LONG_WINDOWS = np.arange(50, 250, 10)
+MONTE_CARLO_PATHS = 10_000
+
+
+def synthetic_ohlcv(bars, seed=0):
+    """Generates a seeded random-walk OHLCV DataFrame with minute candles."""
+    rng = np.random.default_rng(seed)
+    close = 2000 * np.exp(np.cumsum(rng.normal(0, 0.001, bars)))
+    spread = close * rng.uniform(0, 0.002, bars)
+    timestamps = 1609459200000 + 60000 * np.arange(bars, dtype=np.int64)
+    return ohlcv_frame(timestamps, {'open': close, 'high': close + spread, 'low': close - spread,
+                                    'close': close, 'volume': rng.uniform(1, 100, bars)})
+
+
+def measure(function, repeat):
+    """Returns the best wall time in seconds and the peak traced memory in MB."""
+    seconds = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        seconds.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        function()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return min(seconds), peak / 1e6
+
+
+def bench_generate_signals(data):
+    strategy = MovingAverageCrossoverStrategy(short_window=25, long_window=70)
+    return lambda: strategy.generate_signals(data)
+
+
+def bench_backtester(data):
+    strategy = MovingAverageCrossoverStrategy(short_window=25, long_window=70)
+    return lambda: Backtester(strategy, data, initial_cash=10000, commission=0.002).run()
+
+
+def bench_optimizer(data):
+    return lambda: sweep_ma_crossover(data, OPTIMIZER_SHORT_WINDOWS, OPTIMIZER_LONG_WINDOWS)
+
+
+def bench_monte_carlo(data):
+    strategy = MovingAverageCrossoverStrategy(short_window=25, long_window=70)
+    return lambda: monte_carlo(data, strategy, n_paths=MONTE_CARLO_PATHS, noise=0.1)
+
+
+def bench_fetch_history(bars):
+    def run():
+        with patch('ccxt.kraken', return_value=FakeExchange(count=bars, page_size=720)):
+            DataFetcher().fetch_history('ETH/USD', '1m', since=1609459200000,
+                                        until=1609459200000 + bars * 60000)
+    return run
+
+
+def bench_app_request(data):
+    import app
+    from bot.dashboard import DashboardCache
+    from bot.sentiment_analyzer import SentimentAnalyzer, StubSentimentBackend
+
+    class SyntheticFetcher:
+        def fetch_ohlcv(self, symbol='ETH/USD', timeframe='1d', since=None, limit=500):
+            return data.iloc[-limit:]
+
+    # Requests are served from the background-refreshed cache, so warm it first.
+    dashboard = DashboardCache(SyntheticFetcher(), SentimentAnalyzer(backend=StubSentimentBackend()))
+    dashboard.get(dashboard.key(**app.DEFAULT_PARAMS), timeout=60)
+    client = app.app.test_client()
+
+    def run():
+        with patch.object(app, 'dashboard', dashboard):
+            for path in ('/', '/plot.png'):
+                response = client.get(path)
+                assert response.status_code == 200, response.status_code
+    return run
+
+
+# name -> (sizes it runs on, factory taking the synthetic data or bar count)
+CASES = {
+    'generate_signals': (('1k', '100k', '10m'), bench_generate_signals),
+    'backtester_run': (('1k', '100k', '10m'), bench_backtester),
+    'optimizer_grid': (('1k', '100k'), bench_optimizer),
+    'monte_carlo': (('1k',), bench_monte_carlo),
+    'fetch_history': (('1k', '100k'), bench_fetch_history),
+    'app_request': (('1k',), bench_app_request),
+}
+
+
+def run_benchmarks(sizes, repeat, cases=None):
+    """
+    Runs the selected cases on the selected data sizes.
+
+    Returns:
+        dict: Results keyed by '<case>/<size>', each with 'seconds' and 'peak_mb'.
+    """
+    results = {}
+    for size in sizes:
+        data = synthetic_ohlcv(SIZES[size])
+        for name, (case_sizes, factory) in CASES.items():
+            if size not in case_sizes or (cases and name not in cases):
+                continue
+            argument = SIZES[size] if name == 'fetch_history' else data
+            seconds, peak_mb = measure(factory(argument), repeat)
+            results[f"{name}/{size}"] = {'seconds': seconds, 'peak_mb': peak_mb}
+            print(f"{name + '/' + size:<24} {seconds * 1000:>10.2f} ms {peak_mb:>10.1f} MB", flush=True)
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """
+    Compares results against a baseline.
+
+    Returns:
+        list: Descriptions of every case that regressed beyond `tolerance`.
+    """
+    regressions = []
+    for key, result in sorted(results.items()):
+        reference = baseline.get(key)
+        if reference is None:
+            continue
+        for metric in ('seconds', 'peak_mb'):
+            ratio = result[metric] / reference[metric] if reference[metric] else 1.0
+            if ratio > tolerance:
+                regressions.append(f"{key} {metric}: {reference[metric]:.4g} -> {result[metric]:.4g} ({ratio:.2f}x)")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the trading bot hot paths.")
+    parser.add_argument('--sizes', default='1k,100k', help="Comma-separated data sizes: 1k, 100k, 10m.")
+    parser.add_argument('--cases', default=None, help="Comma-separated case names (defaults to all).")
+    parser.add_argument('--repeat', type=int, default=3, help="Timed runs per case; the best is kept.")
+    parser.add_argument('--output', default=None, help="Write the results to this JSON file.")
+    parser.add_argument('--compare', default=None, help="Baseline JSON file to compare against.")
+    parser.add_argument('--tolerance', type=float, default=1.5,
+                        help="Slowdown factor beyond which a case counts as a regression.")
+    args = parser.parse_args(argv)
+
+    sizes = args.sizes.split(',')
+    cases = args.cases.split(',') if args.cases else None
+    with tempfile.TemporaryDirectory() as workdir:
+        # The app's candle store lives relative to the working directory.
+        cwd = os.getcwd()
+        os.chdir(workdir)
+        try:
+            results = run_benchmarks(sizes, args.repeat, cases)
+        finally:
+            os.chdir(cwd)
+
+    report = {
+        'meta': {'python': platform.python_version(), 'numpy': np.__version__,
+                 'pandas': pd.__version__, 'machine': platform.machine()},
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)['results']
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print("\nPerformance regressions:")
+            for regression in regressions:
+                print(f"  {regression}")
+            return 1
+        print("\nNo regressions against the baseline.")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,117 @@
+import asyncio
+import time
+
+import ccxt
+import ccxt.async_support as ccxt_async
+
+from .data_fetcher import HistoryPager, now_milliseconds
+from .instrumentation import timed
+
+
+class AsyncDataFetcher:
+    """
+    Downloads candle history for many symbols and timeframes concurrently,
+    using ccxt's async client with one pooled session per exchange.
+    """
+    def __init__(self, exchanges=None, default_exchange='kraken', max_concurrency=4):
+        """
+        Initializes the AsyncDataFetcher.
+
+        Args:
+            exchanges (dict): Exchange clients keyed by name. Clients for other
+                              names are created from ccxt.async_support on first use.
+            default_exchange (str): The exchange used when a request names none.
+            max_concurrency (int): Maximum number of downloads in flight per exchange.
+        """
+        self.exchanges = dict(exchanges or {})
+        self.default_exchange = default_exchange
+        self.max_concurrency = max_concurrency
+        self._owned = set()
+        self._semaphores = {}
+        self._locks = {}
+        self._next_request = {}
+
+    def _client(self, name):
+        if name not in self.exchanges:
+            self.exchanges[name] = getattr(ccxt_async, name)({'enableRateLimit': True})
+            self._owned.add(name)
+        return self.exchanges[name]
+
+    async def _wait_turn(self, name, exchange):
+        """Spaces requests to an exchange by its rateLimit unless ccxt already does."""
+        if getattr(exchange, 'enableRateLimit', False):
+            return
+        lock = self._locks.setdefault(name, asyncio.Lock())
+        async with lock:
+            delay = self._next_request.get(name, 0) - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self._next_request[name] = time.monotonic() + getattr(exchange, 'rateLimit', 0) / 1000
+
+    @timed('async_fetch_history')
+    async def fetch_history(self, symbol, timeframe, since, until=None, page_limit=None, exchange_name=None):
+        """
+        Downloads all candles between `since` and `until`, one page at a time.
+
+        Args:
+            symbol (str): The trading symbol to fetch (e.g., 'ETH/USD').
+            timeframe (str): The timeframe to fetch (e.g., '1m', '5m', '1h', '1d').
+            since (int): The starting timestamp in milliseconds.
+            until (int): The end timestamp in milliseconds, exclusive (defaults to now).
+            page_limit (int): The number of candles requested per page.
+            exchange_name (str): The exchange to use (defaults to `default_exchange`).
+
+        Returns:
+            pandas.DataFrame: A DataFrame with OHLCV data, indexed by timestamp.
+                              Returns None if fetching fails.
+        """
+        name = exchange_name or self.default_exchange
+        exchange = self._client(name)
+        pager = HistoryPager(timeframe, since, until if until is not None else now_milliseconds())
+        semaphore = self._semaphores.setdefault(name, asyncio.Semaphore(self.max_concurrency))
+
+        try:
+            async with semaphore:
+                while not pager.done:
+                    await self._wait_turn(name, exchange)
+                    pager.add_page(await exchange.fetch_ohlcv(symbol, timeframe, pager.cursor, page_limit))
+        except ccxt.NetworkError as e:
+            print(f"Network error while fetching {symbol} {timeframe} history: {e}")
+            return None
+        except ccxt.ExchangeError as e:
+            print(f"Exchange error while fetching {symbol} {timeframe} history: {e}")
+            return None
+        return pager.to_frame()
+
+    async def fetch_many(self, requests, since, until=None, page_limit=None):
+        """
+        Downloads several histories concurrently.
+
+        Args:
+            requests (list): (symbol, timeframe) or (exchange_name, symbol, timeframe) tuples.
+            since (int): The starting timestamp in milliseconds.
+            until (int): The end timestamp in milliseconds, exclusive (defaults to now).
+            page_limit (int): The number of candles requested per page.
+
+        Returns:
+            dict: DataFrames (or None on failure) keyed by the request tuples.
+        """
+        until = until if until is not None else now_milliseconds()
+        requests = [tuple(request) for request in requests]
+        downloads = []
+        for request in requests:
+            exchange_name, symbol, timeframe = request if len(request) == 3 else (None,) + request
+            downloads.append(self.fetch_history(symbol, timeframe, since, until, page_limit, exchange_name))
+        return dict(zip(requests, await asyncio.gather(*downloads)))
+
+    async def close(self):
+        """Closes the sessions of the exchange clients this fetcher created."""
+        for name in self._owned:
+            await self.exchanges[name].close()
+        self._owned.clear()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
@@ -1,23 +1,146 @@
+import numpy as np
 import pandas as pd
 
+from .execution import simulate_execution
+from .instrumentation import timed
+from .performance import portfolio_metrics
+from .signals import BUY, SELL, encode_signals
+from .strategy import create_strategy
+
+
+def positions_from_signals(buy, sell):
+    """
+    Derives the long/flat position held at each bar from buy and sell masks.
+
+    A buy only opens a position when flat and a sell only closes one when
+    long, so the position at any bar is simply whether the most recent
+    non-hold signal was a buy. Works column-wise on 2-D masks.
+
+    Args:
+        buy (np.ndarray): Boolean buy mask of shape (n,) or (n, k).
+        sell (np.ndarray): Boolean sell mask with the same shape as `buy`.
+
+    Returns:
+        np.ndarray: Boolean array of the same shape, True while in a position.
+    """
+    buy = np.asarray(buy, dtype=bool)
+    sell = np.asarray(sell, dtype=bool)
+    # Tag every active bar with an increasing code whose lowest bit says
+    # whether it was a buy; a running maximum then carries the most recent
+    # one forward, and 0 marks bars before the first signal.
+    dtype = np.int32 if len(buy) < 2 ** 29 else np.int64
+    rows = np.arange(2, 2 * len(buy) + 2, 2, dtype=dtype).reshape((-1,) + (1,) * (buy.ndim - 1))
+    codes = np.where(buy | sell, rows + buy, 0)
+    np.maximum.accumulate(codes, axis=0, out=codes)
+    return (codes & 1).astype(bool)
+
+
+def forward_fill(values):
+    """
+    Replaces NaNs by the last finite value before them, column-wise.
+
+    Leading NaNs, before any finite value, are kept.
+
+    Args:
+        values (np.ndarray): Float array of shape (n,) or (n, k).
+
+    Returns:
+        np.ndarray: The filled array (`values` itself when it has no NaNs).
+    """
+    missing = np.isnan(values)
+    if not missing.any():
+        return values
+    rows = np.arange(len(values)).reshape((-1,) + (1,) * (values.ndim - 1))
+    rows = np.where(missing, 0, rows)
+    np.maximum.accumulate(rows, axis=0, out=rows)
+    return np.take_along_axis(values, rows, axis=0)
+
+
+def simulate_long_only(close, position, initial_cash, commission):
+    """
+    Computes the all-in, long-only portfolio path for a precomputed position.
+
+    Entering converts all cash into the asset at the bar's close after
+    commission, and exiting converts the whole position back to cash after
+    commission, exactly as `Backtester._run_loop` does. The total value is
+    therefore the initial cash times a running product of per-bar factors.
+    Missing (NaN) closes are priced at the last finite close, so a gap in
+    the candles does not spread to the rest of the run.
+
+    Args:
+        close (np.ndarray): Close prices of shape (n,), or (n, k) to match `position`.
+        position (np.ndarray): Boolean position array of shape (n,) or (n, k).
+        initial_cash (float or np.ndarray): The starting cash balance, or one per column.
+        commission (float): The commission fee charged on each side of a trade.
+
+    Returns:
+        tuple: (holdings, cash, total, trades) arrays shaped like `position`.
+    """
+    close = forward_fill(np.asarray(close, dtype=float))
+    position = np.asarray(position, dtype=bool)
+    if close.ndim < position.ndim:
+        close = close[:, None]
+
+    previous = np.zeros_like(position)
+    previous[1:] = position[:-1]
+    entries = position & ~previous
+    exits = previous & ~position
+
+    growth = np.ones(close.shape)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        growth[1:] = close[1:] / close[:-1]
+    growth[np.isnan(growth)] = 1.0  # Before the first finite close
+
+    # Held bars (including the exit bar) move with the price; entries and
+    # exits pay commission; flat bars leave the cash untouched.
+    factor = np.where(previous, growth, 1.0)
+    factor = np.where(entries, 1.0 / (1 + commission), factor)
+    factor = np.where(exits, factor * (1 - commission), factor)
+    total = np.asarray(initial_cash, dtype=float) * np.cumprod(factor, axis=0)
+
+    holdings = np.where(position, total, 0.0)
+    cash = np.where(position, 0.0, total)
+    trades = (entries | exits).astype(np.int64)
+    return holdings, cash, total, trades
+
+
 class Backtester:
     """
     A simple backtesting engine for trading strategies.
     """
-    def __init__(self, strategy, data, initial_cash=10000, commission=0.001):
+    ENGINES = ('vectorized', 'loop')
+
+    def __init__(self, strategy, data, initial_cash=10000, commission=0.001, engine='vectorized',
+                 execution=None):
         """
         Initializes the Backtester.
 
         Args:
-            strategy: An instance of a trading strategy class.
-            data (pd.DataFrame): A DataFrame containing OHLCV data.
+            strategy: A Strategy instance (see bot.strategy), or the registry name of
+                      one to create with its default parameters. May be None
+                      when precomputed signals are passed to `run`.
+            data (pd.DataFrame or ColumnarData): OHLCV data. A ColumnarData (for example
+                memory-mapped from a CandleStore) avoids materializing unused columns.
             initial_cash (float): The starting cash balance.
             commission (float): The trading commission fee per trade (e.g., 0.001 for 0.1%).
+            engine (str): 'vectorized' computes the whole portfolio with NumPy arrays,
+                          'loop' walks the bars one by one (kept as a reference).
+            execution (ExecutionModel): How orders are filled (see bot.execution). By default
+                          trades fill at the signal bar's close paying only `commission`;
+                          a model's fees replace `commission`. Needs the vectorized engine.
         """
+        if engine not in self.ENGINES:
+            raise ValueError(f"engine must be one of {self.ENGINES}")
+        if execution is not None and engine != 'vectorized':
+            raise ValueError("execution models need the vectorized engine")
+        if isinstance(strategy, str):
+            strategy = create_strategy(strategy)
         self.strategy = strategy
         self.data = data
         self.initial_cash = initial_cash
         self.commission = commission
+        self.engine = engine
+        self.execution = execution
         self.portfolio = None # Will be created in run()
 
     def _create_initial_portfolio(self, index):
@@ -29,14 +152,65 @@ class Backtester:
         portfolio['trades'] = 0  # Number of trades made
         return portfolio
 
-    def run(self, symbol='ETH/USD'):
-        """Runs the backtest."""
-        self.signals = self.strategy.generate_signals(self.data, symbol)
+    @timed('backtest')
+    def run(self, symbol='ETH/USD', signals=None):
+        """
+        Runs the backtest.
+
+        Args:
+            symbol (str): The symbol passed to the strategy.
+            signals (array-like, optional): Precomputed signal codes (BUY, SELL, HOLD)
+                aligned with the data. When given, the strategy is skipped.
+
+        Returns:
+            pd.DataFrame: The portfolio with holdings, cash, total and trades columns.
+        """
+        if signals is None:
+            self.signals = self.strategy.generate_signals(self.data, symbol)
+        else:
+            signals = encode_signals(signals)
+            if len(signals) != len(self.data):
+                raise ValueError("signals must have one entry per bar of data")
+            if isinstance(self.data, pd.DataFrame):
+                self.signals = pd.DataFrame({'close': self.data['close'], 'signal': signals})
+            else:
+                self.signals = self.data.with_columns(signal=signals)
+        if self.engine == 'loop':
+            self.portfolio = self._run_loop()
+        else:
+            self.portfolio = self._run_vectorized()
+        return self.portfolio
+
+    def _run_vectorized(self):
+        """Runs the backtest with array operations, building the portfolio once."""
+        signal = encode_signals(self.signals['signal'])
+        position = positions_from_signals(signal == BUY, signal == SELL)
+        if self.execution is None:
+            holdings, cash, total, trades = simulate_long_only(
+                self.signals['close'], position, self.initial_cash, self.commission
+            )
+        else:
+            open_prices, volume = self.execution.inputs(self.data)
+            holdings, cash, total, trades = simulate_execution(
+                self.signals['close'], position, self.initial_cash, self.execution, open_prices, volume
+            )
+        return pd.DataFrame(
+            {'holdings': holdings, 'cash': cash, 'total': total, 'trades': trades},
+            index=self.signals.index,
+        )
+
+    def _run_loop(self):
+        """Runs the backtest bar by bar."""
+        if not isinstance(self.signals, pd.DataFrame):
+            self.signals = self.signals.to_frame()
         self.portfolio = self._create_initial_portfolio(self.signals.index)
+        codes = encode_signals(self.signals['signal'])
+        # Bars without a close are priced at the last known one
+        closes = forward_fill(self.signals['close'].to_numpy(dtype=float))
         position_shares = 0.0
 
         for i in range(len(self.signals)):
-            close_price = self.signals.loc[self.signals.index[i], 'close']
+            close_price = closes[i]
 
             # First, carry over cash from the previous period
             if i > 0:
@@ -45,9 +219,9 @@ class Backtester:
             # Update holdings value based on current price
             self.portfolio.loc[self.signals.index[i], 'holdings'] = position_shares * close_price
 
-            signal = self.signals.loc[self.signals.index[i], 'signal']
+            signal = codes[i]
 
-            if signal == 'buy' and position_shares == 0:
+            if signal == BUY and position_shares == 0:
                 # Buy signal and not in a position
                 cash_to_use = self.portfolio.loc[self.signals.index[i], 'cash']
                 shares_to_buy = cash_to_use / (close_price * (1 + self.commission))
@@ -57,7 +231,7 @@ class Backtester:
                 self.portfolio.loc[self.signals.index[i], 'holdings'] = position_shares * close_price
                 self.portfolio.loc[self.signals.index[i], 'trades'] = 1
 
-            elif signal == 'sell' and position_shares > 0:
+            elif signal == SELL and position_shares > 0:
                 # Sell signal and in a position
                 proceeds = position_shares * close_price * (1 - self.commission)
 
@@ -71,56 +245,49 @@ class Backtester:
 
         return self.portfolio
 
+    def performance(self, periods_per_year=None):
+        """
+        Computes the performance metrics of the last run.
+
+        Args:
+            periods_per_year (float): Bars per year, used to annualize
+                                      (estimated from the data's timestamps by default).
+
+        Returns:
+            dict: The metrics returned by `bot.performance.performance_metrics`.
+        """
+        return portfolio_metrics(self.portfolio, self.initial_cash, periods_per_year)
+
     def print_performance(self):
         """Prints a summary of the backtest performance."""
         final_portfolio_value = self.portfolio['total'].iloc[-1]
         total_return = (final_portfolio_value / self.initial_cash) - 1
         total_trades = self.portfolio['trades'].sum()
+        stats = self.performance()
 
         print("Backtest Performance Summary:")
         print("-----------------------------")
         print(f"Initial Portfolio Value: ${self.initial_cash:,.2f}")
         print(f"Final Portfolio Value:   ${final_portfolio_value:,.2f}")
         print(f"Total Return:            {total_return:.2%}")
+        print(f"CAGR:                    {stats['cagr']:.2%}")
+        print(f"Sharpe Ratio:            {stats['sharpe']:.2f}")
+        print(f"Sortino Ratio:           {stats['sortino']:.2f}")
+        print(f"Max Drawdown:            {stats['max_drawdown']:.2%}")
+        print(f"Max Drawdown Duration:   {stats['max_drawdown_duration']} bars")
+        print(f"Exposure:                {stats['exposure']:.2%}")
+        print(f"Win Rate:                {stats['win_rate']:.2%}")
+        print(f"Turnover (per year):     {stats['turnover']:.2f}x")
         print(f"Total Trades:            {total_trades}")
         print("-----------------------------")
 
 
 if __name__ == '__main__':
-    from data_fetcher import DataFetcher
-    from strategy import MovingAverageCrossoverStrategy
-
-    # 1. Fetch data
-    print("Fetching data...")
-    fetcher = DataFetcher()
-    # Let's get more data for a meaningful backtest
-    ohlcv_data = fetcher.fetch_ohlcv(symbol='ETH/USD', timeframe='1d', limit=500)
-
-    if ohlcv_data is not None and not ohlcv_data.empty:
-        # 2. Initialize strategy
-        # Using optimal parameters
-        strategy = MovingAverageCrossoverStrategy(short_window=25, long_window=70)
-
-        # 3. Run backtest
-        print("Running backtest with optimized parameters...")
-        backtester = Backtester(strategy, ohlcv_data, initial_cash=10000, commission=0.002)
-        portfolio = backtester.run(symbol='ETH/USD')
-
-        # 4. Print performance
-        backtester.print_performance()
-
-        # 5. (Optional) Plot results
-        try:
-            import matplotlib.pyplot as plt
-            plt.figure(figsize=(12, 6))
-            plt.plot(portfolio['total'], label='Portfolio Value')
-            plt.title('Portfolio Value Over Time')
-            plt.legend()
-            plot_path = 'portfolio_performance.png'
-            plt.savefig(plot_path)
-            print(f"\nPortfolio performance plot saved to {plot_path}")
-        except ImportError:
-            print("\nMatplotlib not found. Skipping plot generation.")
-
-    else:
-        print("Could not fetch data for backtest.")
+    import sys
+
+    from .cli import main
+
+    # The former demo: the optimized crossover on the last 500 days of ETH/USD.
+    # The package imports are relative, so run it as `python -m bot.backtester`.
+    sys.exit(main(['backtest', '--param', 'short_window=25', '--param', 'long_window=70',
+                   '--days', '500', '--plot', 'portfolio_performance.png'] + sys.argv[1:]))
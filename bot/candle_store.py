@@ -0,0 +1,239 @@
+import contextlib
+import json
+import os
+import threading
+import time
+import uuid
+
+import numpy as np
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:  # Windows: writers are only serialized within the process
+    fcntl = None
+
+OHLCV_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+# Seconds files of a replaced generation are kept for readers that already read its manifest.
+STALE_GENERATION_SECONDS = 60.0
+
+
+def to_milliseconds(index):
+    """Converts a DatetimeIndex to int64 milliseconds since the epoch."""
+    return np.asarray(index.values.astype('datetime64[ms]').astype(np.int64))
+
+
+def ohlcv_frame(timestamps, columns):
+    """
+    Builds the OHLCV DataFrame layout used throughout the bot.
+
+    Args:
+        timestamps (np.ndarray): Candle open times in milliseconds since the epoch.
+        columns (dict): Arrays for 'open', 'high', 'low', 'close' and 'volume'.
+
+    Returns:
+        pd.DataFrame: A DataFrame indexed by timestamp.
+    """
+    index = pd.DatetimeIndex(pd.to_datetime(np.asarray(timestamps), unit='ms'), name='timestamp')
+    return pd.DataFrame({name: columns[name] for name in OHLCV_COLUMNS}, index=index)
+
+
+def merge_candles(old, new):
+    """
+    Combines two OHLCV DataFrames, letting `new` win on duplicate timestamps.
+
+    Returns:
+        pd.DataFrame: The combined candles, sorted by timestamp.
+    """
+    if old is None or old.empty:
+        return new[OHLCV_COLUMNS]
+    data = pd.concat([old[OHLCV_COLUMNS], new[OHLCV_COLUMNS]])
+    return data[~data.index.duplicated(keep='last')].sort_index()
+
+
+class CandleStore:
+    """
+    A persistent, columnar OHLCV store keyed by (exchange, symbol, timeframe).
+
+    Every column is kept in its own `.npy` file so it can be memory-mapped on
+    load. Writes go to a new, uniquely named generation of files and are
+    published by atomically replacing a small manifest, so readers never see
+    a half-written series. Writers of the same series are serialized by a
+    lock file, and replaced generations are only deleted once they are older
+    than `STALE_GENERATION_SECONDS`, so a reader that picked up the previous
+    manifest can still open its files.
+    """
+    # Per-directory locks serializing the writers of this process.
+    _thread_locks = {}
+    _thread_locks_guard = threading.Lock()
+
+    def __init__(self, root='data/candles', stale_seconds=STALE_GENERATION_SECONDS):
+        """
+        Initializes the CandleStore.
+
+        Args:
+            root (str): The directory under which candles are stored.
+            stale_seconds (float): How long files of a replaced generation are kept.
+        """
+        self.root = root
+        self.stale_seconds = stale_seconds
+
+    def _directory(self, exchange, symbol, timeframe):
+        return os.path.join(self.root, exchange, symbol.replace('/', '-'), timeframe)
+
+    @contextlib.contextmanager
+    def _locked(self, directory):
+        """Holds the write lock of one series, across threads and, where supported, processes."""
+        os.makedirs(directory, exist_ok=True)
+        with self._thread_locks_guard:
+            lock = self._thread_locks.setdefault(os.path.abspath(directory), threading.Lock())
+        with lock:
+            if fcntl is None:
+                yield
+                return
+            with open(os.path.join(directory, '.lock'), 'a') as f:
+                fcntl.flock(f, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _manifest(self, directory):
+        try:
+            with open(os.path.join(directory, 'manifest.json')) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def load_columns(self, exchange, symbol, timeframe, columns=None, mmap=True):
+        """
+        Loads raw column arrays without building a DataFrame.
+
+        Args:
+            exchange (str): The exchange name.
+            symbol (str): The trading symbol (e.g., 'ETH/USD').
+            timeframe (str): The candle timeframe (e.g., '1d').
+            columns (list): Columns to load besides 'timestamp' (defaults to all).
+            mmap (bool): Memory-map the files instead of reading them into memory.
+
+        Returns:
+            dict: Arrays keyed by column name, or None if nothing is stored.
+        """
+        directory = self._directory(exchange, symbol, timeframe)
+        manifest = self._manifest(directory)
+        while manifest is not None:
+            names = ['timestamp'] + list(columns if columns is not None else manifest['columns'])
+            generation = manifest['generation']
+            try:
+                return {
+                    name: np.load(os.path.join(directory, f"{name}.{generation}.npy"),
+                                  mmap_mode='r' if mmap else None)
+                    for name in names
+                }
+            except FileNotFoundError:
+                # Only a generation that has since been replaced may disappear; retry with the new one
+                latest = self._manifest(directory)
+                if latest is None or latest['generation'] == generation:
+                    raise
+                manifest = latest
+        return None
+
+    def load(self, exchange, symbol, timeframe):
+        """
+        Loads the stored candles.
+
+        Returns:
+            pd.DataFrame: A DataFrame indexed by timestamp, or None if nothing is stored.
+        """
+        columns = self.load_columns(exchange, symbol, timeframe, OHLCV_COLUMNS)
+        if columns is None:
+            return None
+        return ohlcv_frame(columns['timestamp'], columns)
+
+    def load_series(self, exchange, symbol, key, column):
+        """
+        Loads one stored column as a Series, e.g. a sentiment series kept
+        next to a symbol's candles under its own key.
+
+        Returns:
+            pd.Series: The column indexed by timestamp, or None if nothing is stored.
+        """
+        columns = self.load_columns(exchange, symbol, key, [column], mmap=False)
+        if columns is None:
+            return None
+        index = pd.DatetimeIndex(pd.to_datetime(columns['timestamp'], unit='ms'), name='timestamp')
+        return pd.Series(columns[column], index=index, name=column)
+
+    def last_timestamp(self, exchange, symbol, timeframe):
+        """Returns the newest stored candle time in milliseconds, or None."""
+        columns = self.load_columns(exchange, symbol, timeframe, [])
+        if columns is None or len(columns['timestamp']) == 0:
+            return None
+        return int(columns['timestamp'][-1])
+
+    def write(self, exchange, symbol, timeframe, data, dtype=None):
+        """
+        Replaces the stored candles with `data`.
+
+        Args:
+            exchange (str): The exchange name.
+            symbol (str): The trading symbol (e.g., 'ETH/USD').
+            timeframe (str): The candle timeframe (e.g., '1d').
+            data (pd.DataFrame): OHLCV data indexed by timestamp.
+            dtype: Optional dtype for the stored columns (e.g., np.float32 to halve their size).
+        """
+        directory = self._directory(exchange, symbol, timeframe)
+        with self._locked(directory):
+            self._write(directory, data, dtype)
+
+    def _write(self, directory, data, dtype):
+        """Publishes a new generation of a series; the caller holds its lock."""
+        previous = self._manifest(directory)
+        generation = uuid.uuid4().hex
+
+        arrays = {'timestamp': to_milliseconds(data.index)}
+        for name in data.columns:
+            arrays[name] = data[name].to_numpy(dtype=dtype)
+        for name, array in arrays.items():
+            np.save(os.path.join(directory, f"{name}.{generation}.npy"), array)
+
+        manifest_path = os.path.join(directory, 'manifest.json')
+        with open(manifest_path + '.tmp', 'w') as f:
+            json.dump({'generation': generation, 'columns': list(data.columns)}, f)
+        os.replace(manifest_path + '.tmp', manifest_path)
+
+        # Date the replaced generation's files to now, then remove the files of generations
+        # replaced long enough ago that every reader that found them has opened them.
+        if previous is not None:
+            for name in ['timestamp'] + previous['columns']:
+                with contextlib.suppress(FileNotFoundError):
+                    os.utime(os.path.join(directory, f"{name}.{previous['generation']}.npy"))
+        expired = time.time() - self.stale_seconds
+        for filename in os.listdir(directory):
+            parts = filename.split('.')
+            if len(parts) == 3 and parts[2] == 'npy' and parts[1] != generation:
+                path = os.path.join(directory, filename)
+                with contextlib.suppress(FileNotFoundError):
+                    if os.path.getmtime(path) < expired:
+                        os.remove(path)
+
+    def merge(self, exchange, symbol, timeframe, data, dtype=None):
+        """
+        Merges new candles into the stored ones and saves the result.
+
+        Candles with a timestamp that is already stored replace the old ones,
+        so a refreshed, previously incomplete candle overwrites its old values.
+        Stored candles that cannot be read any more are replaced by `data`.
+
+        Returns:
+            pd.DataFrame: The merged candles.
+        """
+        directory = self._directory(exchange, symbol, timeframe)
+        with self._locked(directory):
+            try:
+                stored = self.load(exchange, symbol, timeframe)
+            except (OSError, ValueError, KeyError):
+                stored = None
+            data = merge_candles(stored, data)
+            self._write(directory, data, dtype)
+        return data
@@ -0,0 +1,328 @@
+"""
+The command line interface, run as `python -m bot <command>`:
+
+    python -m bot fetch --symbol ETH/USD --timeframe 1h --days 90
+    python -m bot backtest --strategy rsi --param window=10 --plot rsi.png
+    python -m bot optimize --strategy ma_crossover --rank-by sharpe
+
+Heavy dependencies load only on the paths that need them: ccxt when a
+DataFetcher is created and matplotlib when a plot is rendered.
+"""
+import argparse
+
+import numpy as np
+
+from .backtester import Backtester
+from .candle_store import CandleStore
+from .data_fetcher import DataFetcher, now_milliseconds, timeframe_milliseconds
+from .execution import ExecutionModel
+from .indicator_cache import IndicatorCache
+from .performance import SWEEP_METRICS, bars_per_year, rank_results
+from .resample import Resampler
+from .result_store import ResultStore, resumable_sweep
+from .search import successive_halving
+from .strategy import STRATEGIES, create_strategy
+from .sweep import parameter_grid, parallel_sweep, sweep_strategy
+
+
+def report_progress(done, total):
+    """Prints how much of the parameter grid has been evaluated."""
+    print(f"Evaluated {done}/{total} parameter combinations ({done / total:.0%})", flush=True)
+
+
+def fetch_recent(fetcher, symbol='ETH/USD', timeframe='1d', days=1000):
+    """
+    Pages through the last `days` days of candles.
+
+    A single request is capped below 1000 candles on Kraken, so the history
+    is fetched page by page.
+
+    Returns:
+        pd.DataFrame: The candles, or None if fetching failed.
+    """
+    return fetcher.fetch_history(symbol=symbol, timeframe=timeframe,
+                                 since=now_milliseconds() - days * timeframe_milliseconds('1d'))
+
+
+def run_optimization(workers=None, strategy='ma_crossover', rank_by='return', execution=None,
+                     search='grid', budget=None, seed=0, store=None, fetcher=None,
+                     symbol='ETH/USD', timeframe='1d', days=1000):
+    """
+    Runs a parameter optimization for a registered strategy.
+
+    Args:
+        workers (int): Number of worker processes (defaults to the CPU count).
+                       Only the moving average crossover grid runs in parallel.
+        strategy (str): The registry name of the strategy to optimize.
+        rank_by (str): The column to rank the results by: 'return' or one of
+                       the performance metrics (e.g., 'sharpe', 'max_drawdown').
+        execution (ExecutionModel): How orders are filled (by default at the
+                       signal bar's close with a 0.2% commission).
+        search (str): 'grid' backtests every parameter combination, 'halving'
+                       runs successive halving on growing data prefixes.
+        budget (float): The cost limit of the halving search in full backtests.
+        seed (int): Seeds the halving search.
+        store (ResultStore): Keeps grid results on disk (optional). Stored
+                       results are not recomputed, so an interrupted grid
+                       sweep resumes where it stopped.
+        fetcher (DataFetcher): Where the candles come from (defaults to Kraken
+                       through the candle store in data/candles, with coarser
+                       timeframes built from hourly candles).
+        symbol (str): The trading symbol to optimize on.
+        timeframe (str): The candle timeframe.
+        days (int): How many days of history to optimize on.
+
+    Returns:
+        pd.DataFrame: The best results, or None if the data could not be fetched
+                      or no parameter set produced a result.
+    """
+    # 1. Fetch data
+    print("Fetching historical data for optimization...")
+    fetcher = fetcher if fetcher is not None else Resampler(DataFetcher(store=CandleStore()))
+    data = fetch_recent(fetcher, symbol, timeframe, days)
+
+    if data is None or data.empty:
+        print("Could not fetch data. Aborting optimization.")
+        return None
+
+    # 2. Define parameter ranges
+    param_grid = STRATEGIES[strategy].PARAM_GRID
+    periods_per_year = bars_per_year(data.index)
+
+    if search == 'halving':
+        print(f"Starting successive halving over {list(param_grid)} with a budget of {budget} backtests...")
+        cache = IndicatorCache()
+        trials = successive_halving(data, strategy, param_grid, budget=budget, seed=seed, metric=rank_by,
+                                    initial_cash=10000, commission=0.002, cache=cache,
+                                    periods_per_year=periods_per_year, execution=execution)
+        print(f"Ran {len(trials)} backtests costing {(trials['bars'] / len(data)).sum():.1f} full backtests")
+        results_df = trials[trials['bars'] == len(data)].drop(columns=['rung', 'bars'])
+    elif store is not None:
+        print(f"Starting optimization of {strategy} over {list(param_grid)}, storing results in {store.path}...")
+
+        # 3. Backtest the parameter sets that are not stored yet, checkpointing as it goes
+        key, config, ran = resumable_sweep(store, data, strategy, param_grid, initial_cash=10000, commission=0.002,
+                                           periods_per_year=periods_per_year, execution=execution,
+                                           progress=report_progress)
+        print(f"Ran {ran} new backtests")
+        results_df = store.top(rank_by, 5, data=key, strategy=strategy, config=config)
+        results_df = results_df.drop(columns=['strategy', 'config', 'data'], errors='ignore')
+    elif strategy == 'ma_crossover':
+        short_windows = np.array(param_grid['short_window']) # 10, 15, ..., 55
+        long_windows = np.array(param_grid['long_window']) # 50, 60, ..., 240
+
+        # Generate all valid combinations of windows
+        valid_combinations = parameter_grid(short_windows, long_windows)
+
+        print(f"Starting optimization for {len(valid_combinations)} parameter combinations...")
+
+        # 3. Backtest the grid, spread across worker processes
+        results_df = parallel_sweep(data, short_windows, long_windows, initial_cash=10000, commission=0.002,
+                                    workers=workers, progress=report_progress,
+                                    performance=True, periods_per_year=periods_per_year,
+                                    execution=execution)
+    else:
+        print(f"Starting optimization of {strategy} over {list(param_grid)}...")
+
+        # 3. Backtest the grid, sharing indicators between parameter sets
+        cache = IndicatorCache()
+        results_df = sweep_strategy(data, strategy, param_grid, initial_cash=10000, commission=0.002, cache=cache,
+                                    performance=True, periods_per_year=periods_per_year,
+                                    execution=execution)
+        print(f"Computed {cache.misses} indicators for {len(results_df)} parameter sets "
+              f"({cache.hits} served from the cache)")
+
+    # 4. Analyze results
+    if results_df.empty:
+        print("No results from optimization.")
+        return None
+
+    print("\n\n--- Optimization Complete ---")
+    print(f"Top 5 Best Performing Parameter Combinations by {rank_by}:")
+    top_5 = rank_results(results_df, rank_by, top=5)
+    print(top_5)
+    return top_5
+
+
+def print_stored_results(store, strategy=None, rank_by='return', n=5):
+    """Prints the best stored results without running any backtest."""
+    results = store.top(rank_by, n, strategy=strategy)
+    if results.empty:
+        print(f"No stored results in {store.path}.")
+        return
+    print(f"Top {n} stored results by {rank_by}:")
+    print(results.drop(columns=['data']))
+
+
+def parse_params(items):
+    """Turns `name=value` strings into strategy keyword arguments, parsing numbers."""
+    params = {}
+    for item in items:
+        name, separator, value = item.partition('=')
+        if not separator:
+            raise ValueError(f"Expected name=value, got '{item}'")
+        for convert in (int, float):
+            try:
+                value = convert(value)
+                break
+            except ValueError:
+                pass
+        params[name] = value
+    return params
+
+
+def execution_from_args(args, taker_fee):
+    """Builds the ExecutionModel requested on the command line, or None for close fills."""
+    if args.next_open or args.slippage_bps or args.spread_bps or args.volume_cap:
+        return ExecutionModel(fill='next_open' if args.next_open else 'close',
+                              slippage_bps=args.slippage_bps, spread_bps=args.spread_bps,
+                              taker_fee=taker_fee, max_volume_fraction=args.volume_cap)
+    return None
+
+
+def run_fetch(args):
+    """Downloads candles into the candle store."""
+    fetcher = DataFetcher(args.exchange, store=CandleStore(args.candles))
+    data = fetch_recent(fetcher, args.symbol, args.timeframe, args.days)
+    if data is None or data.empty:
+        print("Could not fetch data.")
+        return 1
+    print(f"Stored {len(data)} {args.timeframe} candles of {args.symbol} "
+          f"from {data.index[0]} to {data.index[-1]} in {args.candles}")
+    return 0
+
+
+def run_backtest(args):
+    """Backtests one strategy, prints its performance and optionally plots it."""
+    try:
+        strategy = create_strategy(args.strategy, **parse_params(args.param))
+    except (TypeError, ValueError) as e:
+        print(f"Invalid strategy parameters: {e}")
+        return 2
+    fetcher = Resampler(DataFetcher(args.exchange, store=CandleStore(args.candles)))
+
+    print("Fetching data...")
+    data = fetch_recent(fetcher, args.symbol, args.timeframe, args.days)
+    if data is None or data.empty:
+        print("Could not fetch data for backtest.")
+        return 1
+
+    print(f"Running backtest of {args.strategy} {strategy.params}...")
+    backtester = Backtester(strategy, data, initial_cash=args.cash, commission=args.commission,
+                            execution=execution_from_args(args, args.commission))
+    portfolio = backtester.run(symbol=args.symbol)
+    backtester.print_performance()
+
+    if args.plot:
+        from .dashboard import render_equity_plot
+
+        image = render_equity_plot(portfolio)
+        if image is None:
+            print("\nMatplotlib not found. Skipping plot generation.")
+        else:
+            with open(args.plot, 'wb') as f:
+                f.write(image)
+            print(f"\nPortfolio performance plot saved to {args.plot}")
+    return 0
+
+
+def run_optimize(args):
+    """Optimizes a strategy, or prints the best stored results."""
+    store = ResultStore(args.store) if args.store else None
+    if args.show_top is not None:
+        if store is None:
+            print("--show-top needs --store")
+            return 2
+        print_stored_results(store, args.strategy, args.rank_by, args.show_top)
+        return 0
+    fetcher = Resampler(DataFetcher(args.exchange, store=CandleStore(args.candles)))
+    top = run_optimization(workers=args.workers, strategy=args.strategy, rank_by=args.rank_by,
+                           execution=execution_from_args(args, 0.002), search=args.search, budget=args.budget,
+                           seed=args.seed, store=store, fetcher=fetcher,
+                           symbol=args.symbol, timeframe=args.timeframe, days=args.days)
+    return 0 if top is not None else 1
+
+
+def add_data_arguments(parser, days):
+    """Adds the options choosing the candles a command runs on."""
+    parser.add_argument('--symbol', default='ETH/USD', help="The trading symbol (defaults to ETH/USD).")
+    parser.add_argument('--timeframe', default='1d', help="The candle timeframe (defaults to 1d).")
+    parser.add_argument('--days', type=int, default=days, help=f"Days of history (defaults to {days}).")
+    parser.add_argument('--exchange', default='kraken', help="The ccxt exchange (defaults to kraken).")
+    parser.add_argument('--candles', default='data/candles', help="The candle store directory.")
+
+
+def add_execution_arguments(parser):
+    """Adds the options describing how orders are filled."""
+    parser.add_argument('--next-open', action='store_true',
+                        help="Fill signals at the next bar's open instead of the signal bar's close.")
+    parser.add_argument('--slippage-bps', type=float, default=0.0,
+                        help="Slippage of each fill in basis points.")
+    parser.add_argument('--spread-bps', type=float, default=0.0,
+                        help="The bid/ask spread in basis points; each fill pays half of it.")
+    parser.add_argument('--volume-cap', type=float, default=None,
+                        help="The largest fraction of a bar's volume a fill may take (e.g., 0.1).")
+
+
+def add_optimize_arguments(parser):
+    """Adds the options of the optimize command."""
+    parser.add_argument('--strategy', choices=sorted(STRATEGIES), default='ma_crossover',
+                        help="The strategy to optimize (defaults to ma_crossover).")
+    parser.add_argument('--rank-by', choices=('return',) + SWEEP_METRICS, default='return',
+                        help="The metric to rank the parameter combinations by (defaults to return).")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Number of worker processes (defaults to the CPU count).")
+    parser.add_argument('--search', choices=('grid', 'halving'), default='grid',
+                        help="Backtest the whole grid, or search it with successive halving.")
+    parser.add_argument('--budget', type=float, default=None,
+                        help="The halving search's cost limit in full backtests (defaults to no limit).")
+    parser.add_argument('--seed', type=int, default=0, help="Seeds the halving search.")
+    parser.add_argument('--store', default=None,
+                        help="An SQLite file keeping grid results, e.g. data/results.sqlite; "
+                             "stored results are skipped, so interrupted sweeps resume.")
+    parser.add_argument('--show-top', type=int, default=None, metavar='N',
+                        help="Only print the N best results of --store, without backtesting.")
+    add_execution_arguments(parser)
+
+
+def build_parser():
+    """Builds the argument parser of `python -m bot`."""
+    parser = argparse.ArgumentParser(prog='python -m bot', description="Fetch candles, backtest and optimize.")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    fetch = commands.add_parser('fetch', help="Download candles into the candle store.")
+    add_data_arguments(fetch, days=1000)
+    fetch.set_defaults(run=run_fetch)
+
+    backtest = commands.add_parser('backtest', help="Backtest one strategy and print its performance.")
+    backtest.add_argument('--strategy', choices=sorted(STRATEGIES), default='ma_crossover',
+                          help="The strategy to backtest (defaults to ma_crossover).")
+    backtest.add_argument('--param', action='append', default=[], metavar='NAME=VALUE',
+                          help="A strategy parameter, e.g. --param short_window=25 (repeatable).")
+    backtest.add_argument('--cash', type=float, default=10000, help="The starting cash balance.")
+    backtest.add_argument('--commission', type=float, default=0.002, help="The commission per trade.")
+    backtest.add_argument('--plot', default=None, metavar='PATH',
+                          help="Save the portfolio value over time as a PNG (needs matplotlib).")
+    add_data_arguments(backtest, days=500)
+    add_execution_arguments(backtest)
+    backtest.set_defaults(run=run_backtest)
+
+    optimize = commands.add_parser('optimize', help="Optimize the parameters of a trading strategy.")
+    add_optimize_arguments(optimize)
+    add_data_arguments(optimize, days=1000)
+    optimize.set_defaults(run=run_optimize)
+    return parser
+
+
+def main(argv=None):
+    """
+    Runs a command of `python -m bot`.
+
+    Args:
+        argv (list): The command line arguments (defaults to sys.argv[1:]).
+
+    Returns:
+        int: The exit status.
+    """
+    args = build_parser().parse_args(argv)
+    return args.run(args)
@@ -0,0 +1,256 @@
+import io
+import threading
+import time
+from collections import OrderedDict
+
+from .backtester import Backtester
+from .indicator_cache import IndicatorCache
+from .instrumentation import timed
+from .strategy import check_params, create_strategy
+
+# The symbols and timeframes the dashboard serves unless configured otherwise.
+DEFAULT_SYMBOLS = ('ETH/USD', 'BTC/USD')
+DEFAULT_TIMEFRAMES = ('1h', '4h', '1d')
+
+
+@timed('render_plot')
+def render_equity_plot(portfolio):
+    """
+    Renders the portfolio value over time as PNG bytes.
+
+    Uses a standalone Figure instead of pyplot's global state, so plots can
+    be rendered from a background thread while requests are served.
+
+    Args:
+        portfolio (pd.DataFrame): A portfolio as returned by `Backtester.run`.
+
+    Returns:
+        bytes: The PNG image, or None if matplotlib is not installed.
+    """
+    try:
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+    except ImportError:
+        return None
+
+    figure = Figure(figsize=(12, 6))
+    FigureCanvasAgg(figure)
+    axes = figure.add_subplot()
+    axes.plot(portfolio['total'], label='Portfolio Value')
+    axes.set_title('Portfolio Value Over Time')
+    axes.legend()
+    buffer = io.BytesIO()
+    figure.savefig(buffer, format='png')
+    return buffer.getvalue()
+
+
+class DashboardCache:
+    """
+    Keeps precomputed dashboard backtests, one per parameter set, and
+    refreshes them from a background thread when new candles arrive.
+
+    Requests only read the latest entry, so serving a page never waits on
+    the exchange, the backtest or the plot. Each entry holds its own PNG
+    bytes, which avoids sharing a plot file between concurrent requests.
+    """
+    def __init__(self, fetcher, sentiment_analyzer=None, refresh_interval=60.0, max_entries=32,
+                 limit=500, initial_cash=10000, commission=0.002, symbols=DEFAULT_SYMBOLS,
+                 timeframes=DEFAULT_TIMEFRAMES):
+        """
+        Initializes the DashboardCache.
+
+        Args:
+            fetcher: A DataFetcher, ideally backed by a CandleStore so that each
+                     refresh only downloads the newest candles.
+            sentiment_analyzer: A SentimentAnalyzer passed to the strategies (optional).
+            refresh_interval (float): Seconds between checks for new candles.
+            max_entries (int): Maximum number of parameter sets kept up to date;
+                               the least recently requested ones are dropped.
+            limit (int): Number of candles each backtest covers.
+            initial_cash (float): The starting cash balance of the backtests.
+            commission (float): The trading commission fee per trade.
+            symbols (iterable): The symbols that may be requested.
+            timeframes (iterable): The timeframes that may be requested.
+        """
+        self.fetcher = fetcher
+        self.sentiment_analyzer = sentiment_analyzer
+        self.refresh_interval = refresh_interval
+        self.max_entries = max_entries
+        self.limit = limit
+        self.initial_cash = initial_cash
+        self.commission = commission
+        self.symbols = tuple(symbols)
+        self.timeframes = tuple(timeframes)
+        self.indicator_cache = IndicatorCache()
+        self._entries = OrderedDict()  # key -> latest entry, or None until computed
+        self._ready = {}  # key -> Event set once the first entry is available
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def key(self, symbol='ETH/USD', timeframe='1d', strategy='ma_crossover', **params):
+        """
+        Builds the cache key of a parameter set, validating the parameters.
+
+        Only the configured symbols and timeframes are accepted, so requests
+        cannot fill the cache with entries (and exchange downloads) of their own,
+        and only the strategy's grid parameters, with windows of at most `limit`
+        bars, so that nothing invalid or oversized is scheduled.
+
+        Args:
+            symbol (str): The trading symbol.
+            timeframe (str): The candle timeframe.
+            strategy (str): The registry name of the strategy.
+            **params: The strategy's `PARAM_GRID` parameters.
+
+        Returns:
+            tuple: A hashable key for `get`.
+
+        Raises:
+            ValueError: If the symbol or timeframe is not served, or the strategy
+                        is unknown or rejects the parameters.
+        """
+        if symbol not in self.symbols:
+            raise ValueError(f"Unknown symbol '{symbol}'. Available: {list(self.symbols)}")
+        if timeframe not in self.timeframes:
+            raise ValueError(f"Unknown timeframe '{timeframe}'. Available: {list(self.timeframes)}")
+        try:
+            create_strategy(strategy, **check_params(strategy, params, self.limit))
+        except TypeError as e:
+            raise ValueError(str(e)) from e
+        return (symbol, timeframe, strategy, tuple(sorted(params.items())))
+
+    def get(self, key, timeout=0.0):
+        """
+        Returns the latest entry for a parameter set.
+
+        Unknown keys are scheduled for the background worker, which is
+        started on first use.
+
+        Args:
+            key (tuple): A key built by `key`.
+            timeout (float): Seconds to wait for a key's first entry.
+
+        Returns:
+            dict: The entry with 'results', 'plot' (PNG bytes or None),
+                  'last_timestamp' and 'updated', or None if not computed yet.
+        """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                entry, ready = self._entries[key], self._ready[key]
+            else:
+                entry, ready = None, threading.Event()
+                self._entries[key] = None
+                self._ready[key] = ready
+                while len(self._entries) > self.max_entries:
+                    evicted, _ = self._entries.popitem(last=False)
+                    self._ready.pop(evicted)
+                self._wake.set()
+        if entry is None:
+            self.start()
+            if ready.wait(timeout):
+                with self._lock:
+                    entry = self._entries.get(key)
+        return entry
+
+    def peek(self, key):
+        """
+        Returns the latest entry for a parameter set without scheduling it.
+
+        Args:
+            key (tuple): A key built by `key`.
+
+        Returns:
+            dict: The entry (see `get`), or None if the key is not cached or not computed yet.
+        """
+        with self._lock:
+            return self._entries.get(key)
+
+    def start(self):
+        """Starts the background refresh thread if it is not running."""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stopped.clear()
+                self._thread = threading.Thread(target=self._run, name='dashboard-refresh', daemon=True)
+                self._thread.start()
+
+    def stop(self, timeout=None):
+        """Stops the background refresh thread."""
+        self._stopped.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self):
+        """Refreshes every entry, then sleeps until new keys or the next interval."""
+        while not self._stopped.is_set():
+            self._wake.clear()
+            self.refresh()
+            self._wake.wait(self.refresh_interval)
+
+    @timed('dashboard_refresh')
+    def refresh(self):
+        """
+        Brings every cached parameter set up to date with the latest candles.
+
+        Each symbol and timeframe is fetched once per refresh, and a backtest
+        is only rerun when its data has a newer candle than its entry.
+        """
+        with self._lock:
+            keys = list(self._entries)
+        candles = {}
+        for key in keys:
+            symbol, timeframe = key[:2]
+            if (symbol, timeframe) not in candles:
+                candles[symbol, timeframe] = self._fetch(symbol, timeframe)
+            data = candles[symbol, timeframe]
+            if data is None or data.empty:
+                continue
+
+            with self._lock:
+                previous = self._entries.get(key)
+            if previous is not None and previous['last_timestamp'] == data.index[-1]:
+                continue
+            try:
+                entry = self._compute(key, data)
+            except Exception as e:
+                print(f"An error occurred while refreshing the dashboard for {key}: {e}")
+                continue
+
+            with self._lock:
+                if key in self._entries:
+                    self._entries[key] = entry
+                    self._ready[key].set()
+
+    def _fetch(self, symbol, timeframe):
+        """Fetches the latest candles, returning None on failure."""
+        try:
+            return self.fetcher.fetch_ohlcv(symbol=symbol, timeframe=timeframe, limit=self.limit)
+        except Exception as e:
+            print(f"An error occurred while fetching {symbol} for the dashboard: {e}")
+            return None
+
+    def _compute(self, key, data):
+        """Runs the backtest of one parameter set and renders its plot."""
+        symbol, _, strategy, params = key
+        strategy = create_strategy(strategy, sentiment_analyzer=self.sentiment_analyzer,
+                                   indicator_cache=self.indicator_cache, **dict(params))
+        backtester = Backtester(strategy, data, initial_cash=self.initial_cash, commission=self.commission)
+        portfolio = backtester.run(symbol=symbol)
+
+        final_value = portfolio['total'].iloc[-1]
+        total_return = (final_value / backtester.initial_cash) - 1
+        results = {
+            'initial_cash': f"${backtester.initial_cash:,.2f}",
+            'final_value': f"${final_value:,.2f}",
+            'total_return': f"{total_return:.2%}",
+            'total_trades': int(portfolio['trades'].sum()),
+        }
+        return {
+            'results': results,
+            'plot': render_equity_plot(portfolio),
+            'last_timestamp': data.index[-1],
+            'updated': time.time(),
+        }
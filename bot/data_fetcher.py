@@ -1,14 +1,97 @@
-import ccxt
+import time
+
 import pandas as pd
 
+from .candle_store import merge_candles, to_milliseconds
+from .instrumentation import metrics, timed
+
+# Seconds per timeframe unit, as ccxt parses them (a month is 30 days, a year 365).
+TIMEFRAME_SECONDS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400, 'w': 604800, 'M': 2592000, 'y': 31536000}
+
+
+def now_milliseconds():
+    """Returns the current time in milliseconds since the epoch."""
+    return int(time.time() * 1000)
+
+
+def timeframe_milliseconds(timeframe):
+    """
+    Returns the length of a candle timeframe (e.g., '1h') in milliseconds.
+
+    Timeframes are parsed like ccxt does, without importing it.
+
+    Raises:
+        ValueError: If the timeframe is not a positive ccxt timeframe.
+    """
+    try:
+        seconds = int(timeframe[:-1]) * TIMEFRAME_SECONDS[timeframe[-1]]
+    except (ValueError, KeyError, IndexError, TypeError) as e:
+        raise ValueError(f"Invalid timeframe '{timeframe}'") from e
+    if seconds <= 0:
+        raise ValueError(f"Invalid timeframe '{timeframe}'")
+    return seconds * 1000
+
+
+def candles_to_frame(ohlcv):
+    """Converts raw ccxt OHLCV rows into a DataFrame indexed by timestamp."""
+    df = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
+    df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+    df.set_index('timestamp', inplace=True)
+    return df
+
+
+class HistoryPager:
+    """
+    Tracks the cursor and the collected candles of a paginated download.
+    """
+    def __init__(self, timeframe, since, until):
+        """
+        Initializes the HistoryPager.
+
+        Args:
+            timeframe (str): The candle timeframe (e.g., '1h').
+            since (int): The first candle time to collect, in milliseconds.
+            until (int): The end of the download in milliseconds, exclusive.
+        """
+        self.timeframe_ms = timeframe_milliseconds(timeframe)
+        self.cursor = since
+        self.until = until
+        self.candles = {}
+
+    @property
+    def done(self):
+        return self.cursor >= self.until
+
+    def add_page(self, rows):
+        """
+        Adds one page of raw OHLCV rows and advances the cursor past it.
+
+        Rows before the cursor (overlap with the previous page) or at or after
+        `until` are dropped. A page that brings nothing new ends the download.
+        """
+        new_rows = [row for row in rows if self.cursor <= row[0] < self.until]
+        if not new_rows:
+            self.cursor = self.until
+            return
+        for row in new_rows:
+            self.candles[row[0]] = row
+        self.cursor = max(row[0] for row in new_rows) + self.timeframe_ms
+
+    def to_frame(self):
+        """Returns the collected candles as a DataFrame sorted by timestamp."""
+        return candles_to_frame([self.candles[t] for t in sorted(self.candles)])
+
+
 class DataFetcher:
-    def __init__(self, exchange_name='kraken'):
+    def __init__(self, exchange_name='kraken', store=None):
         """
         Initializes the DataFetcher.
 
         Args:
             exchange_name (str): The name of the exchange to connect to.
                                  (e.g., 'binance', 'gemini', 'coinbasepro', 'kraken')
+            store (CandleStore): An optional on-disk candle cache. When given,
+                                 only candles newer than the cached ones are requested.
         """
         # Note: To trade on a specific exchange, you might need to provide API keys.
         # For now, we are using public endpoints that don't require authentication.
@@ -20,8 +103,29 @@ class DataFetcher:
         #         'sandbox': True,  # Use sandbox for paper trading
         #     },
         # })
-        self.exchange = getattr(ccxt, exchange_name)()
+        self.exchange_name = exchange_name
+        self.store = store
+        self._exchange = None
+
+    @property
+    def exchange(self):
+        """
+        The ccxt exchange client, created on first use.
+
+        Importing ccxt loads every exchange module, so it is deferred until
+        candles are actually requested.
+        """
+        if self._exchange is None:
+            import ccxt
+
+            self._exchange = getattr(ccxt, self.exchange_name)()
+        return self._exchange
+
+    @exchange.setter
+    def exchange(self, exchange):
+        self._exchange = exchange
 
+    @timed('fetch_ohlcv')
     def fetch_ohlcv(self, symbol='ETH/USD', timeframe='1h', since=None, limit=100):
         """
         Fetches historical OHLCV data.
@@ -32,6 +136,9 @@ class DataFetcher:
             since (int): The starting timestamp in milliseconds for fetching data.
             limit (int): The maximum number of candles to fetch.
 
+        With a candle store attached, cached candles are served and only the
+        ones newer than the last cached timestamp are requested and merged in.
+
         Returns:
             pandas.DataFrame: A DataFrame with OHLCV data, indexed by timestamp.
                               Returns None if fetching fails.
@@ -40,22 +147,169 @@ class DataFetcher:
             print(f"Exchange {self.exchange.id} does not support fetching OHLCV data.")
             return None
 
+        if self.store is None:
+            return self._fetch(symbol, timeframe, since, limit)
+        return self._fetch_cached(symbol, timeframe, since, limit)
+
+    @timed('fetch_history')
+    def fetch_history(self, symbol, timeframe, since, until=None, page_limit=None):
+        """
+        Downloads all candles between `since` and `until`, one page at a time.
+
+        A single exchange request is capped at the exchange's page size, so
+        this keeps paging forward until `until` is reached, deduplicating the
+        candles where consecutive pages overlap. When the exchange client does
+        not throttle itself, the pages are spaced by its `rateLimit`. With a
+        candle store attached, only the part not already cached is downloaded.
+
+        Args:
+            symbol (str): The trading symbol to fetch (e.g., 'ETH/USD').
+            timeframe (str): The timeframe to fetch (e.g., '1m', '5m', '1h', '1d').
+            since (int): The starting timestamp in milliseconds.
+            until (int): The end timestamp in milliseconds, exclusive (defaults to now).
+            page_limit (int): The number of candles requested per page
+                              (defaults to the exchange's own page size).
+
+        Returns:
+            pandas.DataFrame: A DataFrame with OHLCV data, indexed by timestamp.
+                              Returns None if fetching fails.
+        """
+        until = until if until is not None else now_milliseconds()
+        cached = self._load_cached(symbol, timeframe) if self.store else None
+
+        # Download what the cache lacks, always adjacent to it, so the stored series stays contiguous:
+        # from `since` up to its first candle, and from its last candle (which may have been
+        # incomplete) on, even when the request starts after it.
+        if cached is None or cached.empty:
+            ranges = [(since, until)]
+        else:
+            first, last = (int(t) for t in to_milliseconds(cached.index[[0, -1]]))
+            ranges = [(since, first)] if since < first else []
+            if until > last:
+                ranges.append((last, until))
+
+        pieces = []
+        for start, end in ranges:
+            fresh = self._download_history(symbol, timeframe, start, end, page_limit)
+            if fresh is None:
+                return None
+            pieces.append(fresh)
+        if not pieces:
+            candles = cached
+        elif self.store is None:
+            candles = pieces[0]
+        elif cached is not None and not cached.empty and not self._adjoins(cached, pieces, ranges, timeframe):
+            print(f"The exchange did not return {symbol} {timeframe} candles adjacent to the cached ones; "
+                  f"serving them without updating the cache, with a gap.")
+            candles = merge_candles(cached, pd.concat(pieces))
+        else:
+            candles = self._merge_into_store(symbol, timeframe, cached, pd.concat(pieces))
+        index = to_milliseconds(candles.index)
+        return candles[(index >= since) & (index < until)]
+
+    def _fetch(self, symbol, timeframe, since, limit):
+        """Requests one page of candles from the exchange, returning None on failure."""
+        return self._guarded(lambda: candles_to_frame(self.exchange.fetch_ohlcv(symbol, timeframe, since, limit)))
+
+    def _download_history(self, symbol, timeframe, since, until, page_limit):
+        """Pages through the exchange history, returning None on failure."""
+        def download():
+            pager = HistoryPager(timeframe, since, until)
+            throttle = not getattr(self.exchange, 'enableRateLimit', False)
+            while not pager.done:
+                pager.add_page(self.exchange.fetch_ohlcv(symbol, timeframe, pager.cursor, page_limit))
+                if throttle and not pager.done:
+                    time.sleep(getattr(self.exchange, 'rateLimit', 0) / 1000)
+            return pager.to_frame()
+        return self._guarded(download)
+
+    def _guarded(self, request):
+        """Runs an exchange request, reporting errors and returning None on failure."""
+        import ccxt
+
         try:
-            ohlcv = self.exchange.fetch_ohlcv(symbol, timeframe, since, limit)
-            df = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
-            df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-            df.set_index('timestamp', inplace=True)
-            return df
+            return request()
         except ccxt.NetworkError as e:
             print(f"Network error while fetching OHLCV data: {e}")
-            return None
         except ccxt.ExchangeError as e:
             print(f"Exchange error while fetching OHLCV data: {e}")
-            return None
         except Exception as e:
             print(f"An unexpected error occurred: {e}")
+        metrics.increment('fetch_errors')
+        return None
+
+    @staticmethod
+    def _adjoins(cached, pieces, ranges, timeframe):
+        """Whether downloaded candles connect to the cached ones without leaving a gap."""
+        first, last = (int(t) for t in to_milliseconds(cached.index[[0, -1]]))
+        step = timeframe_milliseconds(timeframe)
+        for fresh, (start, end) in zip(pieces, ranges):
+            if fresh.empty:
+                continue
+            times = to_milliseconds(fresh.index)
+            if end == first and times[-1] < first - step:
+                return False  # the backfill stops short of the cache
+            if start == last and times[0] > last:
+                return False  # the top-up starts after the cache ends
+        return True
+
+    def _load_cached(self, symbol, timeframe):
+        """Loads the stored candles, treating an unreadable cache like an empty one."""
+        try:
+            return self.store.load(self.exchange_name, symbol, timeframe)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Could not read the candle cache, fetching from the exchange: {e}")
+            metrics.increment('cache_errors')
             return None
 
+    def _merge_into_store(self, symbol, timeframe, cached, fresh):
+        """Saves freshly fetched candles into the store and returns all known candles."""
+        try:
+            return self.store.merge(self.exchange_name, symbol, timeframe, fresh)
+        except OSError as e:
+            print(f"Could not update the candle cache: {e}")
+            return merge_candles(cached, fresh)
+
+    def _fetch_cached(self, symbol, timeframe, since, limit):
+        """Serves candles from the store, topping it up with newer exchange data."""
+        cached = self._load_cached(symbol, timeframe)
+
+        if cached is None or cached.empty:
+            fresh = self._fetch(symbol, timeframe, since, limit)
+            if fresh is None:
+                return None
+            candles = self._merge_into_store(symbol, timeframe, cached, fresh) if not fresh.empty else fresh
+        else:
+            first, last = (int(t) for t in to_milliseconds(cached.index[[0, -1]]))
+            now = now_milliseconds()
+            ranges = []
+            if since is not None and since < first:
+                # The request reaches further back than the cache does.
+                ranges.append((since, first))
+            elif since is None and len(cached) < limit:
+                # Too few candles are cached; page back far enough to have `limit` of them.
+                ranges.append((min(first, now - limit * timeframe_milliseconds(timeframe)), first))
+            # Re-request the newest cached candle too, as it may have been incomplete.
+            ranges.append((last, now))
+
+            pieces = [self._download_history(symbol, timeframe, start, end, limit) for start, end in ranges]
+            if any(fresh is None for fresh in pieces):
+                print(f"Serving cached {symbol} {timeframe} candles without a top-up.")
+                candles = cached
+            elif all(fresh.empty for fresh in pieces):
+                candles = cached
+            elif not self._adjoins(cached, pieces, ranges, timeframe):
+                print(f"The exchange did not return {symbol} {timeframe} candles adjacent to the cached ones; "
+                      f"serving them without updating the cache, with a gap.")
+                candles = merge_candles(cached, pd.concat(pieces))
+            else:
+                candles = self._merge_into_store(symbol, timeframe, cached, pd.concat(pieces))
+
+        if since is None:
+            return candles.iloc[-limit:] if limit else candles
+        candles = candles[candles.index >= pd.to_datetime(since, unit='ms')]
+        return candles.iloc[:limit] if limit else candles
+
 if __name__ == '__main__':
     # This is an example of how to use the DataFetcher
     fetcher = DataFetcher()
@@ -0,0 +1,107 @@
+import numpy as np
+import pandas as pd
+
+from .candle_store import to_milliseconds
+
+
+def _to_milliseconds(value):
+    """Converts a millisecond integer or anything pd.Timestamp accepts to milliseconds."""
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    return int(pd.Timestamp(value).value // 1_000_000)
+
+
+class ColumnarData:
+    """
+    OHLCV columns held as plain or memory-mapped NumPy arrays that share one
+    timestamp axis.
+
+    Unlike a DataFrame, nothing is materialized up front: columns stay on disk
+    until they are read, slicing by time range returns views, and columns can
+    be kept as float32. The strategy and backtester accept it wherever they
+    accept a DataFrame.
+    """
+    def __init__(self, timestamps, arrays):
+        """
+        Initializes the ColumnarData.
+
+        Args:
+            timestamps (np.ndarray): Candle times in milliseconds since the epoch, ascending.
+            arrays (dict): Column arrays keyed by name, each as long as `timestamps`.
+        """
+        self.timestamps = np.asarray(timestamps, dtype=np.int64)
+        self.arrays = dict(arrays)
+
+    @classmethod
+    def from_store(cls, store, exchange, symbol, timeframe, columns=('close',)):
+        """
+        Memory-maps columns of a CandleStore series without reading them.
+
+        Args:
+            store (CandleStore): The store holding the candles.
+            exchange (str): The exchange name.
+            symbol (str): The trading symbol (e.g., 'ETH/USD').
+            timeframe (str): The candle timeframe (e.g., '1m').
+            columns (iterable): The columns to map. Only these take up memory once read.
+
+        Returns:
+            ColumnarData: The mapped columns, or None if nothing is stored.
+        """
+        arrays = store.load_columns(exchange, symbol, timeframe, list(columns), mmap=True)
+        if arrays is None:
+            return None
+        return cls(arrays.pop('timestamp'), arrays)
+
+    @classmethod
+    def from_frame(cls, data, dtype=None):
+        """
+        Builds a ColumnarData from an OHLCV DataFrame indexed by timestamp.
+
+        Args:
+            data (pd.DataFrame): The OHLCV data.
+            dtype: Optional dtype for the columns (e.g., np.float32).
+        """
+        arrays = {name: data[name].to_numpy(dtype=dtype) for name in data.columns}
+        return cls(to_milliseconds(data.index), arrays)
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def __getitem__(self, name):
+        return self.arrays[name]
+
+    def __contains__(self, name):
+        return name in self.arrays
+
+    @property
+    def index(self):
+        """The candle times as a DatetimeIndex."""
+        return pd.DatetimeIndex(self.timestamps.view('datetime64[ms]'), name='timestamp')
+
+    @property
+    def nbytes(self):
+        """The size of the timestamp axis and all columns in bytes."""
+        return self.timestamps.nbytes + sum(array.nbytes for array in self.arrays.values())
+
+    def slice(self, start=None, end=None):
+        """
+        Selects a time range without copying any column.
+
+        Args:
+            start: The first time to include, in milliseconds or as a timestamp.
+            end: The first time to exclude, in milliseconds or as a timestamp.
+
+        Returns:
+            ColumnarData: Views of the selected rows.
+        """
+        lo = 0 if start is None else np.searchsorted(self.timestamps, _to_milliseconds(start), 'left')
+        hi = len(self) if end is None else np.searchsorted(self.timestamps, _to_milliseconds(end), 'left')
+        return ColumnarData(self.timestamps[lo:hi], {name: array[lo:hi] for name, array in self.arrays.items()})
+
+    def with_columns(self, **arrays):
+        """Returns a ColumnarData sharing the existing columns plus `arrays`."""
+        return ColumnarData(self.timestamps, {**self.arrays, **arrays})
+
+    def to_frame(self):
+        """Materializes the columns into a DataFrame indexed by timestamp."""
+        return pd.DataFrame(self.arrays, index=self.index)
@@ -0,0 +1,206 @@
+import numpy as np
+
+BPS = 1e-4
+
+
+class ExecutionModel:
+    """
+    Describes how the orders implied by a target position are filled.
+
+    The default fills each signal at the next bar's open, so a strategy can
+    no longer trade on the same close it computed its signal from. Market
+    orders cross half the bid/ask spread, pay slippage and the taker fee;
+    limit orders fill at the reference price and pay the maker fee. With a
+    volume cap, an order fills at most a fraction of each bar's volume and
+    the remainder is worked over the following bars.
+    """
+    FILLS = ('close', 'next_open')
+    ORDER_TYPES = ('market', 'limit')
+
+    def __init__(self, fill='next_open', slippage_bps=0.0, spread_bps=0.0, order_type='market',
+                 taker_fee=0.002, maker_fee=0.001, max_volume_fraction=None):
+        """
+        Initializes the ExecutionModel.
+
+        Args:
+            fill (str): 'next_open' fills a signal at the following bar's open,
+                        'close' at the signal bar's own close (the legacy behaviour).
+            slippage_bps (float): Adverse price move of each market fill, in basis points.
+            spread_bps (float): The full bid/ask spread in basis points; market
+                                orders pay half of it on each side.
+            order_type (str): 'market' (taker fee, pays spread and slippage) or
+                              'limit' (maker fee, filled at the reference price).
+            taker_fee (float): Fee rate charged on market fills (e.g., 0.002 for 0.2%).
+            maker_fee (float): Fee rate charged on limit fills.
+            max_volume_fraction (float): The largest fraction of a bar's volume one
+                                         order may fill (optional, unlimited by default).
+        """
+        if fill not in self.FILLS:
+            raise ValueError(f"fill must be one of {self.FILLS}")
+        if order_type not in self.ORDER_TYPES:
+            raise ValueError(f"order_type must be one of {self.ORDER_TYPES}")
+        if slippage_bps < 0 or spread_bps < 0:
+            raise ValueError("slippage_bps and spread_bps must not be negative")
+        if not (0 <= taker_fee < 1 and 0 <= maker_fee < 1):
+            raise ValueError("fees must be between 0 and 1")
+        if max_volume_fraction is not None and not max_volume_fraction > 0:
+            raise ValueError("max_volume_fraction must be positive")
+        self.fill = fill
+        self.slippage_bps = slippage_bps
+        self.spread_bps = spread_bps
+        self.order_type = order_type
+        self.taker_fee = taker_fee
+        self.maker_fee = maker_fee
+        self.max_volume_fraction = max_volume_fraction
+
+    def __repr__(self):
+        return (f"ExecutionModel(fill={self.fill!r}, slippage_bps={self.slippage_bps}, "
+                f"spread_bps={self.spread_bps}, order_type={self.order_type!r}, taker_fee={self.taker_fee}, "
+                f"maker_fee={self.maker_fee}, max_volume_fraction={self.max_volume_fraction})")
+
+    @property
+    def fee(self):
+        """The fee rate of this model's order type."""
+        return self.taker_fee if self.order_type == 'market' else self.maker_fee
+
+    @property
+    def price_impact(self):
+        """The fraction by which a fill is worse than its reference price."""
+        if self.order_type == 'limit':
+            return 0.0
+        return (self.spread_bps / 2 + self.slippage_bps) * BPS
+
+    def inputs(self, data):
+        """
+        Extracts the price and volume columns the model needs from OHLCV data.
+
+        Args:
+            data (pd.DataFrame or ColumnarData): The OHLCV data.
+
+        Returns:
+            tuple: (open_prices, volume) arrays, each None when not needed.
+
+        Raises:
+            ValueError: If a needed column is missing.
+        """
+        open_prices = volume = None
+        if self.fill == 'next_open':
+            if 'open' not in data:
+                raise ValueError("next_open fills need an 'open' column")
+            open_prices = np.asarray(data['open'], dtype=float)
+        if self.max_volume_fraction is not None:
+            if 'volume' not in data:
+                raise ValueError("volume-capped fills need a 'volume' column")
+            volume = np.asarray(data['volume'], dtype=float)
+        return open_prices, volume
+
+
+def simulate_execution(close, position, initial_cash, model, open_prices=None, volume=None):
+    """
+    Computes the all-in, long-only portfolio path under an execution model.
+
+    `position` is the position the signals ask for; the model decides when
+    and at what price it is actually reached. Without a volume cap every
+    order fills at once, so the path is a running product of per-bar factors
+    as in `simulate_long_only`. With a cap, fills depend on what is left of
+    each order, so the bars are walked in order while all columns are
+    updated together as arrays.
+
+    Args:
+        close (np.ndarray): Close prices of shape (n,), or (n, k) to match `position`.
+        position (np.ndarray): Boolean target position of shape (n,) or (n, k).
+        initial_cash (float or np.ndarray): The starting cash balance, or one per column.
+        model (ExecutionModel): How orders are filled.
+        open_prices (np.ndarray): Open prices shaped like `close` (needed for next_open fills).
+        volume (np.ndarray): Traded volume shaped like `close` (needed for a volume cap).
+
+    Returns:
+        tuple: (holdings, cash, total, trades) arrays shaped like `position`, where
+               trades marks the bars on which an order (partly) filled.
+    """
+    close = np.asarray(close, dtype=float)
+    position = np.asarray(position, dtype=bool)
+    if close.ndim < position.ndim:
+        close = close[:, None]
+
+    if model.fill == 'next_open':
+        if open_prices is None:
+            raise ValueError("next_open fills need open prices")
+        reference = np.asarray(open_prices, dtype=float)
+        if reference.ndim < position.ndim:
+            reference = reference[:, None]
+        # A signal is only acted upon at the following bar
+        held = np.zeros_like(position)
+        held[1:] = position[:-1]
+    else:
+        reference = close
+        held = position
+    buy_cost = reference * (1 + model.price_impact) * (1 + model.fee)
+    sell_proceeds = reference * (1 - model.price_impact) * (1 - model.fee)
+
+    if model.max_volume_fraction is not None:
+        if volume is None:
+            raise ValueError("volume-capped fills need volumes")
+        volume = np.asarray(volume, dtype=float)
+        if volume.ndim < position.ndim:
+            volume = volume[:, None]
+        return _simulate_capped(close, held, initial_cash, buy_cost, sell_proceeds,
+                                model.max_volume_fraction * volume)
+
+    previous = np.zeros_like(held)
+    previous[1:] = held[:-1]
+    entries = held & ~previous
+    exits = previous & ~held
+
+    previous_close = np.empty(close.shape)
+    previous_close[1:] = close[:-1]
+    previous_close[:1] = np.nan
+    with np.errstate(divide='ignore', invalid='ignore'):
+        growth = close / previous_close
+        # Entries buy at the fill cost and are marked at the close; exits
+        # sell the units carried from the previous close at the fill price.
+        factor = np.where(previous, growth, 1.0)
+        factor = np.where(entries, close / buy_cost, factor)
+        factor = np.where(exits, sell_proceeds / previous_close, factor)
+    total = np.asarray(initial_cash, dtype=float) * np.cumprod(factor, axis=0)
+
+    holdings = np.where(held, total, 0.0)
+    cash = np.where(held, 0.0, total)
+    trades = (entries | exits).astype(np.int64)
+    return holdings, cash, total, trades
+
+
+def _simulate_capped(close, held, initial_cash, buy_cost, sell_proceeds, capacity):
+    """
+    Walks the bars filling at most `capacity` units per bar and column.
+
+    While the position is wanted, the remaining cash keeps buying; once it
+    is not, the remaining units keep selling. Each step updates every
+    column at once, so a sweep block costs one pass over the bars.
+    """
+    n = len(held)
+    shape = held.shape[1:]
+    cash = np.empty(shape)
+    cash[...] = initial_cash
+    units = np.zeros(shape)
+    holdings = np.empty(held.shape)
+    cash_path = np.empty(held.shape)
+    trades = np.zeros(held.shape, dtype=np.int64)
+    zero = np.zeros(shape)
+
+    for i in range(n):
+        # Units the order still wants: all the cash while long, all the units while flat
+        wanted = np.where(held[i], cash / buy_cost[i], units)
+        filled = np.minimum(wanted, capacity[i])
+        filled = np.where(np.isfinite(filled), filled, zero)
+        complete = filled >= wanted
+        bought = np.where(held[i], filled, zero)
+        sold = np.where(held[i], zero, filled)
+
+        cash = np.where(held[i] & complete, zero, cash - bought * buy_cost[i]) + sold * sell_proceeds[i]
+        units = np.where(~held[i] & complete, zero, units - sold) + bought
+        holdings[i] = units * close[i]
+        cash_path[i] = cash
+        trades[i] = filled > 0
+
+    return holdings, cash_path, holdings + cash_path, trades
@@ -0,0 +1,98 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from .instrumentation import metrics
+
+
+def fingerprint(values):
+    """
+    Hashes an array's contents, shape and dtype into a short key.
+
+    Args:
+        values (np.ndarray): The array to identify, e.g. a close price series.
+
+    Returns:
+        str: A hex digest that is equal for equal arrays.
+    """
+    values = np.ascontiguousarray(values)
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{values.dtype.str}{values.shape}".encode())
+    digest.update(values.data)
+    return digest.hexdigest()
+
+
+class IndicatorCache:
+    """
+    An LRU cache of indicator arrays keyed by (data fingerprint, indicator, params).
+
+    Strategies sharing a cache compute an indicator such as SMA(50) on a given
+    series only once, however many strategies or parameter sets use it. The
+    cache is bounded both by entry count and by the bytes of the arrays held;
+    cached arrays are read-only so that no caller can corrupt another's result.
+    """
+    def __init__(self, max_entries=256, max_bytes=256 * 2 ** 20):
+        """
+        Initializes the IndicatorCache.
+
+        Args:
+            max_entries (int): Maximum number of cached indicator arrays.
+            max_bytes (int): Maximum total size of the cached arrays in bytes.
+                             Larger single results are computed but not cached.
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._cache)
+
+    def get(self, key, name, params, compute):
+        """
+        Returns a cached indicator, computing and storing it on a miss.
+
+        Args:
+            key (str): The data fingerprint, see `fingerprint`.
+            name (str): The indicator name (e.g., 'sma').
+            params (tuple): The indicator parameters (e.g., (50,)).
+            compute (callable): Called without arguments to compute the indicator.
+
+        Returns:
+            np.ndarray: The (read-only) indicator values.
+        """
+        entry = (key, name, tuple(params))
+        with self._lock:
+            values = self._cache.get(entry)
+            if values is not None:
+                self._cache.move_to_end(entry)
+                self.hits += 1
+                metrics.increment('indicator_cache_hits')
+                return values
+            self.misses += 1
+        metrics.increment('indicator_cache_misses')
+
+        values = np.asarray(compute())
+        values.flags.writeable = False
+        if values.nbytes > self.max_bytes:
+            return values
+
+        with self._lock:
+            if entry not in self._cache:
+                self._cache[entry] = values
+                self.nbytes += values.nbytes
+            while len(self._cache) > self.max_entries or self.nbytes > self.max_bytes:
+                _, evicted = self._cache.popitem(last=False)
+                self.nbytes -= evicted.nbytes
+        return values
+
+    def clear(self):
+        """Drops every cached indicator."""
+        with self._lock:
+            self._cache.clear()
+            self.nbytes = 0
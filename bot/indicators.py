@@ -0,0 +1,252 @@
+import numpy as np
+import pandas as pd
+
+
+def prefix_sums(values):
+    """
+    Builds the cumulative-sum table shared by all trailing-mean windows.
+
+    NaNs are summed as zeros; `valid_counts` tells how many values each
+    window really holds.
+
+    Args:
+        values (np.ndarray): Values of shape (n,) or (n, k), summed along axis 0.
+
+    Returns:
+        np.ndarray: Array of shape (n + 1, ...) whose first row is zero.
+    """
+    values = np.asarray(values)
+    prefix = np.zeros((len(values) + 1,) + values.shape[1:])
+    missing = np.isnan(values) if values.dtype.kind == 'f' else None
+    if missing is not None and missing.any():
+        values = np.where(missing, 0.0, values)
+    # Accumulate in float64 even for float32 input, without a converted copy.
+    np.cumsum(values, axis=0, dtype=np.float64, out=prefix[1:])
+    return prefix
+
+
+def valid_counts(values):
+    """
+    Builds the cumulative count of non-NaN values, for `mean_from_prefix`.
+
+    Args:
+        values (np.ndarray): Values of shape (n,) or (n, k).
+
+    Returns:
+        np.ndarray: Array of shape (n + 1, ...) whose first row is zero, or
+                    None if `values` has no NaNs.
+    """
+    values = np.asarray(values)
+    if values.dtype.kind != 'f':
+        return None
+    missing = np.isnan(values)
+    if not missing.any():
+        return None
+    counts = np.zeros((len(values) + 1,) + values.shape[1:])
+    np.cumsum(~missing, axis=0, out=counts[1:])
+    return counts
+
+
+def mean_from_prefix(prefix, window, counts=None):
+    """
+    Computes a trailing mean from a cumulative-sum table.
+
+    Like `rolling(window, min_periods=1).mean()`, the first `window - 1`
+    bars average over however many values are available so far, and NaNs
+    are skipped: a window without any value is NaN.
+
+    Args:
+        prefix (np.ndarray): A table returned by `prefix_sums`.
+        window (int): The lookback period.
+        counts (np.ndarray): The table returned by `valid_counts` (None without NaNs).
+
+    Returns:
+        np.ndarray: The trailing mean, shaped like the original values.
+    """
+    n = len(prefix) - 1
+    window = int(window)
+    sums = prefix[1:].copy()
+    if window < n:
+        sums[window:] -= prefix[1:n + 1 - window]
+    if counts is None:
+        counts = np.minimum(np.arange(1, n + 1), window).reshape((-1,) + (1,) * (sums.ndim - 1))
+        return sums / counts
+    valid = counts[1:].copy()
+    if window < n:
+        valid[window:] -= counts[1:n + 1 - window]
+    means = np.full(sums.shape, np.nan)
+    np.divide(sums, valid, out=means, where=valid > 0)
+    return means
+
+
+def rolling_mean(values, window):
+    """
+    Computes the trailing mean of `values` over `window` bars, skipping NaNs.
+
+    Args:
+        values (np.ndarray): Values of shape (n,) or (n, k).
+        window (int): The lookback period.
+
+    Returns:
+        np.ndarray: A float64 array with the same shape as `values`.
+    """
+    return mean_from_prefix(prefix_sums(values), window, valid_counts(values))
+
+
+def rolling_mean_table(values, windows):
+    """
+    Computes the trailing means of a 1-D series for many windows at once.
+
+    The cumulative sums are computed a single time and every window is
+    derived from them, so adding windows costs one subtraction each.
+
+    Args:
+        values (np.ndarray): A 1-D array of values; NaNs are skipped.
+        windows (iterable): The lookback periods.
+
+    Returns:
+        np.ndarray: An array of shape (n, len(windows)), one column per window,
+                    stored column-major so that whole columns can be gathered cheaply.
+    """
+    prefix, counts = prefix_sums(values), valid_counts(values)
+    windows = list(windows)
+    table = np.empty((len(prefix) - 1, len(windows)), order='F')
+    for i, window in enumerate(windows):
+        table[:, i] = mean_from_prefix(prefix, window, counts)
+    return table
+
+
+def rolling_std(values, window):
+    """
+    Computes the trailing population standard deviation over `window` bars.
+
+    Like `rolling_mean`, the first `window - 1` bars use however many values
+    are available so far (the first bar is always 0).
+
+    Args:
+        values (np.ndarray): Values of shape (n,) or (n, k); NaNs are skipped.
+        window (int): The lookback period.
+
+    Returns:
+        np.ndarray: A float64 array with the same shape as `values`.
+    """
+    values = np.asarray(values, dtype=float)
+    # Centering on the first value keeps the sums of squares small, which
+    # limits the cancellation in E[x^2] - E[x]^2 for high-priced series.
+    first = np.take_along_axis(values, np.isnan(values).argmin(axis=0)[None, ...], axis=0) if len(values) else 0.0
+    centered = values - np.nan_to_num(first)
+    mean = rolling_mean(centered, window)
+    variance = rolling_mean(centered * centered, window) - mean * mean
+    return np.sqrt(np.maximum(variance, 0.0))
+
+
+def _smoothed(values, alpha):
+    """Applies recursive exponential smoothing, seeded with the first value, along axis 0."""
+    values = np.asarray(values, dtype=float)
+    frame = pd.DataFrame(values) if values.ndim > 1 else pd.Series(values)
+    return frame.ewm(alpha=alpha, adjust=False).mean().to_numpy()
+
+
+def exponential_mean(values, span):
+    """
+    Computes the exponential moving average of `values`.
+
+    Matches `ewm(span=span, adjust=False).mean()` in pandas.
+
+    Args:
+        values (np.ndarray): Values of shape (n,) or (n, k). Must not contain NaNs.
+        span (int): The span of the average; the smoothing factor is 2 / (span + 1).
+
+    Returns:
+        np.ndarray: A float64 array with the same shape as `values`.
+    """
+    return _smoothed(values, 2.0 / (span + 1))
+
+
+def relative_strength_index(values, window):
+    """
+    Computes Wilder's relative strength index of `values`.
+
+    Args:
+        values (np.ndarray): Values of shape (n,) or (n, k). Must not contain NaNs.
+        window (int): The lookback period of the smoothed gains and losses.
+
+    Returns:
+        np.ndarray: RSI values between 0 and 100, shaped like `values`. Bars
+                    without any gain or loss so far read 50.
+    """
+    values = np.asarray(values, dtype=float)
+    change = np.zeros_like(values)
+    change[1:] = np.diff(values, axis=0)
+    gain = _smoothed(np.maximum(change, 0.0), 1.0 / window)
+    loss = _smoothed(np.maximum(-change, 0.0), 1.0 / window)
+    movement = gain + loss
+    share = np.full(values.shape, 0.5)
+    np.divide(gain, movement, out=share, where=movement > 0)
+    return 100.0 * share
+
+
+# Indicator functions by the name strategies use for them in an IndicatorCache.
+INDICATORS = {
+    'sma': rolling_mean,
+    'std': rolling_std,
+    'ema': exponential_mean,
+    'rsi': relative_strength_index,
+}
+
+
+class RunningMean:
+    """
+    A trailing mean that is updated one value at a time in O(1).
+
+    It keeps the running total of every value seen and a ring buffer of the
+    last `window` totals, so each mean is the same subtraction of prefix sums
+    that `rolling_mean` performs. NaNs are skipped the same way, by also
+    counting the valid values. Replaying a series therefore reproduces the
+    batch result exactly. The buffer grows with the values seen, up to
+    `window`, so an instance that never streams costs nothing.
+    """
+    def __init__(self, window):
+        """
+        Initializes the RunningMean.
+
+        Args:
+            window (int): The lookback period.
+        """
+        self.window = int(window)
+        self.reset()
+
+    def reset(self):
+        """Forgets every value seen so far."""
+        self.count = 0
+        self.total = 0.0
+        self.valid = 0
+        self._totals = []
+        self._valid = []
+
+    def update(self, value):
+        """
+        Adds the next value of the series.
+
+        Args:
+            value (float): The new value.
+
+        Returns:
+            float: The trailing mean including `value`.
+        """
+        value = float(value)
+        if value == value:  # not NaN
+            self.total += value
+            self.valid += 1
+        if self.count >= self.window:
+            slot = self.count % self.window
+            window_sum = self.total - self._totals[slot]
+            window_valid = self.valid - self._valid[slot]
+            self._totals[slot] = self.total
+            self._valid[slot] = self.valid
+        else:
+            window_sum, window_valid = self.total, self.valid
+            self._totals.append(self.total)
+            self._valid.append(self.valid)
+        self.count += 1
+        return window_sum / window_valid if window_valid else float('nan')
@@ -0,0 +1,296 @@
+import atexit
+import cProfile
+import functools
+import inspect
+import os
+import threading
+import time
+import tracemalloc
+
+PROFILERS = ('cprofile', 'tracemalloc')
+
+
+def _escape_label(value):
+    """Escapes a Prometheus label value."""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class _Timer:
+    """Times one stage; a plain class rather than a generator keeps the overhead low."""
+    __slots__ = ('metrics', 'stage', 'start', 'profile', 'memory')
+
+    def __init__(self, metrics, stage):
+        self.metrics = metrics
+        self.stage = stage
+
+    def __enter__(self):
+        self.profile, self.memory = self.metrics._start_profiling(self.stage)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        elapsed = time.perf_counter() - self.start
+        self.metrics._stop_profiling(self.stage, self.profile, self.memory)
+        self.metrics.observe(self.stage, elapsed)
+        return False
+
+
+class _NullTimer:
+    """Stands in for _Timer while the metrics are disabled."""
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class Metrics:
+    """
+    Collects per-stage timings, event counters and gauges for the bot.
+
+    Timings are kept as a count, a sum and a maximum per stage, which is
+    cheap enough to stay on in production; disabled metrics reduce every
+    hook to a flag check. Optionally, each stage can also be profiled with
+    cProfile (one accumulated profile per stage) and tracemalloc (the peak
+    traced memory per stage). Only the outermost profiled stage running at
+    a time is profiled, since profilers cannot nest or span threads.
+    """
+    def __init__(self, enabled=True, profile=()):
+        """
+        Initializes the Metrics.
+
+        Args:
+            enabled (bool): Whether timings and counters are recorded.
+            profile (iterable): Profilers to run around each stage, any of 'cprofile'
+                                and 'tracemalloc'.
+        """
+        profile = set(profile)
+        unknown = profile - set(PROFILERS)
+        if unknown:
+            raise ValueError(f"Unknown profilers {sorted(unknown)}; expected some of {PROFILERS}")
+        self.enabled = enabled
+        self.profile = profile
+        self._lock = threading.Lock()
+        self._profile_lock = threading.Lock()
+        self.reset()
+        if 'tracemalloc' in profile and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    @classmethod
+    def from_environment(cls, environ=None):
+        """
+        Configures the metrics from environment variables.
+
+        BOT_METRICS=0 disables the metrics (they are on by default), and
+        BOT_PROFILE lists the profilers to run, e.g. 'cprofile,tracemalloc'.
+        With BOT_PROFILE set, the cProfile results are written to
+        BOT_PROFILE_DIR (default 'profiles') when the process exits.
+
+        Returns:
+            Metrics: The configured metrics.
+        """
+        environ = os.environ if environ is None else environ
+        enabled = environ.get('BOT_METRICS', '1').lower() not in ('0', 'false', 'no', 'off')
+        profile = [name.strip() for name in environ.get('BOT_PROFILE', '').lower().split(',') if name.strip()]
+        metrics = cls(enabled=enabled, profile=profile if enabled else ())
+        if 'cprofile' in metrics.profile:
+            atexit.register(metrics.dump_profiles, environ.get('BOT_PROFILE_DIR', 'profiles'))
+        return metrics
+
+    def reset(self):
+        """Forgets every recorded timing, counter, gauge and profile."""
+        with self._lock:
+            self._timings = {}  # stage -> [count, total seconds, max seconds]
+            self._counters = {}
+            self._gauges = {}
+            self._profiles = {}
+            self._peak_bytes = {}
+
+    def timer(self, stage):
+        """
+        Returns a context manager that times one run of `stage`.
+
+        Args:
+            stage (str): The stage name, e.g. 'generate_signals'.
+        """
+        return _Timer(self, stage) if self.enabled else _NULL_TIMER
+
+    def observe(self, stage, seconds):
+        """Records one run of `stage` that took `seconds`."""
+        if not self.enabled:
+            return
+        with self._lock:
+            timing = self._timings.get(stage)
+            if timing is None:
+                self._timings[stage] = [1, seconds, seconds]
+            else:
+                timing[0] += 1
+                timing[1] += seconds
+                timing[2] = max(timing[2], seconds)
+
+    def increment(self, name, value=1):
+        """Adds `value` to the counter `name`."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def set_gauge(self, name, value):
+        """Sets the gauge `name` to its current `value`."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._gauges[name] = value
+
+    def _start_profiling(self, stage):
+        """Starts the configured profilers if no other stage is being profiled."""
+        if not self.profile or not self._profile_lock.acquire(blocking=False):
+            return None, None
+        profile = memory = None
+        if 'tracemalloc' in self.profile and tracemalloc.is_tracing():
+            memory = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        if 'cprofile' in self.profile:
+            with self._lock:
+                profile = self._profiles.setdefault(stage, cProfile.Profile())
+            try:
+                profile.enable()
+            except ValueError:  # another profiler (e.g. a debugger) is active
+                profile = None
+        if profile is None and memory is None:
+            self._profile_lock.release()
+        return profile, memory
+
+    def _stop_profiling(self, stage, profile, memory):
+        """Stops the profilers started by `_start_profiling`."""
+        if profile is None and memory is None:
+            return
+        if profile is not None:
+            profile.disable()
+        if memory is not None:
+            peak = tracemalloc.get_traced_memory()[1] - memory
+            with self._lock:
+                self._peak_bytes[stage] = max(self._peak_bytes.get(stage, 0), peak)
+        self._profile_lock.release()
+
+    def snapshot(self):
+        """
+        Returns the recorded metrics.
+
+        Returns:
+            dict: 'timings' (count, total and max seconds per stage), 'counters',
+                  'gauges' and, with tracemalloc profiling, 'peak_bytes' per stage.
+        """
+        with self._lock:
+            return {
+                'timings': {stage: {'count': count, 'total': total, 'max': peak}
+                            for stage, (count, total, peak) in self._timings.items()},
+                'counters': dict(self._counters),
+                'gauges': dict(self._gauges),
+                'peak_bytes': dict(self._peak_bytes),
+            }
+
+    def to_prometheus(self, prefix='bot'):
+        """
+        Renders the metrics in the Prometheus text exposition format.
+
+        Args:
+            prefix (str): The prefix of every metric name.
+
+        Returns:
+            str: The metrics page, ending with a newline.
+        """
+        snapshot = self.snapshot()
+        lines = []
+
+        def family(name, kind, help_text, samples):
+            if not samples:
+                return
+            lines.append(f"# HELP {prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {prefix}_{name} {kind}")
+            lines.extend(samples)
+
+        timings = sorted(snapshot['timings'].items())
+        family('stage_seconds', 'summary', 'Time spent in each instrumented stage.', [
+            sample
+            for stage, timing in timings
+            for sample in (f'{prefix}_stage_seconds_count{{stage="{_escape_label(stage)}"}} {timing["count"]}',
+                           f'{prefix}_stage_seconds_sum{{stage="{_escape_label(stage)}"}} {timing["total"]!r}')
+        ])
+        family('stage_seconds_max', 'gauge', 'Longest run of each instrumented stage.', [
+            f'{prefix}_stage_seconds_max{{stage="{_escape_label(stage)}"}} {timing["max"]!r}'
+            for stage, timing in timings
+        ])
+        family('stage_peak_bytes', 'gauge', 'Peak traced memory allocated during each stage.', [
+            f'{prefix}_stage_peak_bytes{{stage="{_escape_label(stage)}"}} {peak}'
+            for stage, peak in sorted(snapshot['peak_bytes'].items())
+        ])
+        family('events_total', 'counter', 'Number of instrumented events.', [
+            f'{prefix}_events_total{{event="{_escape_label(name)}"}} {value}'
+            for name, value in sorted(snapshot['counters'].items())
+        ])
+        family('gauge', 'gauge', 'Current value of instrumented quantities.', [
+            f'{prefix}_gauge{{name="{_escape_label(name)}"}} {value}'
+            for name, value in sorted(snapshot['gauges'].items())
+        ])
+        return '\n'.join(lines) + '\n'
+
+    def dump_profiles(self, directory='profiles'):
+        """
+        Writes each stage's accumulated cProfile statistics to `<directory>/<stage>.prof`.
+
+        Returns:
+            list: The paths written, readable with `pstats` or snakeviz.
+        """
+        with self._lock:
+            profiles = dict(self._profiles)
+        if not profiles:
+            return []
+        os.makedirs(directory, exist_ok=True)
+        paths = []
+        for stage, profile in profiles.items():
+            path = os.path.join(directory, f"{stage}.prof")
+            profile.dump_stats(path)
+            paths.append(path)
+        return paths
+
+
+# The process-wide metrics, configured from the environment at import.
+metrics = Metrics.from_environment()
+
+
+def timed(stage):
+    """
+    Decorates a function (or coroutine function) so that each call is timed as `stage`.
+
+    Args:
+        stage (str): The stage name reported in the metrics.
+
+    Returns:
+        callable: The decorator.
+    """
+    def decorate(function):
+        if inspect.iscoroutinefunction(function):
+            # Coroutines are only timed: a profiler cannot follow them across awaits
+            @functools.wraps(function)
+            async def async_wrapper(*args, **kwargs):
+                if not metrics.enabled:
+                    return await function(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return await function(*args, **kwargs)
+                finally:
+                    metrics.observe(stage, time.perf_counter() - start)
+            return async_wrapper
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not metrics.enabled:
+                return function(*args, **kwargs)
+            with metrics.timer(stage):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorate
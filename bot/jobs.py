@@ -0,0 +1,416 @@
+import json
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from .backtester import Backtester
+from .candle_store import to_milliseconds
+from .data_fetcher import now_milliseconds, timeframe_milliseconds
+from .indicator_cache import IndicatorCache
+from .instrumentation import metrics
+from .performance import SWEEP_METRICS, bars_per_year, portfolio_metrics, rank_results
+from .strategy import STRATEGIES, check_params, create_strategy
+from .sweep import sweep_ma_crossover, sweep_strategy
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+
+class QueueFullError(RuntimeError):
+    """Raised when a job is submitted while the queue is at capacity."""
+
+
+def _jsonable(value):
+    """Converts the NumPy arrays in a job result (kept compact while cached) to lists."""
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, dict):
+        return {name: _jsonable(item) for name, item in value.items()}
+    return value
+
+
+class Job:
+    """
+    One submitted job and its progress through the queue.
+    """
+    def __init__(self, kind, params):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.params = params
+        self.status = QUEUED
+        self.submitted = time.time()
+        self.started = None
+        self.finished = None
+        self.result = None
+        self.error = None
+
+    def to_dict(self):
+        """Returns the job's state as a JSON-serializable dict, with the result once done."""
+        job = {
+            'id': self.id,
+            'kind': self.kind,
+            'params': self.params,
+            'status': self.status,
+            'submitted': self.submitted,
+            'started': self.started,
+            'finished': self.finished,
+        }
+        if self.status == DONE:
+            job['result'] = _jsonable(self.result)
+        elif self.status == FAILED:
+            job['error'] = self.error
+        return job
+
+
+class JobQueue:
+    """
+    Runs submitted jobs on a bounded thread pool.
+
+    Submissions are normalized first, so identical requests (including ones
+    spelling out the defaults) share one job: a queued or running job is
+    joined, and a finished one is served from the results cache until it
+    expires. The number of unfinished jobs is capped, and finished jobs are
+    kept in an LRU cache of bounded size. Results may hold NumPy arrays,
+    which take a fraction of the memory of lists while they are cached and
+    are converted to lists when reported.
+    """
+    def __init__(self, handlers, max_workers=2, max_pending=32, max_finished=32, result_ttl=300.0):
+        """
+        Initializes the JobQueue.
+
+        Args:
+            handlers (dict): (normalize, run) callables keyed by job kind. `normalize(params)`
+                             returns the canonical parameters or raises ValueError, and
+                             `run(params)` returns a JSON-serializable result (with
+                             NumPy arrays allowed in its dicts).
+            max_workers (int): Number of jobs running at the same time.
+            max_pending (int): Maximum number of queued and running jobs.
+            max_finished (int): Maximum number of finished jobs kept.
+            result_ttl (float): Seconds a finished result is reused for identical submissions.
+        """
+        self.handlers = handlers
+        self.max_pending = max_pending
+        self.max_finished = max_finished
+        self.result_ttl = result_ttl
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='job')
+        self._jobs = {}  # id -> Job
+        self._by_key = {}  # (kind, canonical params) -> id of its latest job
+        self._finished = OrderedDict()  # ids of finished jobs in LRU order
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    def submit(self, kind, params):
+        """
+        Submits a job, or joins an identical one.
+
+        Args:
+            kind (str): The job kind, a key of `handlers`.
+            params (dict): The job parameters.
+
+        Returns:
+            dict: The job's state, see `status`.
+
+        Raises:
+            ValueError: If the kind is unknown or the parameters are invalid.
+            QueueFullError: If `max_pending` jobs are already waiting or running.
+        """
+        if kind not in self.handlers:
+            raise ValueError(f"Unknown job kind '{kind}'. Available: {sorted(self.handlers)}")
+        normalize, run = self.handlers[kind]
+        params = normalize(params or {})
+        key = (kind, json.dumps(params, sort_keys=True))
+
+        with self._lock:
+            job = self._jobs.get(self._by_key.get(key))
+            if job is not None and self._reusable(job):
+                if job.id in self._finished:
+                    self._finished.move_to_end(job.id)
+                return job.to_dict()
+            if self._pending >= self.max_pending:
+                raise QueueFullError(f"The job queue is full ({self.max_pending} jobs pending)")
+            job = Job(kind, params)
+            self._jobs[job.id] = job
+            self._by_key[key] = job.id
+            self._pending += 1
+            metrics.set_gauge('jobs_pending', self._pending)
+            snapshot = job.to_dict()
+
+        def settle_cancelled(future):
+            # Jobs cancelled by `shutdown` never run, so their outcome is recorded here
+            if future.cancelled():
+                self._finish(job, key, None, "Cancelled: the job queue was shut down", FAILED)
+
+        try:
+            future = self._executor.submit(self._run, job, run, key)
+        except RuntimeError:  # shut down since the checks above
+            self._finish(job, key, None, "Cancelled: the job queue was shut down", FAILED)
+            raise
+        future.add_done_callback(settle_cancelled)
+        return snapshot
+
+    def _reusable(self, job):
+        """Whether a new identical submission can share `job`."""
+        if job.status in (QUEUED, RUNNING):
+            return True
+        return job.status == DONE and time.time() - job.finished < self.result_ttl
+
+    def _run(self, job, run, key):
+        """Runs one job on a pool thread and records its outcome."""
+        with self._lock:
+            job.status = RUNNING
+            job.started = time.time()
+        try:
+            with metrics.timer(f"job_{job.kind}"):
+                result, error, status = run(job.params), None, DONE
+        except Exception as e:
+            result, error, status = None, f"{type(e).__name__}: {e}", FAILED
+            metrics.increment('jobs_failed')
+        self._finish(job, key, result, error, status)
+
+    def _finish(self, job, key, result, error, status):
+        """Records a job's outcome and moves it from the pending count to the finished jobs."""
+        with self._lock:
+            job.result, job.error, job.status = result, error, status
+            job.finished = time.time()
+            self._pending -= 1
+            metrics.set_gauge('jobs_pending', self._pending)
+            self._finished[job.id] = key
+            while len(self._finished) > self.max_finished:
+                evicted, evicted_key = self._finished.popitem(last=False)
+                del self._jobs[evicted]
+                if self._by_key.get(evicted_key) == evicted:
+                    del self._by_key[evicted_key]
+
+    def status(self, job_id):
+        """
+        Returns a job's state.
+
+        Args:
+            job_id (str): The id returned by `submit`.
+
+        Returns:
+            dict: The id, kind, parameters, status ('queued', 'running', 'done' or
+                  'failed') and timestamps, plus 'result' or 'error' once finished.
+                  None for unknown (or evicted) jobs.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return job.to_dict() if job is not None else None
+
+    def wait(self, job_id, timeout=None, poll_interval=0.01):
+        """Polls until a job finishes or `timeout` seconds pass, returning its state."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            job = self.status(job_id)
+            if job is None or job['status'] in (DONE, FAILED):
+                return job
+            if deadline is not None and time.monotonic() >= deadline:
+                return job
+            time.sleep(poll_interval)
+
+    def shutdown(self, wait=True):
+        """Stops accepting work, fails the queued jobs and, if `wait`, lets the running jobs finish."""
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+
+def _param(params, name, default, kind):
+    """Reads one parameter, checking its type."""
+    value = params.get(name, default)
+    if kind is float and isinstance(value, int) and not isinstance(value, bool):
+        value = float(value)
+    if not isinstance(value, kind) or isinstance(value, bool):
+        raise ValueError(f"'{name}' must be of type {kind.__name__}")
+    return value
+
+
+def _finite(values):
+    """Replaces undefined (NaN) metrics by None, which JSON can represent."""
+    return {name: None if isinstance(value, float) and np.isnan(value) else value
+            for name, value in values.items()}
+
+
+class BacktestJobs:
+    """
+    The backtest and optimization job handlers for a JobQueue.
+
+    Candles come from one DataFetcher (typically backed by a CandleStore),
+    fetched one request at a time, and indicators are shared between jobs
+    through an IndicatorCache.
+    """
+    MAX_BARS = 100000
+    MAX_COMBINATIONS = 100000
+    # Bound on distinct windows times bars, the size of an optimization's indicator tables.
+    MAX_INDICATOR_VALUES = 20000000
+    SORT_COLUMNS = ('return', 'final_value', 'trades') + SWEEP_METRICS
+    COMMON_PARAMS = {'symbol', 'timeframe', 'bars', 'strategy', 'initial_cash', 'commission'}
+
+    def __init__(self, fetcher):
+        """
+        Initializes the BacktestJobs.
+
+        Args:
+            fetcher: A DataFetcher used to load the candles of every job.
+        """
+        self.fetcher = fetcher
+        self.indicator_cache = IndicatorCache()
+        self._fetch_lock = threading.Lock()
+
+    def handlers(self):
+        """Returns the handlers to pass to JobQueue."""
+        return {
+            'backtest': (self.normalize_backtest, self.backtest),
+            'optimize': (self.normalize_optimization, self.optimize),
+        }
+
+    def _normalize_common(self, params, default_bars, job_params):
+        """Validates the market, data range and account parameters shared by all jobs."""
+        unknown = set(params) - self.COMMON_PARAMS - set(job_params)
+        if unknown:
+            raise ValueError(f"Unknown parameters: {sorted(unknown)}")
+        normalized = {
+            'symbol': _param(params, 'symbol', 'ETH/USD', str),
+            'timeframe': _param(params, 'timeframe', '1d', str),
+            'bars': _param(params, 'bars', default_bars, int),
+            'strategy': _param(params, 'strategy', 'ma_crossover', str),
+            'initial_cash': _param(params, 'initial_cash', 10000.0, float),
+            'commission': _param(params, 'commission', 0.002, float),
+        }
+        timeframe_milliseconds(normalized['timeframe'])
+        if not 2 <= normalized['bars'] <= self.MAX_BARS:
+            raise ValueError(f"'bars' must be between 2 and {self.MAX_BARS}")
+        if normalized['strategy'] not in STRATEGIES:
+            raise ValueError(f"Unknown strategy '{normalized['strategy']}'. Available: {sorted(STRATEGIES)}")
+        if normalized['initial_cash'] <= 0:
+            raise ValueError("'initial_cash' must be positive")
+        if not 0 <= normalized['commission'] < 1:
+            raise ValueError("'commission' must be between 0 and 1")
+        return normalized
+
+    def normalize_backtest(self, params):
+        """
+        Validates backtest parameters and fills in the defaults.
+
+        Args:
+            params (dict): 'symbol', 'timeframe', 'bars' (the number of most recent
+                candles), 'strategy' (a registry name), 'params' (the strategy's
+                `PARAM_GRID` parameters, with windows of at most `MAX_BARS`),
+                'initial_cash' and 'commission'.
+
+        Returns:
+            dict: The canonical parameters.
+        """
+        normalized = self._normalize_common(params, default_bars=500, job_params=('params',))
+        strategy_params = check_params(normalized['strategy'], _param(params, 'params', {}, dict), self.MAX_BARS)
+        try:
+            create_strategy(normalized['strategy'], **strategy_params)
+        except TypeError as e:
+            raise ValueError(str(e)) from e
+        normalized['params'] = strategy_params
+        return normalized
+
+    def normalize_optimization(self, params):
+        """
+        Validates optimization parameters and fills in the defaults.
+
+        Args:
+            params (dict): The market and account parameters of `normalize_backtest`,
+                plus 'param_grid' (candidate values per strategy parameter, defaulting
+                to the strategy's PARAM_GRID), 'top' (the number of best results
+                returned) and 'sort_by' ('return', 'final_value', 'trades' or a
+                performance metric such as 'sharpe'; drawdowns rank smallest first).
+
+        Returns:
+            dict: The canonical parameters.
+        """
+        normalized = self._normalize_common(params, default_bars=1000, job_params=('param_grid', 'top', 'sort_by'))
+        default_grid = STRATEGIES[normalized['strategy']].PARAM_GRID
+        grid = _param(params, 'param_grid', {}, dict)
+        unknown = set(grid) - set(default_grid)
+        if unknown:
+            raise ValueError(f"Unknown strategy parameters in 'param_grid': {sorted(unknown)}")
+        grid = {name: grid.get(name, list(values)) for name, values in default_grid.items()}
+        for name, values in grid.items():
+            if not isinstance(values, list) or not values:
+                raise ValueError(f"'param_grid.{name}' must be a non-empty list of numbers")
+            for value in values:
+                check_params(normalized['strategy'], {name: value}, self.MAX_BARS)
+        if np.prod([len(values) for values in grid.values()]) > self.MAX_COMBINATIONS:
+            raise ValueError(f"'param_grid' must have at most {self.MAX_COMBINATIONS} combinations")
+        windows = {value for name in STRATEGIES[normalized['strategy']].WINDOWS for value in grid[name]}
+        if len(windows) * normalized['bars'] > self.MAX_INDICATOR_VALUES:
+            raise ValueError(f"'param_grid' windows times 'bars' must be at most {self.MAX_INDICATOR_VALUES}")
+
+        normalized['param_grid'] = grid
+        normalized['top'] = _param(params, 'top', 10, int)
+        normalized['sort_by'] = _param(params, 'sort_by', 'return', str)
+        if normalized['top'] < 1:
+            raise ValueError("'top' must be positive")
+        if normalized['sort_by'] not in self.SORT_COLUMNS:
+            raise ValueError(f"'sort_by' must be one of {self.SORT_COLUMNS}")
+        return normalized
+
+    def _load(self, symbol, timeframe, bars):
+        """Loads the most recent `bars` candles, raising if they cannot be fetched."""
+        since = now_milliseconds() - bars * timeframe_milliseconds(timeframe)
+        with self._fetch_lock:
+            data = self.fetcher.fetch_history(symbol=symbol, timeframe=timeframe, since=since)
+        if data is None or data.empty:
+            raise RuntimeError(f"Could not fetch {timeframe} candles for {symbol}")
+        return data.iloc[-bars:]
+
+    def backtest(self, params):
+        """
+        Runs one backtest job.
+
+        Returns:
+            dict: The summary statistics, the performance metrics and the equity
+                  curve as parallel arrays of millisecond timestamps and portfolio values.
+        """
+        data = self._load(params['symbol'], params['timeframe'], params['bars'])
+        strategy = create_strategy(params['strategy'], indicator_cache=self.indicator_cache, **params['params'])
+        backtester = Backtester(strategy, data, initial_cash=params['initial_cash'],
+                                commission=params['commission'])
+        portfolio = backtester.run(symbol=params['symbol'])
+
+        final_value = float(portfolio['total'].iloc[-1])
+        return {
+            'initial_cash': params['initial_cash'],
+            'final_value': final_value,
+            'total_return': final_value / params['initial_cash'] - 1,
+            'total_trades': int(portfolio['trades'].sum()),
+            'bars': len(portfolio),
+            'metrics': _finite(portfolio_metrics(portfolio, params['initial_cash'])),
+            'equity': {
+                'timestamps': to_milliseconds(portfolio.index),
+                'total': portfolio['total'].to_numpy(dtype=float),
+            },
+        }
+
+    def optimize(self, params):
+        """
+        Runs one optimization job over the parameter grid.
+
+        Returns:
+            dict: The number of parameter sets evaluated and the best `top` of
+                  them, each with its parameters, final value, return and trades.
+        """
+        data = self._load(params['symbol'], params['timeframe'], params['bars'])
+        grid = params['param_grid']
+        periods_per_year = bars_per_year(data.index)
+        if params['strategy'] == 'ma_crossover':
+            results = sweep_ma_crossover(data, grid['short_window'], grid['long_window'],
+                                         initial_cash=params['initial_cash'], commission=params['commission'],
+                                         performance=True, periods_per_year=periods_per_year)
+        else:
+            results = sweep_strategy(data, params['strategy'], grid, initial_cash=params['initial_cash'],
+                                     commission=params['commission'], cache=self.indicator_cache,
+                                     performance=True, periods_per_year=periods_per_year)
+
+        top = rank_results(results, params['sort_by'], top=params['top'])
+        return {'evaluated': len(results), 'top': [_finite(row) for row in top.to_dict(orient='records')]}
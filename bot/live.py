@@ -0,0 +1,214 @@
+import asyncio
+import time
+
+import numpy as np
+import pandas as pd
+
+from .signals import BUY, HOLD, SELL
+
+
+class PaperAccount:
+    """
+    Paper-trading cash and holdings, following the same all-in, long-only
+    accounting with commission on both sides as `Backtester`.
+    """
+    def __init__(self, initial_cash=10000, commission=0.001):
+        """
+        Initializes the PaperAccount.
+
+        Args:
+            initial_cash (float): The starting cash balance.
+            commission (float): The trading commission fee per trade (e.g., 0.001 for 0.1%).
+        """
+        self.initial_cash = initial_cash
+        self.commission = commission
+        self.cash = float(initial_cash)
+        self.position_shares = 0.0
+        self.last_price = None
+        self.trades = 0
+
+    @property
+    def holdings(self):
+        """The value of the position at the last seen price."""
+        return self.position_shares * self.last_price if self.last_price is not None else 0.0
+
+    @property
+    def total(self):
+        return self.cash + self.holdings
+
+    def apply(self, signal, price):
+        """
+        Marks the account to `price` and executes `signal` at that price.
+
+        Args:
+            signal (int): A BUY, SELL or HOLD signal code.
+            price (float): The candle close price.
+
+        Returns:
+            bool: Whether a trade was made.
+        """
+        self.last_price = price
+
+        if signal == BUY and self.position_shares == 0:
+            self.position_shares = self.cash / (price * (1 + self.commission))
+            self.cash = 0.0
+        elif signal == SELL and self.position_shares > 0:
+            self.cash += self.position_shares * price * (1 - self.commission)
+            self.position_shares = 0
+        else:
+            return False
+
+        self.trades += 1
+        return True
+
+
+class ReplayFeed:
+    """
+    Replays historical candles as a live feed, as fast as `interval` allows.
+
+    Like every feed, it yields (timestamp, close, received) tuples, where
+    `received` is the `time.perf_counter()` time the candle arrived.
+    """
+    def __init__(self, data, interval=0.0):
+        """
+        Initializes the ReplayFeed.
+
+        Args:
+            data (pd.DataFrame): OHLCV data indexed by timestamp.
+            interval (float): Seconds to wait between candles (0 replays at full speed).
+        """
+        self.data = data
+        self.interval = interval
+
+    async def __aiter__(self):
+        for timestamp, close in zip(self.data.index, self.data['close'].to_numpy()):
+            await asyncio.sleep(self.interval)
+            yield timestamp, float(close), time.perf_counter()
+
+
+class PollingFeed:
+    """
+    Turns periodic DataFetcher polls into a feed of newly closed candles.
+
+    Candles arrive when the poll returning them completes, so candles of the
+    same poll share their `received` time.
+    """
+    def __init__(self, fetcher, symbol, timeframe='1m', poll_interval=10.0, history=0):
+        """
+        Initializes the PollingFeed.
+
+        Args:
+            fetcher (DataFetcher): The fetcher to poll.
+            symbol (str): The trading symbol (e.g., 'ETH/USD').
+            timeframe (str): The candle timeframe (e.g., '1m').
+            poll_interval (float): Seconds between polls.
+            history (int): Closed candles to emit from the first poll, e.g. to warm up
+                           the moving averages.
+        """
+        self.fetcher = fetcher
+        self.symbol = symbol
+        self.timeframe = timeframe
+        self.poll_interval = poll_interval
+        self.history = history
+
+    async def __aiter__(self):
+        last_timestamp = None
+        limit = self.history + 2
+        while True:
+            # The fetcher is blocking, so poll it from a worker thread.
+            candles = await asyncio.to_thread(self.fetcher.fetch_ohlcv, self.symbol, self.timeframe, None, limit)
+            received = time.perf_counter()
+            if candles is not None and len(candles) > 1:
+                # The newest candle is still forming; only emit closed ones.
+                closed = candles.iloc[:-1]
+                if last_timestamp is not None:
+                    closed = closed[closed.index > last_timestamp]
+                for timestamp, close in zip(closed.index, closed['close'].to_numpy()):
+                    yield timestamp, float(close), received
+                if len(closed):
+                    last_timestamp = closed.index[-1]
+            limit = 3
+            await asyncio.sleep(self.poll_interval)
+
+
+class PaperTrader:
+    """
+    Runs a strategy on one symbol's live candles against a PaperAccount.
+    """
+    def __init__(self, symbol, strategy, feed, account=None, warmup=0, sentiment_score=None):
+        """
+        Initializes the PaperTrader.
+
+        Args:
+            symbol (str): The trading symbol (e.g., 'ETH/USD').
+            strategy: A strategy with the incremental `update` API, owned by this trader.
+            feed: An async iterable of (timestamp, close, received) candles, such as
+                  ReplayFeed or PollingFeed.
+            account (PaperAccount): The account to trade (defaults to a new one).
+            warmup (int): Number of initial candles that only update the strategy.
+            sentiment_score (float): An optional sentiment score passed to the strategy.
+        """
+        self.symbol = symbol
+        self.strategy = strategy
+        self.feed = feed
+        self.account = account or PaperAccount()
+        self.warmup = warmup
+        self.sentiment_score = sentiment_score
+        self.latencies = []
+        self.records = []
+
+    async def run(self):
+        """Consumes the feed until it ends, trading on every candle after the warm-up."""
+        self.strategy.reset()
+        candles_seen = 0
+        async for timestamp, close, received in self.feed:
+            _, _, signal = self.strategy.update(close, self.sentiment_score)
+            if candles_seen < self.warmup:
+                signal = HOLD
+            traded = self.account.apply(signal, close)
+            self.latencies.append(time.perf_counter() - received)
+            candles_seen += 1
+
+            self.records.append((timestamp, self.account.holdings, self.account.cash,
+                                 self.account.total, int(traded), signal))
+
+    def latency_stats(self):
+        """
+        Summarizes the tick-to-decision latency.
+
+        Each latency runs from the candle's arrival in the feed to its order
+        decision, so it includes the time the candle waited behind earlier
+        candles and other traders sharing the event loop, not only the
+        strategy update.
+
+        Returns:
+            dict: Count, median, 99th percentile and maximum latency in milliseconds.
+        """
+        if not self.latencies:
+            return {'count': 0, 'p50_ms': None, 'p99_ms': None, 'max_ms': None}
+        latencies = np.asarray(self.latencies) * 1000
+        return {
+            'count': len(latencies),
+            'p50_ms': float(np.percentile(latencies, 50)),
+            'p99_ms': float(np.percentile(latencies, 99)),
+            'max_ms': float(latencies.max()),
+        }
+
+    def portfolio(self):
+        """Returns the traded candles in the same layout as `Backtester.run`, plus the signal."""
+        columns = ['timestamp', 'holdings', 'cash', 'total', 'trades', 'signal']
+        return pd.DataFrame(self.records, columns=columns).set_index('timestamp')
+
+
+async def run_paper_trading(traders):
+    """
+    Runs several paper traders concurrently in the current event loop.
+
+    Args:
+        traders (list): PaperTrader instances, typically one per symbol.
+
+    Returns:
+        dict: Each trader's latency statistics keyed by symbol.
+    """
+    await asyncio.gather(*(trader.run() for trader in traders))
+    return {trader.symbol: trader.latency_stats() for trader in traders}
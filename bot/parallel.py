@@ -0,0 +1,65 @@
+from multiprocessing import shared_memory
+
+import numpy as np
+
+
+class SharedArrays:
+    """
+    Publishes NumPy arrays once through shared memory so that worker processes
+    can read them without each task pickling its own copy.
+    """
+    def __init__(self, **arrays):
+        """
+        Copies each array into its own shared memory block.
+
+        Args:
+            **arrays: The arrays to publish, keyed by the name workers will use.
+        """
+        self._blocks = []
+        self.spec = {}
+        try:
+            for name, array in arrays.items():
+                array = np.ascontiguousarray(array)
+                block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+                self._blocks.append(block)
+                np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+                self.spec[name] = (block.name, array.shape, array.dtype.str)
+        except Exception:
+            self.close()
+            raise
+
+    def close(self):
+        """Releases and removes every shared memory block."""
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+        self._blocks = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def attach_shared(spec):
+    """
+    Maps arrays published by `SharedArrays` into the current process.
+
+    The returned blocks must be kept alive for as long as the arrays are used;
+    the publishing process owns them and unlinks them when it is done.
+
+    Args:
+        spec (dict): The `SharedArrays.spec` of the publishing process.
+
+    Returns:
+        tuple: (dict of read-only arrays keyed by name, list of shared memory blocks)
+    """
+    arrays, blocks = {}, []
+    for name, (block_name, shape, dtype) in spec.items():
+        block = shared_memory.SharedMemory(name=block_name)
+        array = np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+        array.flags.writeable = False
+        arrays[name] = array
+        blocks.append(block)
+    return arrays, blocks
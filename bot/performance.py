@@ -0,0 +1,161 @@
+import numpy as np
+import pandas as pd
+
+from .candle_store import to_milliseconds
+
+# The metrics computed by `performance_metrics`.
+METRICS = ('total_return', 'cagr', 'sharpe', 'sortino', 'max_drawdown', 'max_drawdown_duration',
+           'exposure', 'win_rate', 'turnover', 'trades')
+# The metrics a sweep adds next to its own final value, return and trade columns.
+SWEEP_METRICS = tuple(name for name in METRICS if name not in ('total_return', 'trades'))
+# Metrics for which a smaller value ranks better.
+LOWER_IS_BETTER = frozenset({'max_drawdown', 'max_drawdown_duration'})
+
+DAY_MILLISECONDS = 24 * 60 * 60 * 1000
+
+
+def bars_per_year(index, default=365):
+    """
+    Estimates how many bars make up a year from a timestamp index.
+
+    Crypto markets trade around the clock, so a year is 365 days of bars.
+
+    Args:
+        index (pd.Index): The bar timestamps.
+        default (float): The value used when the index carries no times.
+
+    Returns:
+        float: The number of bars per year (365 for daily bars).
+    """
+    if isinstance(index, pd.DatetimeIndex) and len(index) > 1:
+        step = np.median(np.diff(to_milliseconds(index)))
+        if step > 0:
+            return 365 * DAY_MILLISECONDS / step
+    return default
+
+
+def performance_metrics(total, initial_cash, position=None, periods_per_year=365, risk_free=0.0):
+    """
+    Computes performance metrics of one equity curve or of a block of curves.
+
+    Every metric is computed column-wise with array operations, so a whole
+    block of curves from a parameter sweep is evaluated in one call.
+
+    Args:
+        total (np.ndarray): Portfolio values of shape (n,), or (n, k) for k curves.
+        initial_cash (float or np.ndarray): The starting value, or one per curve.
+        position (np.ndarray): Boolean positions shaped like `total` (optional).
+            Needed for exposure, win rate, turnover and the trade count.
+        periods_per_year (float): Bars per year, used to annualize (365 for daily bars).
+        risk_free (float): The annual risk-free rate subtracted in Sharpe and Sortino.
+
+    Returns:
+        dict: Keyed by the names in `METRICS`: the total return, CAGR, annualized
+              Sharpe and Sortino ratios, max drawdown (a positive fraction) and its
+              duration in bars, and with a position the fraction of bars exposed,
+              the share of winning round trips (open ones marked to market),
+              the annualized turnover (traded value over the mean equity) and the
+              number of trades. Floats for a single curve, arrays of k values otherwise.
+    """
+    total = np.asarray(total, dtype=float)
+    single = total.ndim == 1
+    if single:
+        total = total[:, None]
+    n, k = total.shape
+    years = n / periods_per_year if n else np.nan
+
+    initial = np.broadcast_to(np.asarray(initial_cash, dtype=float), (k,))
+    equity = np.vstack([initial[None, :], total])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        returns = equity[1:] / equity[:-1] - 1
+        excess = returns - risk_free / periods_per_year
+        mean = excess.mean(axis=0) if n else np.full(k, np.nan)
+        deviation = returns.std(axis=0, ddof=1) if n > 1 else np.full(k, np.nan)
+        downside = np.sqrt((np.minimum(excess, 0.0) ** 2).mean(axis=0)) if n else np.full(k, np.nan)
+        annualize = np.sqrt(periods_per_year)
+
+        growth = equity[-1] / initial
+        peak = np.maximum.accumulate(equity, axis=0)
+        rows = np.arange(n + 1)[:, None]
+        # The most recent bar at a new high, carried forward; the gap to it is
+        # how long the curve has been under water.
+        last_peak = np.maximum.accumulate(np.where(equity >= peak, rows, 0), axis=0)
+
+        metrics = {
+            'total_return': growth - 1,
+            'cagr': np.where(growth > 0, np.abs(growth) ** (1 / years) - 1, -1.0),
+            'sharpe': np.where(deviation > 0, mean / deviation * annualize, np.nan),
+            'sortino': np.where(downside > 0, mean / downside * annualize, np.nan),
+            'max_drawdown': (1 - equity / peak).max(axis=0),
+            'max_drawdown_duration': (rows - last_peak).max(axis=0),
+        }
+
+    if position is not None:
+        position = np.asarray(position, dtype=bool)
+        if single:
+            position = position[:, None]
+        previous = np.zeros_like(position)
+        previous[1:] = position[:-1]
+        entries = position & ~previous
+        exits = previous & ~position
+
+        # Pair each entry with its exit (or the last bar while still open):
+        # both come out of nonzero in the same column-major order.
+        ends = exits.copy()
+        if n:
+            ends[-1] |= position[-1]
+        entry_columns, entry_rows = np.nonzero(entries.T)
+        end_columns, end_rows = np.nonzero(ends.T)
+        won = equity[end_rows + 1, end_columns] > equity[entry_rows, entry_columns]
+        round_trips = np.bincount(entry_columns, minlength=k)
+        wins = np.bincount(entry_columns, weights=won, minlength=k)
+
+        trades = entries.sum(axis=0) + exits.sum(axis=0)
+        traded_value = np.where(entries | exits, total, 0.0).sum(axis=0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            metrics['exposure'] = position.mean(axis=0) if n else np.full(k, np.nan)
+            metrics['win_rate'] = np.where(round_trips > 0, wins / np.maximum(round_trips, 1), np.nan)
+            metrics['turnover'] = traded_value / total.mean(axis=0) / years
+        metrics['trades'] = trades
+
+    if single:
+        return {name: values[0].item() for name, values in metrics.items()}
+    return metrics
+
+
+def portfolio_metrics(portfolio, initial_cash, periods_per_year=None, risk_free=0.0):
+    """
+    Computes `performance_metrics` for a portfolio returned by `Backtester.run`.
+
+    Args:
+        portfolio (pd.DataFrame): A portfolio with 'total' and 'holdings' columns.
+        initial_cash (float): The starting cash balance.
+        periods_per_year (float): Bars per year (estimated from the index by default).
+        risk_free (float): The annual risk-free rate.
+
+    Returns:
+        dict: The metrics of the portfolio's equity curve.
+    """
+    if periods_per_year is None:
+        periods_per_year = bars_per_year(portfolio.index)
+    return performance_metrics(portfolio['total'].to_numpy(), initial_cash,
+                               portfolio['holdings'].to_numpy() > 0, periods_per_year, risk_free)
+
+
+def rank_results(results, metric='return', top=None):
+    """
+    Sorts sweep results best first by any of their metric columns.
+
+    Args:
+        results (pd.DataFrame): A sweep table, e.g. from `sweep_ma_crossover`.
+        metric (str): The column to rank by; drawdowns rank smallest first.
+        top (int): Keep only this many rows (optional).
+
+    Returns:
+        pd.DataFrame: The ranked rows, with undefined (NaN) values last.
+    """
+    if metric not in results:
+        raise ValueError(f"Cannot rank by '{metric}'; available columns: {list(results.columns)}")
+    ranked = results.sort_values(by=metric, ascending=metric in LOWER_IS_BETTER, kind='stable',
+                                 na_position='last')
+    return ranked if top is None else ranked.head(top)
@@ -0,0 +1,136 @@
+import numpy as np
+import pandas as pd
+
+from .backtester import positions_from_signals, simulate_long_only
+from .candle_store import to_milliseconds
+from .strategy import sentiment_asof
+
+
+def align_closes(panel):
+    """
+    Aligns the close prices of many symbols on one timestamp axis.
+
+    Args:
+        panel (dict or pd.DataFrame): OHLCV DataFrames keyed by symbol, or a
+            DataFrame of close prices with one column per symbol.
+
+    Returns:
+        pd.DataFrame: Close prices indexed by timestamp with one column per symbol.
+    """
+    if isinstance(panel, pd.DataFrame):
+        return panel.sort_index()
+    return pd.DataFrame({symbol: data['close'] for symbol, data in panel.items()}).sort_index()
+
+
+class PortfolioBacktester:
+    """
+    Backtests a strategy across many symbols at once.
+
+    All symbols are simulated together as 2-D arrays (bars x symbols). The
+    portfolio is a set of fixed-weight, independent sleeves: each symbol
+    trades its own allocation of the initial capital with the same all-in,
+    long-only rules as `Backtester`. Cash is never moved between sleeves; the
+    portfolio's cash and total are the sums of the sleeves'.
+    """
+    def __init__(self, strategy, panel, initial_cash=10000, commission=0.001, weights=None):
+        """
+        Initializes the PortfolioBacktester.
+
+        Args:
+            strategy: A Strategy (see bot.strategy); its indicators are computed
+                      for all symbols at once on a 2-D close array. A timestamped
+                      `sentiment` on the strategy must be a DataFrame with one
+                      column of scores per symbol, applied as of each bar.
+            panel (dict or pd.DataFrame): OHLCV DataFrames keyed by symbol, or a
+                      DataFrame of close prices with one column per symbol.
+            initial_cash (float): The starting cash balance of the whole portfolio.
+            commission (float): The trading commission fee per trade (e.g., 0.001 for 0.1%).
+            weights (dict): The fraction of the capital allocated to each symbol
+                      (defaults to equal weights). Unallocated capital stays in cash.
+
+        Raises:
+            ValueError: If a weight is negative, the weights add up to more than 1,
+                        or the strategy's sentiment is not a DataFrame.
+        """
+        self.strategy = strategy
+        self.closes = align_closes(panel)
+        self.symbols = list(self.closes.columns)
+        self.initial_cash = initial_cash
+        self.commission = commission
+
+        if weights is None:
+            weights = {symbol: 1 / len(self.symbols) for symbol in self.symbols}
+        self.weights = pd.Series(weights, dtype=float).reindex(self.symbols).fillna(0.0)
+        if (self.weights < 0).any():
+            raise ValueError("weights must not be negative")
+        if self.weights.sum() > 1 + 1e-9:
+            raise ValueError("weights must not add up to more than 1")
+        sentiment = getattr(strategy, 'sentiment', None)
+        if sentiment is not None and not isinstance(sentiment, pd.DataFrame):
+            raise ValueError("A portfolio's sentiment must be a DataFrame with one column of scores per symbol")
+
+        self.portfolio = None # Will be created in run()
+
+    def run(self):
+        """
+        Runs the backtest for every symbol.
+
+        Symbols without a price yet (e.g., listed later than the others) stay
+        flat until their first close, and their indicators start from it as
+        in a backtest of their own history; gaps afterwards carry the last close.
+
+        Returns:
+            pd.DataFrame: The aggregate holdings, cash, total and trades per bar.
+                          Per-symbol results are kept in `symbol_equity`,
+                          `symbol_holdings` and `symbol_positions`.
+        """
+        close = self.closes.ffill().bfill().to_numpy(dtype=float)
+        priced = self.closes.notna().to_numpy()
+        starts = np.where(priced.any(axis=0), priced.argmax(axis=0), len(close))
+
+        # Symbols starting on the same bar are evaluated together, from that bar on,
+        # so no indicator sees the backfilled prices before a symbol's first close
+        buy = np.zeros(close.shape, dtype=bool)
+        sell = np.zeros(close.shape, dtype=bool)
+        for start in np.unique(starts[starts < len(close)]):
+            columns = np.flatnonzero(starts == start)
+            _, group_buy, group_sell = self.strategy.entry_exit(close[start:, columns])
+            buy[start:, columns] = group_buy
+            sell[start:, columns] = group_sell
+
+        sentiment = getattr(self.strategy, 'sentiment', None)
+        sentiment_analyzer = getattr(self.strategy, 'sentiment_analyzer', None)
+        sentiment_score = None
+        if sentiment is not None:
+            # Each symbol's latest score at or before every bar, as in `Strategy.generate_signals`
+            timestamps = to_milliseconds(self.closes.index)
+            sentiment_score = np.column_stack([
+                sentiment_asof(timestamps, sentiment[symbol].dropna()) if symbol in sentiment
+                else np.full(len(timestamps), np.nan)
+                for symbol in self.symbols
+            ])
+        elif sentiment_analyzer:
+            # One batched sentiment request for the whole panel
+            scores = sentiment_analyzer.get_sentiments(self.symbols)
+            sentiment_score = np.array([scores[symbol] for symbol in self.symbols])
+        if sentiment_score is not None:
+            buy &= ~(sentiment_score < -0.5)
+            sell &= ~(sentiment_score > 0.5)
+
+        position = positions_from_signals(buy, sell)
+        allocation = self.weights.to_numpy() * self.initial_cash
+        holdings, cash, total, trades = simulate_long_only(close, position, allocation, self.commission)
+
+        index = self.closes.index
+        self.symbol_positions = pd.DataFrame(position, index=index, columns=self.symbols)
+        self.symbol_holdings = pd.DataFrame(holdings, index=index, columns=self.symbols)
+        self.symbol_equity = pd.DataFrame(total, index=index, columns=self.symbols)
+
+        unallocated = self.initial_cash - allocation.sum()
+        self.portfolio = pd.DataFrame({
+            'holdings': holdings.sum(axis=1),
+            'cash': cash.sum(axis=1) + unallocated,
+            'total': total.sum(axis=1) + unallocated,
+            'trades': trades.sum(axis=1),
+        }, index=index)
+        return self.portfolio
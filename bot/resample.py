@@ -0,0 +1,241 @@
+import numpy as np
+
+from .candle_store import merge_candles, ohlcv_frame, to_milliseconds
+from .data_fetcher import now_milliseconds, timeframe_milliseconds
+from .data_source import ColumnarData
+from .instrumentation import metrics
+
+DAY_MILLISECONDS = 24 * 60 * 60 * 1000
+
+
+def _milliseconds(timeframe):
+    """Returns a timeframe given as a string (e.g., '4h') or in milliseconds, in milliseconds."""
+    return timeframe_milliseconds(timeframe) if isinstance(timeframe, str) else int(timeframe)
+
+
+def _timestamps(data):
+    """Returns the candle times of OHLCV data in milliseconds since the epoch."""
+    return data.timestamps if isinstance(data, ColumnarData) else to_milliseconds(data.index)
+
+
+def bucket_milliseconds(timeframe, base_timeframe=None):
+    """
+    Validates a timeframe that bars can be resampled to and returns its length.
+
+    Bars are aligned to UTC multiples of their length, as exchanges do, so
+    only timeframes that tile a day (or whole days) can be derived; weekly
+    and monthly bars follow the calendar instead.
+
+    Args:
+        timeframe (str): The coarse timeframe (e.g., '4h').
+        base_timeframe (str): The timeframe the bars are built from (optional).
+
+    Returns:
+        int: The length of the timeframe in milliseconds.
+
+    Raises:
+        ValueError: If the timeframe cannot be derived from the base timeframe.
+    """
+    step = timeframe_milliseconds(timeframe)
+    if timeframe[-1] in ('w', 'M', 'y') or (DAY_MILLISECONDS % step and step % DAY_MILLISECONDS):
+        raise ValueError(f"Cannot resample to '{timeframe}': its bars do not tile a UTC day")
+    if base_timeframe is not None and step % timeframe_milliseconds(base_timeframe):
+        raise ValueError(f"Cannot build '{timeframe}' bars from '{base_timeframe}' candles")
+    return step
+
+
+def resample_ohlcv(data, timeframe):
+    """
+    Aggregates OHLCV candles into coarser bars.
+
+    Each bar starts at a UTC multiple of the timeframe (a 4h bar at 00:00,
+    04:00, ... UTC) and takes the first open, highest high, lowest low, last
+    close and summed volume of the candles inside it. The newest bar may
+    still be incomplete.
+
+    Args:
+        data (pd.DataFrame or ColumnarData): OHLCV candles sorted by timestamp.
+        timeframe (str): The timeframe of the bars to build (e.g., '1d').
+
+    Returns:
+        pd.DataFrame: The bars in the usual OHLCV layout, indexed by timestamp.
+    """
+    step = bucket_milliseconds(timeframe)
+    timestamps = _timestamps(data)
+    if len(timestamps) == 0:
+        return ohlcv_frame(timestamps, {name: np.empty(0) for name in ('open', 'high', 'low', 'close', 'volume')})
+
+    buckets = timestamps // step * step
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    ends = np.r_[starts[1:], len(buckets)] - 1
+    return ohlcv_frame(buckets[starts], {
+        'open': np.asarray(data['open'])[starts],
+        'high': np.maximum.reduceat(np.asarray(data['high']), starts),
+        'low': np.minimum.reduceat(np.asarray(data['low']), starts),
+        'close': np.asarray(data['close'])[ends],
+        'volume': np.add.reduceat(np.asarray(data['volume']), starts),
+    })
+
+
+def align_to_bars(values, timestamps, timeframe, target_timestamps, target_timeframe):
+    """
+    Aligns values computed on one timeframe onto the bars of another without look-ahead.
+
+    A bar's values are only known once the bar has closed, so each target bar
+    sees the latest bar that closed no later than the target bar itself. An
+    hourly bar therefore sees yesterday's daily bar until the last hour of
+    today closes.
+
+    Args:
+        values (np.ndarray): Values with one row per source bar, shape (m,) or (m, k).
+        timestamps (np.ndarray): Source bar open times in milliseconds, ascending.
+        timeframe (str or int): The source timeframe, or its length in milliseconds.
+        target_timestamps (np.ndarray): Target bar open times in milliseconds.
+        target_timeframe (str or int): The target timeframe, or its length in milliseconds.
+
+    Returns:
+        np.ndarray: One row per target bar, NaN before the first closed source bar.
+    """
+    closes_at = np.asarray(timestamps, dtype=np.int64) + _milliseconds(timeframe)
+    known_at = np.asarray(target_timestamps, dtype=np.int64) + _milliseconds(target_timeframe)
+    position = np.searchsorted(closes_at, known_at, side='right') - 1
+    aligned = np.asarray(values, dtype=float)[np.maximum(position, 0)]
+    aligned[position < 0] = np.nan
+    return aligned
+
+
+def bar_milliseconds(data):
+    """
+    Infers the timeframe of OHLCV data from the median step between its candles.
+
+    Returns:
+        int: The candle length in milliseconds.
+
+    Raises:
+        ValueError: If the data has fewer than two candles.
+    """
+    timestamps = _timestamps(data)
+    if len(timestamps) < 2:
+        raise ValueError("At least two candles are needed to infer their timeframe")
+    return int(np.median(np.diff(timestamps)))
+
+
+class Resampler:
+    """
+    Serves any coarser timeframe from one finely grained candle series.
+
+    Instead of downloading every timeframe separately, coarse bars are built
+    from the base timeframe's candles, which the DataFetcher keeps in its
+    candle store. Built bars are kept per symbol and timeframe, so a repeat
+    request only fetches and re-aggregates the candles since the newest bar.
+    The interface mirrors DataFetcher's, so a Resampler can stand in for it:
+    timeframes that cannot be built from the base timeframe (finer ones,
+    weekly bars, ...) are passed through to the fetcher.
+
+    Exchanges keep a limited fine history (Kraken serves the last 720
+    candles of any timeframe), so when the base candles start after the
+    requested range does, this is reported and the range is fetched in its
+    own timeframe instead.
+    """
+    def __init__(self, fetcher, base_timeframe='1h'):
+        """
+        Initializes the Resampler.
+
+        Args:
+            fetcher (DataFetcher): Fetches the base candles, ideally backed by a CandleStore.
+            base_timeframe (str): The timeframe every other timeframe is built from.
+        """
+        self.fetcher = fetcher
+        self.base_timeframe = base_timeframe
+        self._bars = {}  # (symbol, timeframe) -> contiguous bars built so far
+        self._base_start = {}  # symbol -> time of the oldest base candle the exchange serves
+
+    def _derivable(self, timeframe):
+        """Whether bars of `timeframe` can be built from the base candles."""
+        if timeframe == self.base_timeframe:
+            return False
+        try:
+            bucket_milliseconds(timeframe, self.base_timeframe)
+        except ValueError:
+            return False
+        return True
+
+    def fetch_history(self, symbol, timeframe, since, until=None, page_limit=None):
+        """
+        Returns the bars of a timeframe between `since` and `until`.
+
+        Args:
+            symbol (str): The trading symbol (e.g., 'ETH/USD').
+            timeframe (str): The timeframe of the bars (e.g., '4h').
+            since (int): The starting timestamp in milliseconds. A bar is only
+                         included if it starts at or after `since`.
+            until (int): The end timestamp in milliseconds, exclusive (defaults to now).
+            page_limit (int): The number of base candles requested per page.
+
+        Returns:
+            pd.DataFrame: The bars, indexed by timestamp. Returns None if fetching fails.
+        """
+        if not self._derivable(timeframe):
+            return self.fetcher.fetch_history(symbol, timeframe, since, until, page_limit)
+        step = bucket_milliseconds(timeframe, self.base_timeframe)
+        until = until if until is not None else now_milliseconds()
+        start = -(-since // step) * step
+        if start < self._base_start.get(symbol, start):
+            return self.fetcher.fetch_history(symbol, timeframe, since, until, page_limit)
+
+        key = (symbol, timeframe)
+        cached = self._bars.get(key)
+        fine_since = start
+        if cached is not None and not cached.empty:
+            first, last = to_milliseconds(cached.index[[0, -1]])
+            if first <= start <= last + step:
+                # Re-aggregate the newest bar, which may have been incomplete
+                fine_since = max(start, int(last))
+            else:
+                cached = None
+
+        if cached is not None and fine_since >= until:
+            bars = cached
+        else:
+            fine = self.fetcher.fetch_history(symbol, self.base_timeframe, fine_since, until, page_limit)
+            if fine is None:
+                return None
+            base_start = int(to_milliseconds(fine.index[:1])[0]) if not fine.empty else until
+            if cached is None and start + step <= until and base_start >= start + step:
+                print(f"WARNING: The {self.base_timeframe} history of {symbol} starts at {base_start}, "
+                      f"after the requested {start}; fetching {timeframe} candles directly.")
+                metrics.increment('resample_short_history')
+                self._base_start[symbol] = base_start
+                return self.fetcher.fetch_history(symbol, timeframe, since, until, page_limit)
+            bars = resample_ohlcv(fine, timeframe)
+            if cached is not None:
+                bars = merge_candles(cached, bars)
+            self._bars[key] = bars
+
+        index = to_milliseconds(bars.index)
+        return bars[(index >= start) & (index < until)]
+
+    def fetch_ohlcv(self, symbol='ETH/USD', timeframe='1h', since=None, limit=100):
+        """
+        Returns recent bars of a timeframe, like `DataFetcher.fetch_ohlcv`.
+
+        Args:
+            symbol (str): The trading symbol (e.g., 'ETH/USD').
+            timeframe (str): The timeframe of the bars (e.g., '1d').
+            since (int): The starting timestamp in milliseconds (defaults to the
+                         start of the `limit`-th most recent bar).
+            limit (int): The maximum number of bars.
+
+        Returns:
+            pd.DataFrame: The bars, indexed by timestamp. Returns None if fetching fails.
+        """
+        if not self._derivable(timeframe):
+            return self.fetcher.fetch_ohlcv(symbol, timeframe, since, limit)
+        if since is None:
+            if not limit:
+                raise ValueError("Either since or limit is needed")
+            step = bucket_milliseconds(timeframe, self.base_timeframe)
+            bars = self.fetch_history(symbol, timeframe, (now_milliseconds() // step - limit + 1) * step)
+            return bars if bars is None else bars.iloc[-limit:]
+        bars = self.fetch_history(symbol, timeframe, since)
+        return bars if bars is None or not limit else bars.iloc[:limit]
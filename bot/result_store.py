@@ -0,0 +1,241 @@
+import json
+import math
+import os
+import sqlite3
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from .indicator_cache import fingerprint
+from .indicators import rolling_mean_table
+from .instrumentation import timed
+from .performance import LOWER_IS_BETTER, SWEEP_METRICS
+from .strategy import STRATEGIES
+from .sweep import parameter_sets, sweep_pairs, sweep_parameter_sets
+
+# The result columns stored for every backtest.
+RESULT_COLUMNS = ('final_value', 'return', 'trades') + SWEEP_METRICS
+
+
+def _plain(value):
+    """Converts NumPy scalars for JSON, turning NaN (e.g. a Sharpe ratio without trades) into None."""
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    return value
+
+
+def _key(value):
+    """Serializes parameters or a configuration into a canonical JSON key."""
+    return json.dumps({name: _plain(item) for name, item in value.items()}, sort_keys=True)
+
+
+def data_fingerprint(data, columns=('close',)):
+    """
+    Identifies the price data a backtest ran on.
+
+    Args:
+        data (pd.DataFrame or ColumnarData): OHLCV data.
+        columns (iterable): The columns the backtests read.
+
+    Returns:
+        str: A key that is equal for equal data.
+    """
+    return fingerprint(np.concatenate([np.asarray(data[name], dtype=float) for name in columns]))
+
+
+class ResultStore:
+    """
+    Persists backtest results in SQLite, one row per backtest.
+
+    A row is keyed by the fingerprint of the data, the strategy, its
+    parameters and the backtester configuration (cash, fees, execution
+    model), so a sweep can skip every backtest that was stored before, and
+    the best results can be queried later without recomputing anything.
+    """
+    def __init__(self, path='data/results.sqlite'):
+        """
+        Initializes the ResultStore.
+
+        Args:
+            path (str): The SQLite database file, created if missing.
+        """
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("""
+                CREATE TABLE IF NOT EXISTS results (
+                    data TEXT NOT NULL,
+                    strategy TEXT NOT NULL,
+                    params TEXT NOT NULL,
+                    config TEXT NOT NULL,
+                    metrics TEXT NOT NULL,
+                    created REAL NOT NULL,
+                    PRIMARY KEY (data, strategy, params, config)
+                )
+            """)
+
+    def close(self):
+        """Closes the database connection."""
+        self._connection.close()
+
+    def completed(self, data, strategy, config):
+        """
+        Lists the parameter sets already stored for a data set and configuration.
+
+        Args:
+            data (str): The data fingerprint.
+            strategy (str): The registry name of the strategy.
+            config (dict): The backtester configuration.
+
+        Returns:
+            set: The canonical JSON keys of the stored parameter sets.
+        """
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT params FROM results WHERE data = ? AND strategy = ? AND config = ?",
+                (data, strategy, _key(config)),
+            ).fetchall()
+        return {params for params, in rows}
+
+    def add(self, data, strategy, config, params, results):
+        """
+        Stores a table of sweep results in one transaction.
+
+        The rows are keyed by the given parameter dicts rather than the
+        table's parameter columns, whose dtype may have turned an int into a
+        float (2 into 2.0) that `completed` would no longer match.
+
+        Args:
+            data (str): The data fingerprint.
+            strategy (str): The registry name of the strategy.
+            config (dict): The backtester configuration.
+            params (list): The parameter sets, one dict per row of `results`.
+            results (pd.DataFrame): One row per parameter set with any of `RESULT_COLUMNS`.
+        """
+        if len(params) != len(results):
+            raise ValueError(f"Got {len(params)} parameter sets for {len(results)} results")
+        config = _key(config)
+        metrics = [name for name in RESULT_COLUMNS if name in results]
+        now = time.time()
+        rows = [
+            (data, strategy, _key(param_set), config,
+             json.dumps({name: _plain(value) for name, value in zip(metrics, row)}), now)
+            for param_set, row in zip(params, results[metrics].itertuples(index=False, name=None))
+        ]
+        with self._lock, self._connection:
+            self._connection.executemany("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?)", rows)
+
+    def top(self, metric='return', n=5, data=None, strategy=None, config=None):
+        """
+        Returns the best stored results by a metric.
+
+        Args:
+            metric (str): One of `RESULT_COLUMNS`; drawdowns rank smallest first.
+            n (int): The number of results.
+            data (str): Only results on this data fingerprint (optional).
+            strategy (str): Only results of this strategy (optional).
+            config (dict): Only results with this configuration (optional).
+
+        Returns:
+            pd.DataFrame: One row per result with 'strategy', the parameters, the
+                          stored metrics, 'config' and 'data', best first.
+        """
+        if metric not in RESULT_COLUMNS:
+            raise ValueError(f"metric must be one of {RESULT_COLUMNS}")
+        filters = [(column, value) for column, value in
+                   (('data', data), ('strategy', strategy), ('config', None if config is None else _key(config)))
+                   if value is not None]
+        where = ' AND '.join(f"{column} = ?" for column, _ in filters) or '1'
+        direction = 'ASC' if metric in LOWER_IS_BETTER else 'DESC'
+        with self._lock:
+            rows = self._connection.execute(
+                f"SELECT strategy, params, metrics, config, data FROM results WHERE {where} "
+                f"ORDER BY json_extract(metrics, ?) {direction} NULLS LAST, created, rowid LIMIT ?",
+                [value for _, value in filters] + [f'$.{metric}', n],
+            ).fetchall()
+
+        records = [{'strategy': name, **json.loads(params), **json.loads(metrics), 'config': config, 'data': key}
+                   for name, params, metrics, config, key in rows]
+        table = pd.DataFrame(records)
+        for column in RESULT_COLUMNS:
+            if column in table:
+                table[column] = table[column].astype(int if column == 'trades' else float)
+        return table
+
+
+@timed('resumable_sweep')
+def resumable_sweep(store, data, strategy, param_grid=None, initial_cash=10000, commission=0.002,
+                    periods_per_year=365, execution=None, cache=None, checkpoint=256, progress=None):
+    """
+    Sweeps a strategy's parameter grid, storing results as it goes.
+
+    Parameter sets already stored for the same data and configuration are
+    skipped, so an interrupted sweep resumes where it stopped and a repeated
+    one costs nothing. Results are committed every `checkpoint` parameter
+    sets, which bounds the work an interruption can lose.
+
+    Args:
+        store (ResultStore): Where results are kept.
+        data (pd.DataFrame or ColumnarData): OHLCV data.
+        strategy (str): The registry name of the strategy.
+        param_grid (dict): Candidate values per constructor argument
+                           (defaults to the strategy's PARAM_GRID).
+        initial_cash (float): The starting cash balance.
+        commission (float): The trading commission fee per trade.
+        periods_per_year (float): Bars per year, used to annualize the metrics.
+        execution (ExecutionModel): How orders are filled (see bot.execution).
+        cache (IndicatorCache): The indicator cache to use (optional).
+        checkpoint (int): How many parameter sets are stored per transaction.
+        progress (callable): Called as progress(done, total) after each checkpoint.
+
+    Returns:
+        tuple: (data key, configuration, number of backtests run), to query the
+               results with `ResultStore.top`.
+    """
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown strategy '{strategy}'. Available: {sorted(STRATEGIES)}")
+    param_grid = param_grid or STRATEGIES[strategy].PARAM_GRID
+    names = list(param_grid)
+    columns = ['close']
+    if execution is not None:
+        columns += [name for name, array in zip(('open', 'volume'), execution.inputs(data)) if array is not None]
+    key = data_fingerprint(data, columns)
+    config = {'initial_cash': initial_cash, 'commission': None if execution is not None else commission,
+              'execution': repr(execution) if execution is not None else None,
+              'periods_per_year': periods_per_year}
+
+    done = store.completed(key, strategy, config)
+    pending = [params for params in parameter_sets(strategy, param_grid) if _key(params) not in done]
+    total = len(done) + len(pending)
+
+    means = columns_of = None
+    if strategy == 'ma_crossover' and pending:
+        # Share one table of rolling means across all checkpoints
+        close = np.asarray(data['close'], dtype=float)
+        windows = sorted({params[name] for params in pending for name in ('short_window', 'long_window')})
+        means, columns_of = rolling_mean_table(close, windows), {w: i for i, w in enumerate(windows)}
+        open_prices, volume = execution.inputs(data) if execution is not None else (None, None)
+
+    for start in range(0, len(pending), checkpoint):
+        chunk = pending[start:start + checkpoint]
+        if means is not None:
+            pairs = [(params['short_window'], params['long_window']) for params in chunk]
+            results = sweep_pairs(close, means, columns_of, pairs, initial_cash, commission,
+                                  performance=True, periods_per_year=periods_per_year,
+                                  execution=execution, open_prices=open_prices, volume=volume)
+        else:
+            results = sweep_parameter_sets(data, strategy, chunk, initial_cash, commission, cache,
+                                           performance=True, periods_per_year=periods_per_year,
+                                           execution=execution, names=names)
+        store.add(key, strategy, config, chunk, results)
+        if progress:
+            progress(len(done) + start + len(chunk), total)
+    return key, config, len(pending)
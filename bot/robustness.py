@@ -0,0 +1,196 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .backtester import positions_from_signals, simulate_long_only
+from .execution import simulate_execution
+from .instrumentation import timed
+from .performance import METRICS, performance_metrics
+from .strategy import STRATEGIES, Strategy, create_strategy
+
+# The ways `simulate_paths` perturbs the price history.
+METHODS = ('bootstrap', 'noise')
+
+
+def bootstrap_indices(n_returns, n_paths, block_size, rng):
+    """
+    Draws a moving-block bootstrap of return indices.
+
+    Each path is stitched together from blocks of `block_size` consecutive
+    returns starting at random bars, which keeps the short-range structure of
+    the returns (volatility clusters, trends) that resampling single returns
+    would destroy.
+
+    Args:
+        n_returns (int): The number of historical returns.
+        n_paths (int): The number of paths.
+        block_size (int): The length of each block.
+        rng (np.random.Generator): The random number generator.
+
+    Returns:
+        np.ndarray: Indices into the returns of shape (n_returns, n_paths).
+    """
+    block_size = max(1, min(block_size, n_returns))
+    n_blocks = -(-n_returns // block_size)
+    starts = rng.integers(0, n_returns - block_size + 1, size=(n_blocks, 1, n_paths))
+    indices = starts + np.arange(block_size)[None, :, None]
+    return indices.reshape(n_blocks * block_size, n_paths)[:n_returns]
+
+
+def simulate_paths(close, n_paths, method='bootstrap', block_size=20, noise=0.0, rng=None, volume=None):
+    """
+    Generates synthetic price paths from a price history.
+
+    The paths start at the first historical price and are built from the
+    historical log returns: 'bootstrap' resamples them in blocks, 'noise'
+    keeps their order. Either way, Gaussian noise with `noise` times the
+    historical return volatility can be added to every return.
+
+    Args:
+        close (np.ndarray): The historical close prices, shape (n,).
+        n_paths (int): The number of paths.
+        method (str): One of `METHODS`.
+        block_size (int): The bootstrap block length in bars.
+        noise (float): The noise volatility relative to the returns' volatility.
+        rng (np.random.Generator): The random number generator (a new unseeded one by default).
+        volume (np.ndarray): Historical volumes, resampled along with the returns (optional).
+
+    Returns:
+        tuple: (close paths, volume paths) of shape (n, n_paths); the volume paths are
+               None without a volume.
+    """
+    if method not in METHODS:
+        raise ValueError(f"method must be one of {METHODS}")
+    rng = rng if rng is not None else np.random.default_rng()
+    close = np.asarray(close, dtype=float)
+    returns = np.diff(np.log(close))
+
+    if method == 'bootstrap':
+        indices = bootstrap_indices(len(returns), n_paths, block_size, rng)
+        path_returns = returns[indices]
+    else:
+        indices = None
+        path_returns = np.repeat(returns[:, None], n_paths, axis=1)
+    if noise and len(returns) > 1:
+        path_returns += rng.normal(0.0, noise * returns.std(ddof=1), path_returns.shape)
+
+    paths = np.empty((len(close), n_paths))
+    paths[0] = close[0]
+    np.cumsum(path_returns, axis=0, out=paths[1:])
+    paths[1:] = close[0] * np.exp(paths[1:])
+
+    volumes = None
+    if volume is not None:
+        volume = np.asarray(volume, dtype=float)
+        if indices is None:
+            volumes = np.repeat(volume[:, None], n_paths, axis=1)
+        else:
+            # A bar's volume travels with the return that ends on it
+            volumes = np.vstack([np.full((1, n_paths), volume[0]), volume[1:][indices]])
+    return paths, volumes
+
+
+def _evaluate_paths(close, volume, strategy, params, n_paths, seed, method, block_size, noise,
+                    initial_cash, commission, periods_per_year, execution):
+    """Generates one batch of paths and backtests the strategy on all of them in one 2-D pass."""
+    rng = np.random.default_rng(seed)
+    paths, volumes = simulate_paths(close, n_paths, method, block_size, noise, rng, volume)
+    _, buy, sell = create_strategy(strategy, **params).entry_exit(paths)
+    position = positions_from_signals(buy, sell)
+
+    if execution is None:
+        _, _, total, _ = simulate_long_only(paths, position, initial_cash, commission)
+    else:
+        # Synthetic paths have no gaps, so each bar opens at the previous close
+        open_prices = np.vstack([paths[:1], paths[:-1]])
+        holdings, _, total, _ = simulate_execution(paths, position, initial_cash, execution, open_prices, volumes)
+        position = holdings > 0
+    return performance_metrics(total, initial_cash, position, periods_per_year)
+
+
+@timed('monte_carlo')
+def monte_carlo(data, strategy, params=None, n_paths=1000, method='bootstrap', block_size=20, noise=0.0,
+                seed=0, initial_cash=10000, commission=0.002, periods_per_year=365, execution=None,
+                workers=1, batch_size=500):
+    """
+    Backtests a strategy on many resampled price paths to see how robust its results are.
+
+    A single backtest is one draw from what the strategy could have earned;
+    replaying it on thousands of plausible alternative histories gives the
+    distribution of its return and drawdown instead. Paths are generated and
+    backtested in batches, each batch as one 2-D array pass, and the batches
+    can be spread across a process pool. Every batch has its own seed derived
+    from `seed`, so results do not depend on the number of workers.
+
+    Args:
+        data (pd.DataFrame or ColumnarData): OHLCV data.
+        strategy (str or Strategy): A registry name, or a strategy whose
+                                    name and parameters are used.
+        params (dict): Constructor arguments when `strategy` is a name (optional).
+        n_paths (int): The number of paths.
+        method (str): One of `METHODS` (see `simulate_paths`).
+        block_size (int): The bootstrap block length in bars.
+        noise (float): The noise volatility relative to the returns' volatility.
+        seed (int): Seeds the paths.
+        initial_cash (float): The starting cash balance.
+        commission (float): The trading commission fee per trade.
+        periods_per_year (float): Bars per year, used to annualize the metrics.
+        execution (ExecutionModel): How orders are filled (see bot.execution).
+        workers (int): Number of worker processes (None for the CPU count).
+                       With 1 worker the paths run in the current process.
+        batch_size (int): How many paths are backtested together.
+
+    Returns:
+        pd.DataFrame: One row per path with the `METRICS` columns.
+    """
+    if isinstance(strategy, Strategy):
+        strategy, params = strategy.name, strategy.params
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown strategy '{strategy}'. Available: {sorted(STRATEGIES)}")
+    if method not in METHODS:
+        raise ValueError(f"method must be one of {METHODS}")
+    params = params or {}
+    create_strategy(strategy, **params)  # fail early on invalid parameters
+
+    close = np.asarray(data['close'], dtype=float)
+    volume = None
+    if execution is not None and execution.max_volume_fraction is not None:
+        _, volume = execution.inputs(data)
+    sizes = [min(batch_size, n_paths - start) for start in range(0, n_paths, batch_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    tasks = [(close, volume, strategy, params, size, batch_seed, method, block_size, noise,
+              initial_cash, commission, periods_per_year, execution)
+             for size, batch_seed in zip(sizes, seeds)]
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(tasks) == 1:
+        parts = [_evaluate_paths(*task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as executor:
+            parts = list(executor.map(_evaluate_paths, *zip(*tasks)))
+
+    return pd.DataFrame({name: np.concatenate([part[name] for part in parts]) if parts else []
+                         for name in METRICS})
+
+
+def robustness_summary(results, metrics=('total_return', 'max_drawdown'),
+                       quantiles=(0.05, 0.25, 0.5, 0.75, 0.95)):
+    """
+    Summarizes the distributions of Monte Carlo results.
+
+    Args:
+        results (pd.DataFrame): The result of `monte_carlo`.
+        metrics (iterable): The metric columns to summarize.
+        quantiles (iterable): The quantiles to report.
+
+    Returns:
+        pd.DataFrame: One row per metric with its mean, standard deviation and quantiles.
+    """
+    metrics = list(metrics)
+    summary = results[metrics].quantile(list(quantiles)).T
+    summary.columns = [f'q{round(q * 100):02d}' for q in quantiles]
+    summary.insert(0, 'std', results[metrics].std())
+    summary.insert(0, 'mean', results[metrics].mean())
+    return summary
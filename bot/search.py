@@ -0,0 +1,236 @@
+import itertools
+import math
+
+import numpy as np
+import pandas as pd
+
+from .backtester import positions_from_signals, simulate_long_only
+from .execution import simulate_execution
+from .indicator_cache import IndicatorCache
+from .instrumentation import timed
+from .performance import LOWER_IS_BETTER, SWEEP_METRICS, performance_metrics
+from .strategy import STRATEGIES, create_strategy
+
+
+def halving_schedule(n_bars, n_configs, eta=3, min_bars=100):
+    """
+    Plans the rungs of successive halving.
+
+    Every rung keeps the best 1/eta of the configurations and evaluates them
+    on an eta times longer prefix of the data; the last rung uses all of it.
+
+    Args:
+        n_bars (int): The length of the full series.
+        n_configs (int): The number of configurations in the first rung.
+        eta (int): The reduction factor between rungs.
+        min_bars (int): The shortest prefix worth evaluating on.
+
+    Returns:
+        list: (configurations, bars) per rung.
+    """
+    rungs = 1
+    while n_bars // eta ** rungs >= min_bars and math.ceil(n_configs / eta ** rungs) > 1:
+        rungs += 1
+    return [(math.ceil(n_configs / eta ** rung), n_bars // eta ** (rungs - 1 - rung)) for rung in range(rungs)]
+
+
+def _cost(schedule, n_bars):
+    """The cost of a halving schedule in full-length backtests."""
+    return sum(configs * bars for configs, bars in schedule) / n_bars
+
+
+class _GridTrials:
+    """
+    Backtests points of a parameter grid on prefixes of one series.
+
+    Grid points are tuples of indices into each parameter's candidate values.
+    Each point's position is computed once over the full series, through the
+    shared indicator cache, and sliced for shorter prefixes: the indicators
+    are causal, so the signals of a prefix are the prefix of the signals.
+    """
+    def __init__(self, data, strategy, param_grid, metric, initial_cash, commission, cache,
+                 periods_per_year, execution):
+        self.strategy = strategy
+        self.names = list(param_grid)
+        self.values = [list(param_grid[name]) for name in self.names]
+        self.metric = metric
+        self.initial_cash = initial_cash
+        self.commission = commission
+        self.cache = cache
+        self.periods_per_year = periods_per_year
+        self.execution = execution
+        self.close = np.asarray(data['close'], dtype=float)
+        self.open_prices, self.volume = execution.inputs(data) if execution is not None else (None, None)
+        self.positions = {}
+        self.rows = []
+        self.cost = 0.0
+
+    def params(self, point):
+        return {name: options[i] for name, options, i in zip(self.names, self.values, point)}
+
+    def valid(self, point):
+        """Whether the strategy accepts the parameters of a grid point."""
+        try:
+            create_strategy(self.strategy, **self.params(point))
+        except ValueError:
+            return False  # e.g. a short window that is not shorter than the long one
+        return True
+
+    def sample(self, count, rng):
+        """
+        Draws up to `count` distinct valid grid points in random order.
+
+        Points are decoded from shuffled flat indices, so the Cartesian
+        product is never built.
+        """
+        sizes = [len(options) for options in self.values]
+        points = []
+        for flat in rng.permutation(math.prod(sizes)):
+            point = tuple(int(i) for i in np.unravel_index(flat, sizes))
+            if self.valid(point):
+                points.append(point)
+                if len(points) == count:
+                    break
+        return points
+
+    def neighbours(self, point):
+        """The valid grid points one step away from `point` along one parameter."""
+        found = []
+        for axis, size in enumerate(len(options) for options in self.values):
+            for step in (-1, 1):
+                if 0 <= point[axis] + step < size:
+                    neighbour = point[:axis] + (point[axis] + step,) + point[axis + 1:]
+                    if self.valid(neighbour):
+                        found.append(neighbour)
+        return found
+
+    def evaluate(self, points, bars, rung):
+        """
+        Backtests grid points on the first `bars` bars in one 2-D pass.
+
+        Returns:
+            list: (key, point) pairs ordered best first, where a lower key is better.
+        """
+        for point in points:
+            if point not in self.positions:
+                strategy = create_strategy(self.strategy, indicator_cache=self.cache, **self.params(point))
+                _, buy, sell = strategy.entry_exit(self.close)
+                self.positions[point] = positions_from_signals(buy, sell)
+        position = np.column_stack([self.positions[point][:bars] for point in points])
+
+        if self.execution is None:
+            _, _, total, trades = simulate_long_only(self.close[:bars], position, self.initial_cash, self.commission)
+        else:
+            holdings, _, total, trades = simulate_execution(
+                self.close[:bars], position, self.initial_cash, self.execution,
+                None if self.open_prices is None else self.open_prices[:bars],
+                None if self.volume is None else self.volume[:bars])
+            position = holdings > 0
+        self.cost += len(points) * bars / len(self.close)
+
+        returns = total[-1] / self.initial_cash - 1
+        scores = returns
+        if self.metric != 'return':
+            scores = performance_metrics(total, self.initial_cash, position, self.periods_per_year)[self.metric]
+
+        # Best first: higher is better unless the metric is a drawdown; NaN ranks last
+        key = np.where(np.isnan(scores), np.inf, scores if self.metric in LOWER_IS_BETTER else -scores)
+        order = np.argsort(key, kind='stable')
+        for i in order:
+            row = {**self.params(points[i]), 'rung': rung, 'bars': bars, 'final_value': total[-1, i],
+                   'return': returns[i], 'trades': int(trades[:, i].sum())}
+            if self.metric != 'return':
+                row[self.metric] = scores[i]
+            self.rows.append((key[i], row))
+        return [(key[i], points[i]) for i in order]
+
+
+@timed('successive_halving')
+def successive_halving(data, strategy, param_grid=None, budget=None, seed=0, eta=3, min_bars=100,
+                       metric='return', initial_cash=10000, commission=0.002, cache=None,
+                       periods_per_year=365, execution=None):
+    """
+    Searches a strategy's parameter grid with successive halving on growing data prefixes.
+
+    The first rung backtests randomly drawn parameter sets on a short prefix
+    of the data; each following rung keeps the best 1/eta of them and
+    backtests those on an eta times longer prefix, ending on the full series.
+    Unpromising parameter sets are thus stopped early and only a few are
+    backtested on all of the data. The rest of the budget is spent climbing
+    from the finalists to better neighbouring grid points on the full series.
+
+    Each rung simulates all of its parameter sets in one 2-D pass, and all
+    of them share one indicator cache.
+
+    Args:
+        data (pd.DataFrame or ColumnarData): OHLCV data.
+        strategy (str): The registry name of the strategy (e.g., 'rsi').
+        param_grid (dict): Candidate values per constructor argument
+                           (defaults to the strategy's PARAM_GRID).
+        budget (float): The maximum cost of the search in full-length backtests,
+                        a backtest on a prefix costing its share of the bars
+                        (defaults to starting with every valid parameter set).
+        seed (int): Seeds the random order in which parameter sets are drawn.
+        eta (int): The reduction factor between rungs (at least 2).
+        min_bars (int): The shortest prefix a rung is evaluated on.
+        metric (str): 'return' or one of `SWEEP_METRICS` to select by.
+        initial_cash (float): The starting cash balance.
+        commission (float): The trading commission fee per trade.
+        cache (IndicatorCache): The cache to use (a new one by default).
+        periods_per_year (float): Bars per year, used to annualize the metrics.
+        execution (ExecutionModel): How orders are filled (see bot.execution).
+
+    Returns:
+        pd.DataFrame: One row per backtest with the parameters, the 'rung', the
+                      prefix length in 'bars', the final value, return and trade
+                      count and, unless selecting by return, the `metric` column.
+                      The backtests on the full series come first, best first,
+                      followed by the earlier rungs.
+    """
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown strategy '{strategy}'. Available: {sorted(STRATEGIES)}")
+    if metric != 'return' and metric not in SWEEP_METRICS:
+        raise ValueError(f"metric must be 'return' or one of {SWEEP_METRICS}")
+    if eta < 2:
+        raise ValueError("eta must be at least 2")
+    param_grid = param_grid or STRATEGIES[strategy].PARAM_GRID
+    trials = _GridTrials(data, strategy, param_grid, metric, initial_cash, commission,
+                         cache if cache is not None else IndicatorCache(), periods_per_year, execution)
+    n_bars = len(trials.close)
+
+    # Size the first rung so that the halving takes at most half of the budget
+    n_configs = math.prod(len(options) for options in trials.values)
+    if budget is not None:
+        while n_configs > 1 and _cost(halving_schedule(n_bars, n_configs, eta, min_bars), n_bars) > budget / 2:
+            n_configs = min(n_configs - 1, int(n_configs * 0.9))
+    points = trials.sample(n_configs, np.random.default_rng(seed))
+    if not points:
+        raise ValueError("The parameter grid has no valid parameter set")
+
+    schedule = halving_schedule(n_bars, len(points), eta, min_bars)
+    for rung, (keep, bars) in enumerate(schedule):
+        ranked = trials.evaluate(points[:keep], bars, rung)
+        points = [point for _, point in ranked]
+
+    # Hill-climb on the full series from each finalist, best first, while the budget lasts
+    tried = set(points)
+    rungs = itertools.count(len(schedule))
+    for best_key, best in ranked:
+        while True:
+            candidates = [point for point in trials.neighbours(best) if point not in tried]
+            if budget is not None:
+                candidates = candidates[:max(int(budget - trials.cost), 0)]
+            if not candidates:
+                break
+            tried.update(candidates)
+            key, point = trials.evaluate(candidates, n_bars, next(rungs))[0]
+            if not key < best_key:
+                break  # no neighbour improves on this point
+            best_key, best = key, point
+
+    full = sorted((item for item in trials.rows if item[1]['bars'] == n_bars), key=lambda item: item[0])
+    partial = sorted((item for item in trials.rows if item[1]['bars'] < n_bars),
+                     key=lambda item: (-item[1]['bars'], item[0]))
+    columns = trials.names + ['rung', 'bars', 'final_value', 'return', 'trades'] + (
+        [metric] if metric != 'return' else [])
+    return pd.DataFrame([row for _, row in full + partial], columns=columns)
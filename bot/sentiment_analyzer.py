@@ -1,42 +1,256 @@
+import asyncio
 import random
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+import numpy as np
+import pandas as pd
+
+from .candle_store import to_milliseconds
+from .instrumentation import metrics, timed
+
+
+class RandomSentimentBackend:
+    """
+    A placeholder for an LLM backend that simulates sentiment scores.
+    """
+    def score(self, symbols):
+        """
+        Scores the market sentiment of several symbols in one call.
+
+        In a real implementation, this method would:
+        1. Fetch recent news and social media data for the symbols.
+        2. Use an LLM to analyze the sentiment of that data in one batched request.
+        3. Return one sentiment score per symbol.
+
+        For now, this method returns random scores to simulate the process.
+
+        Args:
+            symbols (list): The trading symbols (e.g., ['ETH/USD']).
+
+        Returns:
+            list: Sentiment scores between -1 (very negative) and +1 (very positive).
+        """
+        scores = []
+        for symbol in symbols:
+            print(f"INFO: Simulating sentiment analysis for {symbol}.")
+            # In a real scenario, you would make an API call to an LLM here.
+            # e.g., response = gemini.generate_content(f"What is the current market sentiment for {symbol} based on recent news?")
+            # sentiment_score = self._parse_llm_response(response)
+            sentiment_score = random.uniform(-1, 1)
+            print(f"INFO: Simulated sentiment score: {sentiment_score:.2f}")
+            scores.append(sentiment_score)
+        return scores
+
+    def score_series(self, symbol, timestamps):
+        """
+        Scores the sentiment of a symbol at many points in time.
+
+        In a real implementation, each score would come from the news and
+        social media data available at that time. For now, this returns a
+        random walk squashed into [-1, 1].
+
+        Args:
+            symbol (str): The trading symbol (e.g., 'ETH/USD').
+            timestamps (np.ndarray): The times to score, in milliseconds since the epoch.
+
+        Returns:
+            np.ndarray: One sentiment score per timestamp.
+        """
+        print(f"INFO: Simulating sentiment series for {symbol} ({len(timestamps)} points).")
+        return np.tanh(np.cumsum(np.random.normal(0, 0.3, len(timestamps))))
+
+
+class StubSentimentBackend:
+    """
+    A local stand-in for the LLM backend with fixed scores, for tests and benchmarks.
+    """
+    def __init__(self, scores=None, default=0.0, delay=0.0, series=None):
+        """
+        Initializes the StubSentimentBackend.
+
+        Args:
+            scores (dict): Fixed scores keyed by symbol.
+            default (float): The score of symbols not in `scores`.
+            delay (float): Seconds each call sleeps, to mimic model latency.
+            series (dict): Optional callables keyed by symbol that map an array of
+                           millisecond timestamps to scores, used by `score_series`.
+        """
+        self.scores = dict(scores or {})
+        self.series = dict(series or {})
+        self.default = default
+        self.delay = delay
+        self.calls = []
+
+    def score(self, symbols):
+        self.calls.append(list(symbols))
+        if self.delay:
+            time.sleep(self.delay)
+        return [self.scores.get(symbol, self.default) for symbol in symbols]
+
+    def score_series(self, symbol, timestamps):
+        self.calls.append((symbol, len(timestamps)))
+        if symbol in self.series:
+            return np.asarray(self.series[symbol](timestamps), dtype=float)
+        return np.full(len(timestamps), self.scores.get(symbol, self.default), dtype=float)
+
 
 class SentimentAnalyzer:
     """
-    A placeholder for a sentiment analysis module that would use an LLM.
+    Fronts a sentiment backend (an LLM in a real implementation) with a
+    TTL-bounded LRU cache per symbol.
+
+    Concurrent requests for the same symbol share one backend call, symbols
+    requested together are scored in one batched call, and the number of
+    backend calls in flight is capped.
     """
-    def __init__(self):
+    def __init__(self, backend=None, ttl=300.0, max_size=256, max_concurrency=4):
         """
-        In a real implementation, this would initialize the connection to the
-        LLM API (e.g., Google's Gemini).
+        Initializes the SentimentAnalyzer.
+
+        Args:
+            backend: An object whose `score(symbols)` returns one score per symbol
+                     (defaults to RandomSentimentBackend).
+            ttl (float): Seconds a score stays cached.
+            max_size (int): Maximum number of cached symbols.
+            max_concurrency (int): Maximum number of backend calls in flight.
         """
-        pass
+        self.backend = backend or RandomSentimentBackend()
+        self.ttl = ttl
+        self.max_size = max_size
+        self._cache = OrderedDict()
+        self._in_flight = {}
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_concurrency)
 
     def get_sentiment(self, symbol: str) -> float:
         """
         Gets the market sentiment for a given symbol.
 
-        In a real implementation, this method would:
-        1. Fetch recent news and social media data for the symbol.
-        2. Use an LLM to analyze the sentiment of that data.
-        3. Return a sentiment score.
+        Args:
+            symbol (str): The trading symbol (e.g., 'ETH/USD').
+
+        Returns:
+            float: A sentiment score between -1 (very negative) and +1 (very positive).
+        """
+        return self.get_sentiments([symbol])[symbol]
 
-        For now, this method returns a random score to simulate the process.
+    def get_sentiments(self, symbols):
+        """
+        Gets the market sentiment for several symbols, scoring all cache
+        misses in a single backend call.
+
+        Args:
+            symbols (list): The trading symbols.
+
+        Returns:
+            dict: Sentiment scores keyed by symbol.
+        """
+        results, pending, to_score = {}, {}, []
+        with self._lock:
+            now = time.monotonic()
+            for symbol in dict.fromkeys(symbols):
+                cached = self._cache.get(symbol)
+                if cached is not None and cached[0] > now:
+                    self._cache.move_to_end(symbol)
+                    results[symbol] = cached[1]
+                elif symbol in self._in_flight:
+                    pending[symbol] = self._in_flight[symbol]
+                else:
+                    self._in_flight[symbol] = Future()
+                    to_score.append(symbol)
+
+        metrics.increment('sentiment_cache_hits', len(results))
+        metrics.increment('sentiment_cache_misses', len(to_score) + len(pending))
+        if to_score:
+            results.update(self._score(to_score))
+        for symbol, future in pending.items():
+            results[symbol] = future.result()
+        return results
+
+    @timed('sentiment_backend')
+    def _score(self, symbols):
+        """
+        Calls the backend for `symbols` and publishes the scores to waiters and the cache.
+
+        Symbols the backend returns no score for are failed with a ValueError,
+        so no waiter is left blocking on them.
+        """
+        try:
+            with self._slots:
+                scores = dict(zip(symbols, self.backend.score(symbols)))
+        except BaseException as e:
+            with self._lock:
+                for symbol in symbols:
+                    self._in_flight.pop(symbol).set_exception(e)
+            raise
+
+        with self._lock:
+            expires = time.monotonic() + self.ttl
+            for symbol, score in scores.items():
+                self._cache[symbol] = (expires, score)
+                self._cache.move_to_end(symbol)
+                self._in_flight.pop(symbol).set_result(score)
+            while len(self._cache) > self.max_size:
+                self._cache.popitem(last=False)
+            missing = [symbol for symbol in symbols if symbol not in scores]
+            error = ValueError(f"The sentiment backend returned no score for {missing}")
+            for symbol in missing:
+                self._in_flight.pop(symbol).set_exception(error)
+        if missing:
+            raise error
+        return scores
+
+    def get_sentiment_series(self, symbol, index, store=None, exchange='kraken'):
+        """
+        Gets a timestamped sentiment series covering `index`.
+
+        Every timestamp is scored once. With a candle store, previously
+        computed scores are loaded from it, only new timestamps are sent to
+        the backend, and the merged series is saved next to the symbol's
+        candles, so backtests can reuse it without any model calls.
 
         Args:
             symbol (str): The trading symbol (e.g., 'ETH/USD').
+            index (pd.DatetimeIndex): The times to score, typically candle times.
+            store (CandleStore): An optional store to load and save the series.
+            exchange (str): The exchange the series is stored under.
 
         Returns:
-            float: A sentiment score between -1 (very negative) and +1 (very positive).
+            pd.Series: Sentiment scores named 'sentiment', indexed by timestamp.
         """
-        print(f"INFO: Simulating sentiment analysis for {symbol}.")
-        # In a real scenario, you would make an API call to an LLM here.
-        # e.g., response = gemini.generate_content(f"What is the current market sentiment for {symbol} based on recent news?")
-        # sentiment_score = self._parse_llm_response(response)
+        stored = store.load_series(exchange, symbol, 'sentiment', 'sentiment') if store else None
+        timestamps = np.unique(to_milliseconds(index))
+        if stored is not None:
+            timestamps = np.setdiff1d(timestamps, to_milliseconds(stored.index))
+        if len(timestamps) == 0:
+            return stored
+
+        series = pd.Series(
+            np.asarray(self.backend.score_series(symbol, timestamps), dtype=float),
+            index=pd.DatetimeIndex(pd.to_datetime(timestamps, unit='ms'), name='timestamp'),
+            name='sentiment',
+        )
+        if stored is not None:
+            series = pd.concat([stored, series]).sort_index()
+        if store is not None:
+            store.write(exchange, symbol, 'sentiment', series.to_frame())
+        return series
+
+    async def aget_sentiment(self, symbol: str) -> float:
+        """Async version of `get_sentiment` that does not block the event loop."""
+        return (await self.aget_sentiments([symbol]))[symbol]
 
-        sentiment_score = random.uniform(-1, 1)
-        print(f"INFO: Simulated sentiment score: {sentiment_score:.2f}")
+    async def aget_sentiments(self, symbols):
+        """Async version of `get_sentiments` that does not block the event loop."""
+        return await asyncio.to_thread(self.get_sentiments, list(symbols))
 
-        return sentiment_score
+    def clear(self):
+        """Drops every cached score."""
+        with self._lock:
+            self._cache.clear()
 
 if __name__ == '__main__':
     analyzer = SentimentAnalyzer()
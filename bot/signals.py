@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+
+# Trading signals are carried as int8 codes; the strings are only an output view.
+SELL = -1
+HOLD = 0
+BUY = 1
+SIGNAL_LABELS = ['sell', 'hold', 'buy']  # Indexed by code + 1
+
+
+def encode_signals(signals):
+    """
+    Converts trading signals to int8 codes.
+
+    Args:
+        signals (array-like): int8 codes (SELL, HOLD, BUY), or the labels
+            'sell', 'hold' and 'buy' as strings or a Categorical.
+
+    Returns:
+        np.ndarray: An int8 array of signal codes.
+    """
+    values = np.asarray(signals)
+    if values.dtype.kind in 'iub':
+        if values.size and (values.min() < SELL or values.max() > BUY):
+            raise ValueError("signal codes must be -1 (sell), 0 (hold) or 1 (buy)")
+        return values.astype(np.int8, copy=False)
+
+    codes = np.zeros(len(values), dtype=np.int8)
+    is_buy = values == 'buy'
+    is_sell = values == 'sell'
+    if not (is_buy | is_sell | (values == 'hold')).all():
+        raise ValueError("signal labels must be 'sell', 'hold' or 'buy'")
+    codes[is_buy] = BUY
+    codes[is_sell] = SELL
+    return codes
+
+
+def decode_signals(codes):
+    """
+    Presents signal codes as 'sell'/'hold'/'buy' labels.
+
+    Args:
+        codes (array-like): int8 signal codes, optionally as a pd.Series.
+
+    Returns:
+        pd.Categorical: The labels, or a categorical pd.Series with the same
+                        index and name when `codes` is a Series.
+    """
+    labels = pd.Categorical.from_codes(encode_signals(codes) + 1, categories=SIGNAL_LABELS)
+    if isinstance(codes, pd.Series):
+        return pd.Series(labels, index=codes.index, name=codes.name)
+    return labels
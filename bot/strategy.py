@@ -1,13 +1,303 @@
 import pandas as pd
 import numpy as np
 
-from .sentiment_analyzer import SentimentAnalyzer
+from .candle_store import to_milliseconds
+from .data_source import ColumnarData
+from .indicator_cache import fingerprint
+from .indicators import INDICATORS, RunningMean
+from .instrumentation import timed
+from .resample import align_to_bars, bar_milliseconds, resample_ohlcv
+from .signals import BUY, HOLD, SELL, decode_signals
 
-class MovingAverageCrossoverStrategy:
+def sentiment_asof(timestamps, sentiment):
+    """
+    Looks up the latest sentiment score at or before each timestamp.
+
+    Args:
+        timestamps (np.ndarray): Bar times in milliseconds since the epoch.
+        sentiment (pd.Series): Sentiment scores indexed by timestamp.
+
+    Returns:
+        np.ndarray: One score per bar, NaN for bars before the first score.
+    """
+    if len(sentiment) == 0:
+        return np.full(len(timestamps), np.nan)
+    sentiment = sentiment.sort_index()
+    position = np.searchsorted(to_milliseconds(sentiment.index), timestamps, side='right') - 1
+    scores = sentiment.to_numpy(dtype=float)[np.maximum(position, 0)]
+    scores[position < 0] = np.nan
+    return scores
+
+STRATEGIES = {}
+
+
+def register_strategy(name):
+    """
+    Registers a Strategy subclass under `name` so that it can be created by name.
+
+    Args:
+        name (str): The registry name (e.g., 'ma_crossover').
+
+    Returns:
+        callable: A class decorator.
+    """
+    def register(cls):
+        cls.name = name
+        STRATEGIES[name] = cls
+        return cls
+    return register
+
+
+def create_strategy(name, **params):
+    """
+    Creates a registered strategy.
+
+    Args:
+        name (str): The registry name of the strategy.
+        **params: Keyword arguments for the strategy's constructor.
+
+    Returns:
+        Strategy: The new strategy instance.
+    """
+    if name not in STRATEGIES:
+        raise ValueError(f"Unknown strategy '{name}'. Available: {sorted(STRATEGIES)}")
+    return STRATEGIES[name](**params)
+
+
+def check_params(name, params, max_window):
+    """
+    Validates untrusted strategy parameters before a strategy is created.
+
+    Only the parameters of the strategy's `PARAM_GRID` are accepted, so the
+    other constructor arguments (the sentiment inputs and the indicator
+    cache) cannot be passed in, and lookback windows must be integers
+    between 1 and `max_window`, which bounds the memory a strategy can ask for.
+
+    Args:
+        name (str): The registry name of the strategy.
+        params (dict): The parameters to check.
+        max_window (int): The longest lookback window allowed, in bars.
+
+    Returns:
+        dict: `params`, unchanged.
+
+    Raises:
+        ValueError: If the strategy is unknown or a parameter is not accepted.
+    """
+    if name not in STRATEGIES:
+        raise ValueError(f"Unknown strategy '{name}'. Available: {sorted(STRATEGIES)}")
+    cls = STRATEGIES[name]
+    unknown = set(params) - set(cls.PARAM_GRID)
+    if unknown:
+        raise ValueError(f"Unknown parameters for '{name}': {sorted(unknown)}")
+    for param, value in params.items():
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise ValueError(f"'{param}' must be a number")
+        if param in cls.WINDOWS and (not isinstance(value, int) or not 1 <= value <= max_window):
+            raise ValueError(f"'{param}' must be an integer between 1 and {max_window}")
+    return params
+
+
+class Strategy:
+    """
+    Base class of the trading strategies.
+
+    Subclasses compute their indicator columns in `indicators(close)` and turn
+    them into buy and sell masks in `signal_masks`; the base class applies the
+    sentiment overrides and builds the signal columns. Indicators requested
+    through `indicator` are shared via an optional IndicatorCache, so that
+    strategies and parameter sets needing e.g. SMA(50) of the same series
+    compute it once.
+    """
+    name = None
+    # Parameter values searched by the optimizer, keyed by constructor argument.
+    PARAM_GRID = {}
+    # The parameters that are lookback windows, in bars.
+    WINDOWS = ()
+
+    def __init__(self, sentiment_analyzer=None, sentiment=None, indicator_cache=None):
+        """
+        Initializes the Strategy.
+
+        Args:
+            sentiment_analyzer: An instance of SentimentAnalyzer (optional).
+            sentiment (pd.Series): A timestamped sentiment series (optional). When
+                given, each bar uses the latest score at or before it instead of
+                a single score from the sentiment analyzer.
+            indicator_cache (IndicatorCache): A cache shared with other strategies (optional).
+        """
+        self.sentiment_analyzer = sentiment_analyzer
+        self.sentiment = sentiment
+        self.indicator_cache = indicator_cache
+        self._close_key = None
+
+    @property
+    def params(self):
+        """dict: The strategy's parameters, keyed like `PARAM_GRID`."""
+        return {name: getattr(self, name) for name in self.PARAM_GRID}
+
+    def indicator(self, close, name, *params):
+        """
+        Computes an indicator of `close`, going through the indicator cache if any.
+
+        Args:
+            close (np.ndarray): Close prices of shape (n,) or (n, k).
+            name (str): A key of `bot.indicators.INDICATORS` (e.g., 'sma').
+            *params: The indicator parameters (e.g., the window).
+
+        Returns:
+            np.ndarray: The indicator values, shaped like `close`.
+        """
+        compute = INDICATORS[name]
+        if self.indicator_cache is None:
+            return compute(close, *params)
+        # Hash each close array once per `entry_exit` call, not once per indicator
+        if self._close_key is None or self._close_key[0] is not close:
+            self._close_key = (close, fingerprint(close))
+        return self.indicator_cache.get(self._close_key[1], name, params, lambda: compute(close, *params))
+
+    def higher_timeframe(self, data, timeframe, name, *params, base_timeframe=None):
+        """
+        Computes an indicator on coarser bars and aligns it onto the bars of `data`.
+
+        The coarse bars are resampled from `data` itself, and each bar only
+        sees coarse bars that have closed by the time it closes, so e.g. a
+        daily trend filter on hourly bars never peeks at the rest of the day.
+
+        Args:
+            data (pd.DataFrame or ColumnarData): OHLCV data indexed by timestamp.
+            timeframe (str): The coarse timeframe (e.g., '1d').
+            name (str): A key of `bot.indicators.INDICATORS` (e.g., 'sma').
+            *params: The indicator parameters (e.g., the window).
+            base_timeframe (str): The timeframe of `data` (inferred from its timestamps by default).
+
+        Returns:
+            np.ndarray: One indicator value per bar of `data`, NaN until enough coarse bars closed.
+        """
+        bars = resample_ohlcv(data, timeframe)
+        values = self.indicator(bars['close'].to_numpy(dtype=float), name, *params)
+        timestamps = data.timestamps if isinstance(data, ColumnarData) else to_milliseconds(data.index)
+        base = base_timeframe if base_timeframe is not None else bar_milliseconds(data)
+        return align_to_bars(values, to_milliseconds(bars.index), timeframe, timestamps, base)
+
+    def indicators(self, close):
+        """
+        Computes the strategy's indicator columns.
+
+        Args:
+            close (np.ndarray): Close prices of shape (n,), or (n, k) for k symbols.
+
+        Returns:
+            dict: Indicator arrays shaped like `close`, keyed by column name.
+        """
+        raise NotImplementedError
+
+    def signal_masks(self, close, indicators):
+        """
+        Turns the indicator columns into technical buy and sell masks.
+
+        Args:
+            close (np.ndarray): Close prices of shape (n,) or (n, k).
+            indicators (dict): The result of `indicators(close)`.
+
+        Returns:
+            tuple: (buy, sell) boolean arrays shaped like `close`, never both True.
+        """
+        raise NotImplementedError
+
+    def entry_exit(self, close):
+        """
+        Computes the indicator columns and technical buy and sell masks of one or many series.
+
+        Args:
+            close (np.ndarray): Close prices of shape (n,), or (n, k) for k symbols.
+
+        Returns:
+            tuple: (indicators, buy, sell) as returned by `indicators` and `signal_masks`.
+        """
+        close = np.asarray(close)
+        try:
+            indicators = self.indicators(close)
+            buy, sell = self.signal_masks(close, indicators)
+        finally:
+            self._close_key = None
+        return indicators, buy, sell
+
+    @timed('generate_signals')
+    def generate_signals(self, data: pd.DataFrame, symbol: str = 'ETH/USD', sentiment=None) -> pd.DataFrame:
+        """
+        Generates trading signals from the strategy's indicators and sentiment.
+
+        Args:
+            data (pd.DataFrame or ColumnarData): OHLCV data. A ColumnarData is
+                extended with the signal columns instead of being copied.
+            symbol (str): The trading symbol, used for sentiment analysis.
+            sentiment (pd.Series): A timestamped sentiment series overriding the
+                one given to the constructor. It is joined onto the bars as of
+                each bar's time, so a score only affects bars at or after it.
+
+        Returns:
+            pd.DataFrame: The input DataFrame with signals (a ColumnarData for ColumnarData input).
+                          The 'signal' column holds int8 codes (BUY, SELL or HOLD);
+                          use `decode_signals` for the 'buy'/'sell'/'hold' labels.
+        """
+        close = np.asarray(data['close'])
+        indicators, buy, sell = self.entry_exit(close)
+
+        # Generate technical signal
+        signal = np.full(len(close), HOLD, dtype=np.int8)
+        signal[buy] = BUY
+        signal[sell] = SELL
+
+        # If sentiment is available, use it to adjust the signal bar by bar
+        sentiment = sentiment if sentiment is not None else self.sentiment
+        sentiment_score = None
+        if sentiment is not None:
+            timestamps = data.timestamps if isinstance(data, ColumnarData) else to_milliseconds(data.index)
+            sentiment_score = sentiment_asof(timestamps, sentiment)
+        elif self.sentiment_analyzer:
+            sentiment_score = self.sentiment_analyzer.get_sentiment(symbol)
+
+        if sentiment_score is not None:
+            # Override buy signals where sentiment is very negative
+            signal[(signal == BUY) & (sentiment_score < -0.5)] = HOLD
+
+            # Override sell signals where sentiment is very positive
+            signal[(signal == SELL) & (sentiment_score > 0.5)] = HOLD
+
+        if isinstance(data, ColumnarData):
+            return data.with_columns(signal=signal, **indicators)
+
+        signals = data.copy()
+        for column, values in indicators.items():
+            signals[column] = values
+        signals['signal'] = signal
+        return signals
+
+    def reset(self):
+        """Clears the state used by the incremental `update` API."""
+
+    def update(self, close, sentiment_score=None):
+        """
+        Feeds one new candle close and returns the updated signal.
+
+        Returns:
+            tuple: The strategy's indicator values for the new candle, followed
+                   by a BUY, SELL or HOLD signal code.
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support incremental updates")
+
+
+@register_strategy('ma_crossover')
+class MovingAverageCrossoverStrategy(Strategy):
     """
     A moving average crossover trading strategy enhanced with sentiment analysis.
     """
-    def __init__(self, short_window=50, long_window=200, sentiment_analyzer=None):
+    PARAM_GRID = {'short_window': tuple(range(10, 60, 5)), 'long_window': tuple(range(50, 250, 10))}
+    WINDOWS = ('short_window', 'long_window')
+
+    def __init__(self, short_window=50, long_window=200, sentiment_analyzer=None, sentiment=None,
+                 indicator_cache=None):
         """
         Initializes the MovingAverageCrossoverStrategy.
 
@@ -15,46 +305,189 @@ class MovingAverageCrossoverStrategy:
             short_window (int): The lookback period for the short moving average.
             long_window (int): The lookback period for the long moving average.
             sentiment_analyzer: An instance of SentimentAnalyzer (optional).
+            sentiment (pd.Series): A timestamped sentiment series (optional). When
+                given, each bar uses the latest score at or before it instead of
+                a single score from the sentiment analyzer.
+            indicator_cache (IndicatorCache): A cache shared with other strategies (optional).
         """
         if short_window >= long_window:
             raise ValueError("short_window must be less than long_window")
+        super().__init__(sentiment_analyzer, sentiment, indicator_cache)
         self.short_window = short_window
         self.long_window = long_window
-        self.sentiment_analyzer = sentiment_analyzer
+        self.reset()
 
-    def generate_signals(self, data: pd.DataFrame, symbol: str = 'ETH/USD') -> pd.DataFrame:
+    def indicators(self, close):
+        short_mavg, long_mavg = self.moving_averages(close)
+        return {'short_mavg': short_mavg, 'long_mavg': long_mavg}
+
+    def signal_masks(self, close, indicators):
+        short_mavg, long_mavg = indicators['short_mavg'], indicators['long_mavg']
+        return short_mavg > long_mavg, short_mavg < long_mavg
+
+    def moving_averages(self, close):
         """
-        Generates trading signals based on MA crossover and sentiment.
+        Computes the short and long moving averages of one or many series.
 
         Args:
-            data (pd.DataFrame): A DataFrame containing OHLCV data.
-            symbol (str): The trading symbol, used for sentiment analysis.
+            close (np.ndarray): Close prices of shape (n,), or (n, k) for k symbols.
 
         Returns:
-            pd.DataFrame: The input DataFrame with signals.
+            tuple: (short_mavg, long_mavg) arrays shaped like `close`.
         """
-        signals = data.copy()
-        signals['short_mavg'] = signals['close'].rolling(window=self.short_window, min_periods=1).mean()
-        signals['long_mavg'] = signals['close'].rolling(window=self.long_window, min_periods=1).mean()
+        return self.indicator(close, 'sma', self.short_window), self.indicator(close, 'sma', self.long_window)
 
-        # Generate technical signal
-        signals['signal'] = 'hold'
-        signals.loc[signals['short_mavg'] > signals['long_mavg'], 'signal'] = 'buy'
-        signals.loc[signals['short_mavg'] < signals['long_mavg'], 'signal'] = 'sell'
+    def reset(self):
+        """Clears the state used by the incremental `update` API."""
+        self._short_mavg = RunningMean(self.short_window)
+        self._long_mavg = RunningMean(self.long_window)
 
-        # If a sentiment analyzer is provided, use it to adjust the signal
-        if self.sentiment_analyzer:
-            sentiment_score = self.sentiment_analyzer.get_sentiment(symbol)
+    def update(self, close, sentiment_score=None):
+        """
+        Feeds one new candle close and returns the updated signal in O(1).
 
-            # Override buy signal if sentiment is very negative
-            if sentiment_score < -0.5:
-                signals.loc[signals['signal'] == 'buy', 'signal'] = 'hold'
+        Replaying a series through `update` gives exactly the moving averages
+        and signals that `generate_signals` computes for the whole series, so
+        live trading and backtests agree.
 
-            # Override sell signal if sentiment is very positive
-            if sentiment_score > 0.5:
-                signals.loc[signals['signal'] == 'sell', 'signal'] = 'hold'
+        Args:
+            close (float): The close price of the new candle.
+            sentiment_score (float): An optional sentiment score for this candle,
+                                     applied like the score in `generate_signals`.
 
-        return signals
+        Returns:
+            tuple: (short_mavg, long_mavg, signal) for the new candle, with the
+                   signal as a BUY, SELL or HOLD code.
+        """
+        short_mavg = self._short_mavg.update(close)
+        long_mavg = self._long_mavg.update(close)
+
+        signal = HOLD
+        if short_mavg > long_mavg:
+            signal = BUY
+        elif short_mavg < long_mavg:
+            signal = SELL
+
+        if sentiment_score is not None:
+            if signal == BUY and sentiment_score < -0.5:
+                signal = HOLD
+            elif signal == SELL and sentiment_score > 0.5:
+                signal = HOLD
+
+        return short_mavg, long_mavg, signal
+
+    def update_many(self, closes, sentiment_score=None):
+        """
+        Feeds a small batch of new candle closes through `update`.
+
+        Returns:
+            list: One (short_mavg, long_mavg, signal) tuple per close.
+        """
+        return [self.update(close, sentiment_score) for close in closes]
+
+
+@register_strategy('ema_crossover')
+class EMACrossoverStrategy(Strategy):
+    """
+    An exponential moving average crossover strategy: long while the short EMA
+    is above the long one.
+    """
+    PARAM_GRID = {'short_span': tuple(range(10, 60, 5)), 'long_span': tuple(range(50, 250, 10))}
+    WINDOWS = ('short_span', 'long_span')
+
+    def __init__(self, short_span=12, long_span=26, sentiment_analyzer=None, sentiment=None,
+                 indicator_cache=None):
+        """
+        Initializes the EMACrossoverStrategy.
+
+        Args:
+            short_span (int): The span of the short exponential moving average.
+            long_span (int): The span of the long exponential moving average.
+            sentiment_analyzer, sentiment, indicator_cache: See `Strategy`.
+        """
+        if short_span >= long_span:
+            raise ValueError("short_span must be less than long_span")
+        super().__init__(sentiment_analyzer, sentiment, indicator_cache)
+        self.short_span = short_span
+        self.long_span = long_span
+
+    def indicators(self, close):
+        return {'short_ema': self.indicator(close, 'ema', self.short_span),
+                'long_ema': self.indicator(close, 'ema', self.long_span)}
+
+    def signal_masks(self, close, indicators):
+        short_ema, long_ema = indicators['short_ema'], indicators['long_ema']
+        return short_ema > long_ema, short_ema < long_ema
+
+
+@register_strategy('rsi')
+class RSIStrategy(Strategy):
+    """
+    A mean-reversion strategy on the relative strength index: buys when the
+    market is oversold and sells when it is overbought.
+    """
+    PARAM_GRID = {'window': (7, 14, 21, 28), 'oversold': (20, 25, 30, 35), 'overbought': (65, 70, 75, 80)}
+    WINDOWS = ('window',)
+
+    def __init__(self, window=14, oversold=30, overbought=70, sentiment_analyzer=None, sentiment=None,
+                 indicator_cache=None):
+        """
+        Initializes the RSIStrategy.
+
+        Args:
+            window (int): The RSI lookback period.
+            oversold (float): Buy below this RSI level.
+            overbought (float): Sell above this RSI level.
+            sentiment_analyzer, sentiment, indicator_cache: See `Strategy`.
+        """
+        if oversold >= overbought:
+            raise ValueError("oversold must be less than overbought")
+        super().__init__(sentiment_analyzer, sentiment, indicator_cache)
+        self.window = window
+        self.oversold = oversold
+        self.overbought = overbought
+
+    def indicators(self, close):
+        return {'rsi': self.indicator(close, 'rsi', self.window)}
+
+    def signal_masks(self, close, indicators):
+        rsi = indicators['rsi']
+        return rsi < self.oversold, rsi > self.overbought
+
+
+@register_strategy('bollinger')
+class BollingerBandsStrategy(Strategy):
+    """
+    A mean-reversion strategy on Bollinger Bands: buys when the close drops
+    below the lower band and sells when it rises above the upper band.
+    """
+    PARAM_GRID = {'window': (10, 20, 30, 50), 'num_std': (1.5, 2.0, 2.5, 3.0)}
+    WINDOWS = ('window',)
+
+    def __init__(self, window=20, num_std=2.0, sentiment_analyzer=None, sentiment=None,
+                 indicator_cache=None):
+        """
+        Initializes the BollingerBandsStrategy.
+
+        Args:
+            window (int): The lookback period of the middle band and the deviation.
+            num_std (float): The band width in standard deviations.
+            sentiment_analyzer, sentiment, indicator_cache: See `Strategy`.
+        """
+        if num_std <= 0:
+            raise ValueError("num_std must be positive")
+        super().__init__(sentiment_analyzer, sentiment, indicator_cache)
+        self.window = window
+        self.num_std = num_std
+
+    def indicators(self, close):
+        # The middle band is the same SMA the crossover strategies use, so it is shared in the cache
+        middle = self.indicator(close, 'sma', self.window)
+        width = self.num_std * self.indicator(close, 'std', self.window)
+        return {'middle_band': middle, 'upper_band': middle + width, 'lower_band': middle - width}
+
+    def signal_masks(self, close, indicators):
+        return close < indicators['lower_band'], close > indicators['upper_band']
 
 if __name__ == '__main__':
     # Example usage with some dummy data
@@ -66,7 +499,7 @@ if __name__ == '__main__':
     signals_df = strategy.generate_signals(dummy_data)
 
     print("Signals DataFrame:")
-    print(signals_df.tail(10))
+    print(signals_df.assign(signal=decode_signals(signals_df['signal'])).tail(10))
 
     # You can also plot the results to visualize the strategy
     try:
@@ -77,13 +510,13 @@ if __name__ == '__main__':
         plt.plot(signals_df['long_mavg'], label='Long MA', alpha=0.7)
 
         # Plot buy signals
-        plt.plot(signals_df[signals_df['signal'] == 'buy'].index,
-                 signals_df['short_mavg'][signals_df['signal'] == 'buy'],
+        plt.plot(signals_df[signals_df['signal'] == BUY].index,
+                 signals_df['short_mavg'][signals_df['signal'] == BUY],
                  '^', markersize=10, color='g', lw=0, label='Buy Signal')
 
         # Plot sell signals
-        plt.plot(signals_df[signals_df['signal'] == 'sell'].index,
-                 signals_df['short_mavg'][signals_df['signal'] == 'sell'],
+        plt.plot(signals_df[signals_df['signal'] == SELL].index,
+                 signals_df['short_mavg'][signals_df['signal'] == SELL],
                  'v', markersize=10, color='r', lw=0, label='Sell Signal')
 
         plt.title('Moving Average Crossover Strategy')
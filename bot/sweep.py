@@ -0,0 +1,349 @@
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+from .backtester import forward_fill, positions_from_signals, simulate_long_only
+from .execution import simulate_execution
+from .indicator_cache import IndicatorCache
+from .instrumentation import timed
+from .indicators import mean_from_prefix, prefix_sums, rolling_mean_table, valid_counts
+from .parallel import SharedArrays, attach_shared
+from .performance import SWEEP_METRICS, performance_metrics
+from .strategy import STRATEGIES, create_strategy
+
+
+def parameter_grid(short_windows, long_windows):
+    """
+    Lists the valid (short, long) window pairs in Cartesian-product order.
+
+    Args:
+        short_windows (iterable): Candidate short moving-average windows.
+        long_windows (iterable): Candidate long moving-average windows.
+
+    Returns:
+        list: (short_window, long_window) tuples with short < long.
+    """
+    return [(int(sw), int(lw)) for sw, lw in itertools.product(short_windows, long_windows) if sw < lw]
+
+
+@timed('sweep_ma_crossover')
+def sweep_ma_crossover(data, short_windows, long_windows, initial_cash=10000, commission=0.002,
+                       chunk_size=32, performance=False, periods_per_year=365, execution=None):
+    """
+    Backtests every moving average crossover pair of a grid in one pass.
+
+    Each distinct rolling mean is computed once from a shared cumulative-sum
+    table, then signals and equity curves for a block of pairs are produced
+    as 2-D array operations with the same semantics as `Backtester`.
+
+    Args:
+        data (pd.DataFrame): A DataFrame containing OHLCV data.
+        short_windows (iterable): Candidate short moving-average windows.
+        long_windows (iterable): Candidate long moving-average windows.
+        initial_cash (float): The starting cash balance.
+        commission (float): The trading commission fee per trade.
+        chunk_size (int): How many pairs are simulated together, bounding memory use.
+        performance (bool): Also compute the `SWEEP_METRICS` columns (Sharpe,
+                            drawdown, ...) from each block's equity curves.
+        periods_per_year (float): Bars per year, used to annualize the metrics.
+        execution (ExecutionModel): How orders are filled (see bot.execution); by
+                                    default at the signal bar's close paying `commission`.
+
+    Returns:
+        pd.DataFrame: One row per pair with its final value, return and trade count.
+    """
+    pairs = parameter_grid(short_windows, long_windows)
+    close = data['close'].to_numpy(dtype=float)
+    windows = sorted({w for pair in pairs for w in pair})
+    means = rolling_mean_table(close, windows)
+    open_prices, volume = execution.inputs(data) if execution is not None else (None, None)
+    return sweep_pairs(close, means, {w: i for i, w in enumerate(windows)}, pairs,
+                        initial_cash, commission, chunk_size, performance, periods_per_year,
+                        execution, open_prices, volume)
+
+
+@timed('sweep_strategy')
+def sweep_strategy(data, strategy, param_grid=None, initial_cash=10000, commission=0.002, cache=None,
+                   performance=False, periods_per_year=365, execution=None):
+    """
+    Backtests every parameter set of any registered strategy on one series.
+
+    All parameter sets share an IndicatorCache, so each distinct indicator
+    (e.g. SMA(20), used by both the crossover and the Bollinger strategies)
+    is computed once for the whole sweep.
+
+    Args:
+        data (pd.DataFrame or ColumnarData): OHLCV data.
+        strategy (str): The registry name of the strategy (e.g., 'rsi').
+        param_grid (dict): Candidate values per constructor argument
+                           (defaults to the strategy's PARAM_GRID).
+        initial_cash (float): The starting cash balance.
+        commission (float): The trading commission fee per trade.
+        cache (IndicatorCache): The cache to use (a new one by default).
+        performance (bool): Also compute the `SWEEP_METRICS` columns.
+        periods_per_year (float): Bars per year, used to annualize the metrics.
+        execution (ExecutionModel): How orders are filled (see bot.execution).
+
+    Returns:
+        pd.DataFrame: One row per valid parameter set with its parameters,
+                      final value, return and trade count.
+    """
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown strategy '{strategy}'. Available: {sorted(STRATEGIES)}")
+    param_grid = param_grid or STRATEGIES[strategy].PARAM_GRID
+    return sweep_parameter_sets(data, strategy, parameter_sets(strategy, param_grid), initial_cash, commission,
+                                cache, performance, periods_per_year, execution, names=list(param_grid))
+
+
+def parameter_sets(strategy, param_grid=None):
+    """
+    Lists the parameter sets of a strategy's grid that the strategy accepts.
+
+    Args:
+        strategy (str): The registry name of the strategy.
+        param_grid (dict): Candidate values per constructor argument
+                           (defaults to the strategy's PARAM_GRID).
+
+    Returns:
+        list: Parameter dicts in Cartesian-product order.
+    """
+    param_grid = param_grid or STRATEGIES[strategy].PARAM_GRID
+    names = list(param_grid)
+    sets = []
+    for values in itertools.product(*(param_grid[name] for name in names)):
+        params = dict(zip(names, values))
+        try:
+            create_strategy(strategy, **params)
+        except ValueError:
+            continue  # e.g. a short window that is not shorter than the long one
+        sets.append(params)
+    return sets
+
+
+def sweep_parameter_sets(data, strategy, param_sets, initial_cash=10000, commission=0.002, cache=None,
+                         performance=False, periods_per_year=365, execution=None, names=None):
+    """
+    Backtests a list of parameter sets of a registered strategy on one series.
+
+    Args:
+        data (pd.DataFrame or ColumnarData): OHLCV data.
+        strategy (str): The registry name of the strategy.
+        param_sets (list): Parameter dicts, e.g. from `parameter_sets`.
+        names (list): The parameter columns (defaults to the first set's keys).
+        Others: See `sweep_strategy`.
+
+    Returns:
+        pd.DataFrame: One row per parameter set, as `sweep_strategy` returns.
+    """
+    cache = cache if cache is not None else IndicatorCache()
+    close = np.asarray(data['close'], dtype=float)
+    open_prices, volume = execution.inputs(data) if execution is not None else (None, None)
+
+    rows = []
+    names = names if names is not None else list(param_sets[0]) if param_sets else []
+    for params in param_sets:
+        instance = create_strategy(strategy, indicator_cache=cache, **params)
+        _, buy, sell = instance.entry_exit(close)
+        position = positions_from_signals(buy, sell)
+        if execution is None:
+            _, _, total, trades = simulate_long_only(close, position, initial_cash, commission)
+        else:
+            holdings, _, total, trades = simulate_execution(close, position, initial_cash, execution,
+                                                            open_prices, volume)
+            position = holdings > 0
+        final_value = total[-1] if len(total) else float(initial_cash)
+        row = {**params, 'final_value': final_value,
+               'return': final_value / initial_cash - 1, 'trades': int(trades.sum())}
+        if performance:
+            stats = performance_metrics(total, initial_cash, position, periods_per_year)
+            row.update((name, stats[name]) for name in SWEEP_METRICS)
+        rows.append(row)
+    columns = names + ['final_value', 'return', 'trades'] + (list(SWEEP_METRICS) if performance else [])
+    return pd.DataFrame(rows, columns=columns)
+
+
+def parallel_sweep(data, short_windows, long_windows, initial_cash=10000, commission=0.002,
+                   workers=None, chunk_size=32, tasks_per_worker=4, progress=None,
+                   performance=False, periods_per_year=365, execution=None, cache_bytes=256 * 2 ** 20):
+    """
+    Runs `sweep_ma_crossover` with the grid split across a process pool.
+
+    The close prices, and the open prices and volumes if the execution model
+    needs them, are published once through shared memory. Every worker
+    computes the rolling means it needs from them and keeps the most recently
+    used ones, up to `cache_bytes`, for the tasks it runs later. Results come
+    back in grid order regardless of which task finishes first.
+
+    Args:
+        data (pd.DataFrame): A DataFrame containing OHLCV data.
+        short_windows (iterable): Candidate short moving-average windows.
+        long_windows (iterable): Candidate long moving-average windows.
+        initial_cash (float): The starting cash balance.
+        commission (float): The trading commission fee per trade.
+        workers (int): Number of worker processes (defaults to the CPU count).
+                       With 1 worker the sweep runs in the current process.
+        chunk_size (int): How many pairs each worker simulates together.
+        tasks_per_worker (int): How many tasks the grid is split into per worker.
+        progress (callable): Called as progress(done, total) with pair counts
+                             each time a task finishes.
+        performance (bool): Also compute the `SWEEP_METRICS` columns.
+        periods_per_year (float): Bars per year, used to annualize the metrics.
+        execution (ExecutionModel): How orders are filled (see bot.execution).
+        cache_bytes (int): The size limit of each worker's rolling-mean cache.
+
+    Returns:
+        pd.DataFrame: The same table `sweep_ma_crossover` returns.
+    """
+    workers = workers or os.cpu_count() or 1
+    pairs = parameter_grid(short_windows, long_windows)
+
+    if workers == 1 or len(pairs) <= chunk_size:
+        results = sweep_ma_crossover(data, short_windows, long_windows, initial_cash, commission, chunk_size,
+                                     performance, periods_per_year, execution)
+        if progress:
+            progress(len(pairs), len(pairs))
+        return results
+
+    task_size = max(chunk_size, -(-len(pairs) // (workers * tasks_per_worker)))
+    tasks = [pairs[start:start + task_size] for start in range(0, len(pairs), task_size)]
+    arrays = {'close': data['close'].to_numpy(dtype=float)}
+    if execution is not None:
+        # Fails early if a needed column is missing
+        for name, array in zip(('open', 'volume'), execution.inputs(data)):
+            if array is not None:
+                arrays[name] = array
+
+    parts = [None] * len(tasks)
+    done = 0
+    with SharedArrays(**arrays) as shared:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_sweep_worker,
+                                 initargs=(shared.spec, cache_bytes)) as executor:
+            futures = {
+                executor.submit(_sweep_task, task, initial_cash, commission, chunk_size,
+                                performance, periods_per_year, execution): i
+                for i, task in enumerate(tasks)
+            }
+            for future in as_completed(futures):
+                i = futures[future]
+                parts[i] = future.result()
+                done += len(tasks[i])
+                if progress:
+                    progress(done, len(pairs))
+
+    return pd.concat(parts, ignore_index=True)
+
+
+# Per-process state of a sweep worker, set up by _init_sweep_worker.
+_worker = {}
+
+
+def _init_sweep_worker(spec, cache_bytes=256 * 2 ** 20):
+    """Attaches the shared price arrays and prepares the bounded rolling-mean cache."""
+    arrays, blocks = attach_shared(spec)
+    _worker['arrays'] = arrays
+    _worker['blocks'] = blocks
+    _worker['prefix'] = prefix_sums(arrays['close'])
+    _worker['counts'] = valid_counts(arrays['close'])
+    _worker['means'] = IndicatorCache(max_bytes=cache_bytes)
+
+
+def _sweep_task(pairs, initial_cash, commission, chunk_size, performance=False, periods_per_year=365,
+                execution=None):
+    """Sweeps one slice of the grid inside a worker process."""
+    close = _worker['arrays']['close']
+    open_prices, volume = execution.inputs(_worker['arrays']) if execution is not None else (None, None)
+    cache = _worker['means']
+    windows = sorted({w for pair in pairs for w in pair})
+    means = np.empty((len(close), len(windows)), order='F')
+    for i, window in enumerate(windows):
+        # Every worker sweeps the same shared close prices, so one key serves them all
+        means[:, i] = cache.get('close', 'sma', (window,),
+                                lambda: mean_from_prefix(_worker['prefix'], window, _worker['counts']))
+    return sweep_pairs(close, means, {w: i for i, w in enumerate(windows)}, pairs,
+                        initial_cash, commission, chunk_size, performance, periods_per_year,
+                        execution, open_prices, volume)
+
+
+def sweep_pairs(close, means, columns, pairs, initial_cash, commission, chunk_size=32,
+                performance=False, periods_per_year=365, execution=None, open_prices=None, volume=None):
+    """
+    Simulates `pairs` block by block given a table of precomputed rolling means.
+
+    Args:
+        close (np.ndarray): Close prices of shape (n,).
+        means (np.ndarray): Rolling means of shape (n, number of windows).
+        columns (dict): The `means` column of each window.
+        pairs (list): (short_window, long_window) tuples to simulate.
+        initial_cash (float): The starting cash balance.
+        commission (float): The trading commission fee per trade.
+        chunk_size (int): How many pairs are simulated together.
+        performance (bool): Also compute the `SWEEP_METRICS` columns, one
+                            `performance_metrics` call per block of pairs.
+        periods_per_year (float): Bars per year, used to annualize the metrics.
+        execution (ExecutionModel): How orders are filled; each block then runs
+                                    `simulate_execution` instead of the closed-form
+                                    final values.
+        open_prices (np.ndarray): Open prices of shape (n,), for next_open fills.
+        volume (np.ndarray): Volumes of shape (n,), for volume-capped fills.
+
+    Returns:
+        pd.DataFrame: One row per pair with its final value, return and trade count.
+    """
+    final_values = np.empty(len(pairs))
+    trade_counts = np.empty(len(pairs), dtype=np.int64)
+    stats = {name: np.empty(len(pairs)) for name in SWEEP_METRICS} if performance else {}
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # Missing closes are priced at the last finite one, as in `simulate_long_only`
+        log_growth = np.diff(np.log(forward_fill(close)))
+    log_growth[np.isnan(log_growth)] = 0.0
+
+    for start in range(0, len(pairs), chunk_size):
+        block = pairs[start:start + chunk_size]
+        short_mavg = means[:, [columns[sw] for sw, _ in block]]
+        long_mavg = means[:, [columns[lw] for _, lw in block]]
+
+        position = positions_from_signals(short_mavg > long_mavg, short_mavg < long_mavg)
+        stop = start + len(block)
+        if execution is not None:
+            holdings, _, total, trades = simulate_execution(close, position, initial_cash, execution,
+                                                            open_prices, volume)
+            final_values[start:stop] = total[-1]
+            trade_counts[start:stop] = trades.sum(axis=0)
+            position = holdings > 0
+        else:
+            final_values[start:stop], trade_counts[start:stop] = _final_values(
+                log_growth, position, initial_cash, commission
+            )
+            if performance:
+                _, _, total, _ = simulate_long_only(close, position, initial_cash, commission)
+        if performance:
+            block_stats = performance_metrics(total, initial_cash, position, periods_per_year)
+            for name, values in stats.items():
+                values[start:stop] = block_stats[name]
+
+    return pd.DataFrame({
+        'short_window': [sw for sw, _ in pairs],
+        'long_window': [lw for _, lw in pairs],
+        'final_value': final_values,
+        'return': final_values / initial_cash - 1,
+        'trades': trade_counts,
+        **stats,
+    })
+
+
+def _final_values(log_growth, position, initial_cash, commission):
+    """
+    Computes the final portfolio value and trade count of each position column.
+
+    This is the last row of `simulate_long_only` without materialising the
+    equity curves: the price growth earned while held is a single matrix
+    product with the log returns, and each entry and exit pays commission.
+    """
+    held = position[:-1].T.astype(np.float64)
+    entries = position[0].astype(np.int64) + np.count_nonzero(position[1:] & ~position[:-1], axis=0)
+    exits = entries - position[-1]
+    log_final = held @ log_growth - entries * np.log1p(commission) + exits * np.log1p(-commission)
+    return float(initial_cash) * np.exp(log_final), entries + exits
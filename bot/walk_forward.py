@@ -0,0 +1,123 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from .backtester import positions_from_signals, simulate_long_only
+from .indicators import rolling_mean_table
+from .parallel import SharedArrays, attach_shared
+from .sweep import sweep_pairs, parameter_grid
+
+
+def walk_forward_splits(n_bars, train_size, test_size, step=None):
+    """
+    Lists rolling train/test windows over a series.
+
+    Args:
+        n_bars (int): The length of the series.
+        train_size (int): Bars in each training window.
+        test_size (int): Bars in each test window, which directly follows its training window.
+        step (int): Bars between the starts of consecutive folds (defaults to
+                    `test_size`, so the test windows tile the series).
+
+    Returns:
+        list: (train_start, test_start, test_end) bar positions, one tuple per fold.
+    """
+    step = step or test_size
+    return [(start, start + train_size, start + train_size + test_size)
+            for start in range(0, n_bars - train_size - test_size + 1, step)]
+
+
+def walk_forward_optimize(data, short_windows, long_windows, train_size, test_size, step=None,
+                          initial_cash=10000, commission=0.002, workers=1, chunk_size=32):
+    """
+    Runs a walk-forward optimization of the moving average crossover windows.
+
+    For every fold, the (short, long) pair with the best in-sample return on
+    the training window is backtested out-of-sample on the following test
+    window. The rolling means are computed once over the full series and
+    sliced per fold, so a bar's averages only ever look back in time.
+
+    Args:
+        data (pd.DataFrame): A DataFrame containing OHLCV data.
+        short_windows (iterable): Candidate short moving-average windows.
+        long_windows (iterable): Candidate long moving-average windows.
+        train_size (int): Bars in each training window.
+        test_size (int): Bars in each test window.
+        step (int): Bars between consecutive folds (defaults to `test_size`).
+        initial_cash (float): The starting cash balance.
+        commission (float): The trading commission fee per trade.
+        workers (int): Number of worker processes for the folds (None for the CPU count).
+        chunk_size (int): How many pairs are simulated together within a fold.
+
+    Returns:
+        tuple: (folds, equity) where `folds` is a DataFrame with one row per fold
+               and `equity` is the out-of-sample equity curve stitched across the
+               test windows, starting from `initial_cash`.
+    """
+    pairs = parameter_grid(short_windows, long_windows)
+    close = data['close'].to_numpy(dtype=float)
+    windows = sorted({w for pair in pairs for w in pair})
+    means = rolling_mean_table(close, windows)
+    splits = walk_forward_splits(len(close), train_size, test_size, step)
+    arguments = ({w: i for i, w in enumerate(windows)}, pairs, initial_cash, commission, chunk_size)
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(splits) < 2:
+        outcomes = [_run_fold(close, means, split, *arguments) for split in splits]
+    else:
+        with SharedArrays(close=close, means=means) as shared:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_fold_worker,
+                                     initargs=(shared.spec,)) as executor:
+                outcomes = list(executor.map(_fold_task, splits, [arguments] * len(splits)))
+
+    rows, curves = [], []
+    scale = 1.0
+    for fold, ((train_start, test_start, test_end), outcome) in enumerate(zip(splits, outcomes)):
+        short_window, long_window, train_return, test_total, test_trades = outcome
+        rows.append({
+            'fold': fold,
+            'train_start': data.index[train_start],
+            'test_start': data.index[test_start],
+            'test_end': data.index[test_end - 1],
+            'short_window': short_window,
+            'long_window': long_window,
+            'train_return': train_return,
+            'test_return': test_total[-1] / initial_cash - 1,
+            'test_trades': test_trades,
+        })
+        # Each test window starts from the equity the previous one ended with.
+        curves.append(pd.Series(test_total * scale, index=data.index[test_start:test_end]))
+        scale *= test_total[-1] / initial_cash
+
+    equity = pd.concat(curves) if curves else pd.Series(dtype=float)
+    return pd.DataFrame(rows), equity.rename('total')
+
+
+def _run_fold(close, means, split, columns, pairs, initial_cash, commission, chunk_size):
+    """Picks the best pair on a fold's training window and backtests it on its test window."""
+    train_start, test_start, test_end = split
+    results = sweep_pairs(close[train_start:test_start], means[train_start:test_start], columns, pairs,
+                           initial_cash, commission, chunk_size)
+    best = results.loc[results['return'].idxmax()]
+    short_window, long_window = int(best['short_window']), int(best['long_window'])
+
+    short_mavg = means[test_start:test_end, columns[short_window]]
+    long_mavg = means[test_start:test_end, columns[long_window]]
+    position = positions_from_signals(short_mavg > long_mavg, short_mavg < long_mavg)
+    _, _, total, trades = simulate_long_only(close[test_start:test_end], position, initial_cash, commission)
+    return short_window, long_window, float(best['return']), total, int(trades.sum())
+
+
+# Per-process state of a fold worker, set up by _init_fold_worker.
+_worker = {}
+
+
+def _init_fold_worker(spec):
+    """Attaches the shared close prices and rolling-mean table."""
+    _worker['arrays'], _worker['blocks'] = attach_shared(spec)
+
+
+def _fold_task(split, arguments):
+    """Runs one fold inside a worker process."""
+    return _run_fold(_worker['arrays']['close'], _worker['arrays']['means'], split, *arguments)
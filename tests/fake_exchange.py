@@ -0,0 +1,62 @@
+import asyncio
+import bisect
+import ccxt
+import numpy as np
+
+class FakeExchange:
+    """A local stand-in for a ccxt exchange that serves deterministic candles."""
+    id = 'fake'
+    has = {'fetchOHLCV': True}
+    rateLimit = 0
+    enableRateLimit = False
+
+    def __init__(self, start=1609459200000, count=1000, page_size=720, overlap=0, seed=0):
+        """
+        Args:
+            start (int): Time of the first candle in milliseconds.
+            count (int): Number of candles available per symbol and timeframe.
+            page_size (int): Maximum number of candles returned per request.
+            overlap (int): Number of candles before `since` included in each page.
+            seed (int): Seed for the random-walk prices.
+        """
+        self.start = start
+        self.count = count
+        self.page_size = page_size
+        self.overlap = overlap
+        self.seed = seed
+        self.calls = []
+        self._candles = {}
+
+    def candles(self, symbol, timeframe):
+        """Returns every candle of a symbol and timeframe as ccxt rows."""
+        if (symbol, timeframe) not in self._candles:
+            self._candles[symbol, timeframe] = self._generate(symbol, timeframe)
+        return self._candles[symbol, timeframe]
+
+    def _generate(self, symbol, timeframe):
+        step = ccxt.Exchange.parse_timeframe(timeframe) * 1000
+        rng = np.random.default_rng([self.seed, sum(symbol.encode())])
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, self.count)))
+        volume = rng.uniform(1, 100, self.count)
+        return [[self.start + i * step, float(close[i]), float(close[i] * 1.01), float(close[i] * 0.99),
+                 float(close[i]), float(volume[i])] for i in range(self.count)]
+
+    def fetch_ohlcv(self, symbol, timeframe='1m', since=None, limit=None):
+        self.calls.append((symbol, timeframe, since, limit))
+        rows = self.candles(symbol, timeframe)
+        size = min(limit or self.page_size, self.page_size)
+        if since is None:
+            return rows[-size:]
+        first = bisect.bisect_left(rows, since, key=lambda row: row[0])
+        first = max(first - self.overlap, 0)
+        return rows[first:first + size]
+
+class AsyncFakeExchange(FakeExchange):
+    """The async-support flavour of FakeExchange."""
+
+    async def fetch_ohlcv(self, symbol, timeframe='1m', since=None, limit=None):
+        await asyncio.sleep(0)
+        return FakeExchange.fetch_ohlcv(self, symbol, timeframe, since, limit)
+
+    async def close(self):
+        pass
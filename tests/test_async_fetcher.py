@@ -0,0 +1,41 @@
+import asyncio
+import unittest
+import sys
+sys.path.append('.')
+from bot.async_fetcher import AsyncDataFetcher
+from tests.fake_exchange import AsyncFakeExchange
+
+START = 1609459200000
+HOUR = 3600000
+
+class TestAsyncDataFetcher(unittest.TestCase):
+
+    def test_fetch_history_pages_and_dedupes(self):
+        """Test that overlapping pages are stitched into one unique, ordered series."""
+        exchange = AsyncFakeExchange(count=500, page_size=100, overlap=3)
+        fetcher = AsyncDataFetcher(exchanges={'fake': exchange}, default_exchange='fake')
+
+        df = asyncio.run(fetcher.fetch_history('ETH/USD', '1h', START, START + 450 * HOUR))
+
+        self.assertEqual(len(df), 450)
+        self.assertTrue(df.index.is_unique and df.index.is_monotonic_increasing)
+        self.assertGreaterEqual(len(exchange.calls), 5)
+
+    def test_fetch_many_downloads_every_request(self):
+        """Test that several symbols and timeframes are fetched in one call."""
+        exchange = AsyncFakeExchange(count=300, page_size=120)
+        requests = [('ETH/USD', '1h'), ('BTC/USD', '1h'), ('fake', 'ETH/USD', '1d')]
+
+        async def run():
+            async with AsyncDataFetcher(exchanges={'fake': exchange}, default_exchange='fake') as fetcher:
+                return await fetcher.fetch_many(requests, since=START, until=START + 300 * 24 * HOUR)
+
+        results = asyncio.run(run())
+
+        self.assertEqual(set(results), set(requests))
+        self.assertEqual(len(results[('ETH/USD', '1h')]), 300)
+        self.assertEqual(len(results[('fake', 'ETH/USD', '1d')]), 300)
+        self.assertFalse(results[('ETH/USD', '1h')]['close'].equals(results[('BTC/USD', '1h')]['close']))
+
+if __name__ == '__main__':
+    unittest.main()
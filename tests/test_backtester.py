@@ -1,8 +1,10 @@
 import unittest
+import numpy as np
 import pandas as pd
 import sys
 sys.path.append('.')
 from bot.backtester import Backtester
+from bot.signals import BUY, HOLD, SELL
 
 # Mock strategy for testing
 class MockStrategy:
@@ -50,5 +52,51 @@ class TestBacktester(unittest.TestCase):
 
         self.assertAlmostEqual(portfolio['total'].iloc[-1], 1078.2178, places=4)
 
+    def test_vectorized_engine_matches_loop(self):
+        """Test that the vectorized engine reproduces the bar-by-bar engine."""
+        rng = np.random.default_rng(42)
+        data = pd.DataFrame({'close': 100 * np.exp(np.cumsum(rng.normal(0, 0.02, 300)))})
+        signals = list(rng.choice(['buy', 'sell', 'hold'], size=300, p=[0.1, 0.1, 0.8]))
+
+        portfolios = {}
+        for engine in Backtester.ENGINES:
+            backtester = Backtester(MockStrategy(signals), data.copy(), initial_cash=1000, commission=0.01, engine=engine)
+            portfolios[engine] = backtester.run(symbol='TEST/USD')
+
+        for column in ['holdings', 'cash', 'total']:
+            np.testing.assert_allclose(portfolios['vectorized'][column], portfolios['loop'][column], rtol=1e-12, atol=1e-9)
+        np.testing.assert_array_equal(portfolios['vectorized']['trades'], portfolios['loop']['trades'])
+
+    def test_missing_closes_match_loop(self):
+        """Test that both engines price a held position across a missing close from the last known one."""
+        data = pd.DataFrame({'close': [10, 11, 12, 13, np.nan, 15, 14, 13, 12, 11, 12, 13]})
+        signals = ['hold', 'buy', 'hold', 'hold', 'hold', 'hold', 'sell', 'hold', 'buy', 'hold', 'hold', 'hold']
+
+        portfolios = {}
+        for engine in Backtester.ENGINES:
+            backtester = Backtester(MockStrategy(signals), data.copy(), initial_cash=1000, commission=0.01, engine=engine)
+            portfolios[engine] = backtester.run(symbol='TEST/USD')
+
+        for column in ['holdings', 'cash', 'total']:
+            self.assertTrue(np.isfinite(portfolios['vectorized'][column]).all())
+            np.testing.assert_allclose(portfolios['vectorized'][column], portfolios['loop'][column], rtol=1e-12, atol=1e-9)
+        self.assertAlmostEqual(portfolios['vectorized']['total'].iloc[4], portfolios['vectorized']['total'].iloc[3])
+
+    def test_precomputed_int8_signals(self):
+        """Test that int8 signal codes can be passed straight to run."""
+        signals = np.array([BUY, HOLD, HOLD, SELL, HOLD, HOLD], dtype=np.int8)
+        for engine in Backtester.ENGINES:
+            backtester = Backtester(None, self.data, initial_cash=1000, commission=0.01, engine=engine)
+            portfolio = backtester.run(signals=signals)
+            self.assertAlmostEqual(portfolio['total'].iloc[-1], 1078.2178, places=4)
+
+        with self.assertRaises(ValueError):
+            Backtester(None, self.data).run(signals=np.array([2, 0, 0, 0, 0, 0]))
+
+    def test_invalid_engine(self):
+        """Test that an unknown engine name is rejected."""
+        with self.assertRaises(ValueError):
+            Backtester(MockStrategy([]), self.data, engine='turbo')
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,96 @@
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+import numpy as np
+import pandas as pd
+import sys
+sys.path.append('.')
+from bot.candle_store import CandleStore, ohlcv_frame
+
+def make_candles(start_ms, count, step_ms=60000, price=100.0):
+    timestamps = start_ms + step_ms * np.arange(count)
+    prices = price + np.arange(count, dtype=float)
+    return ohlcv_frame(timestamps, {'open': prices, 'high': prices + 1, 'low': prices - 1,
+                                    'close': prices, 'volume': np.ones(count)})
+
+class TestCandleStore(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.store = CandleStore(self.root)
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_round_trip(self):
+        """Test that written candles load back unchanged, memory-mapped."""
+        candles = make_candles(1609459200000, 10)
+        self.store.write('kraken', 'ETH/USD', '1m', candles)
+
+        pd.testing.assert_frame_equal(self.store.load('kraken', 'ETH/USD', '1m'), candles)
+        self.assertEqual(self.store.last_timestamp('kraken', 'ETH/USD', '1m'), 1609459200000 + 9 * 60000)
+        self.assertIsInstance(self.store.load_columns('kraken', 'ETH/USD', '1m')['close'], np.memmap)
+
+    def test_missing_key(self):
+        """Test that an unknown key loads as None."""
+        self.assertIsNone(self.store.load('kraken', 'BTC/USD', '1d'))
+        self.assertIsNone(self.store.last_timestamp('kraken', 'BTC/USD', '1d'))
+
+    def test_merge_overwrites_overlapping_candles(self):
+        """Test that merged candles replace stored ones with the same timestamp."""
+        self.store.write('kraken', 'ETH/USD', '1m', make_candles(1609459200000, 5))
+        merged = self.store.merge('kraken', 'ETH/USD', '1m', make_candles(1609459200000 + 4 * 60000, 3, price=500.0))
+
+        self.assertEqual(len(merged), 7)
+        self.assertEqual(merged['close'].iloc[4], 500.0)
+        pd.testing.assert_frame_equal(self.store.load('kraken', 'ETH/USD', '1m'), merged)
+
+    def test_concurrent_merges_and_reads(self):
+        """Test that concurrent writers keep every candle and readers never miss a file."""
+        start = 1609459200000
+        errors = []
+        done = threading.Event()
+
+        def write(offset):
+            try:
+                for i in range(25):
+                    self.store.merge('kraken', 'ETH/USD', '1m', make_candles(start + (offset + 2 * i) * 60000, 1))
+            except Exception as e:
+                errors.append(e)
+
+        def read():
+            while not done.is_set():
+                try:
+                    self.store.load('kraken', 'ETH/USD', '1m')
+                except Exception as e:
+                    errors.append(e)
+
+        writers = [threading.Thread(target=write, args=(offset,)) for offset in (0, 1)]
+        reader = threading.Thread(target=read)
+        reader.start()
+        for thread in writers:
+            thread.start()
+        for thread in writers:
+            thread.join()
+        done.set()
+        reader.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(len(self.store.load('kraken', 'ETH/USD', '1m')), 50)
+
+    def test_replaced_generations_expire(self):
+        """Test that a replaced generation is kept for readers, then removed by a later write."""
+        self.store.write('kraken', 'ETH/USD', '1m', make_candles(1609459200000, 5))
+        self.store.write('kraken', 'ETH/USD', '1m', make_candles(1609459200000, 6))
+        directory = self.store._directory('kraken', 'ETH/USD', '1m')
+        self.assertEqual(len([name for name in os.listdir(directory) if name.endswith('.npy')]), 12)
+
+        expiring = CandleStore(self.root, stale_seconds=-1)
+        expiring.write('kraken', 'ETH/USD', '1m', make_candles(1609459200000, 7))
+        self.assertEqual(len([name for name in os.listdir(directory) if name.endswith('.npy')]), 6)
+        self.assertEqual(len(expiring.load('kraken', 'ETH/USD', '1m')), 7)
+
+if __name__ == '__main__':
+    unittest.main()
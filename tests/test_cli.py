@@ -0,0 +1,132 @@
+import contextlib
+import io
+import os
+import shutil
+import subprocess
+import tempfile
+import unittest
+from unittest.mock import patch
+import sys
+sys.path.append('.')
+from bot.candle_store import CandleStore
+from bot.cli import main, parse_params
+from bot.data_fetcher import now_milliseconds
+from tests.fake_exchange import FakeExchange
+
+DAY = 24 * 60 * 60 * 1000
+# Seconds each module may add to the import of NumPy and pandas, with a wide
+# margin over the measured cost (about 0.02s for the bot modules and 0.1s for
+# the app, whose budget is mostly Flask).
+IMPORT_BUDGETS = {'bot.cli': 0.15, 'bot.backtester': 0.15, 'bot.sweep': 0.15, 'bot.robustness': 0.15,
+                  'app': 0.5}
+# Dependencies that must only load on the code paths that use them.
+DEFERRED = ('ccxt', 'matplotlib')
+
+def run(*argv):
+    """Runs the CLI, returning its exit status and output."""
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        status = main(list(argv))
+    return status, output.getvalue()
+
+class TestCommands(unittest.TestCase):
+
+    def setUp(self):
+        """Set up a fake Kraken serving the last 400 days of daily candles."""
+        self.directory = tempfile.mkdtemp()
+        self.candles = os.path.join(self.directory, 'candles')
+        start = (now_milliseconds() // DAY - 400) * DAY
+        self.exchange = FakeExchange(start=start, count=400)
+        patcher = patch('ccxt.kraken', return_value=self.exchange)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_fetch_fills_the_store(self):
+        """Test that fetch stores the requested days of candles."""
+        status, output = run('fetch', '--days', '300', '--candles', self.candles)
+        self.assertEqual(status, 0)
+        self.assertIn('ETH/USD', output)
+        stored = CandleStore(self.candles).load('kraken', 'ETH/USD', '1d')
+        self.assertGreaterEqual(len(stored), 299)
+
+    def test_backtest_prints_and_plots(self):
+        """Test that backtest runs a strategy with the given parameters and saves its plot."""
+        plot = os.path.join(self.directory, 'equity.png')
+        status, output = run('backtest', '--strategy', 'rsi', '--param', 'window=10', '--param', 'oversold=25',
+                             '--candles', self.candles, '--plot', plot)
+        self.assertEqual(status, 0)
+        self.assertIn("{'window': 10, 'oversold': 25, 'overbought': 70}", output)
+        self.assertIn('Sharpe Ratio', output)
+        with open(plot, 'rb') as f:
+            self.assertEqual(f.read(8), b'\x89PNG\r\n\x1a\n')
+
+        self.assertEqual(run('backtest', '--param', 'short_window=90', '--param', 'long_window=20')[0], 2)
+
+    def test_optimize_and_show_stored_results(self):
+        """Test that optimize stores its grid and --show-top reads it back without fetching."""
+        store = os.path.join(self.directory, 'results.sqlite')
+        status, output = run('optimize', '--strategy', 'bollinger', '--rank-by', 'sharpe', '--store', store,
+                             '--candles', self.candles)
+        self.assertEqual(status, 0)
+        self.assertIn('Top 5 Best Performing Parameter Combinations by sharpe', output)
+
+        calls = len(self.exchange.calls)
+        status, output = run('optimize', '--strategy', 'bollinger', '--store', store, '--show-top', '3')
+        self.assertEqual(status, 0)
+        self.assertIn('Top 3 stored results by return', output)
+        self.assertEqual(len(self.exchange.calls), calls)
+
+    def test_failed_fetch_exits_with_an_error(self):
+        """Test that commands report a failure when no candles can be fetched."""
+        self.exchange.fetch_ohlcv = lambda *args, **kwargs: []
+        self.assertEqual(run('optimize', '--candles', self.candles)[0], 1)
+        self.assertEqual(run('backtest', '--candles', self.candles)[0], 1)
+
+    def test_parse_params(self):
+        """Test that parameters are parsed as numbers where possible."""
+        self.assertEqual(parse_params(['window=14', 'num_std=2.5', 'name=x']),
+                         {'window': 14, 'num_std': 2.5, 'name': 'x'})
+        with self.assertRaises(ValueError):
+            parse_params(['window'])
+
+class TestStartup(unittest.TestCase):
+
+    def measure_import(self, module):
+        """Imports a module in a fresh interpreter, returning its import time and the deferred modules loaded."""
+        code = ("import sys, time, numpy, pandas\n"
+                "start = time.perf_counter()\n"
+                f"import {module}\n"
+                "print(time.perf_counter() - start)\n"
+                f"print(','.join(name for name in {DEFERRED!r} if name in sys.modules))\n")
+        result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True,
+                                cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        seconds, loaded = result.stdout.splitlines()
+        return float(seconds), [name for name in loaded.split(',') if name]
+
+    def test_import_budgets(self):
+        """Test that the entry points import within budget and without ccxt or matplotlib."""
+        for module, budget in IMPORT_BUDGETS.items():
+            with self.subTest(module=module):
+                # The best of three runs, to ride out a busy machine
+                runs = [self.measure_import(module) for _ in range(3)]
+                self.assertEqual(runs[0][1], [])
+                self.assertLess(min(seconds for seconds, _ in runs), budget)
+
+    def test_module_entry_point(self):
+        """Test that `python -m bot` runs the CLI and `python -m bot.backtester` its backtest command."""
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        result = subprocess.run([sys.executable, '-m', 'bot', '--help'], capture_output=True, text=True, cwd=root)
+        self.assertEqual(result.returncode, 0)
+        for command in ('fetch', 'backtest', 'optimize'):
+            self.assertIn(command, result.stdout)
+
+        result = subprocess.run([sys.executable, '-m', 'bot.backtester', '--help'], capture_output=True,
+                                text=True, cwd=root)
+        self.assertEqual(result.returncode, 0)
+        self.assertIn('--plot', result.stdout)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+import numpy as np
+import pandas as pd
+import sys
+sys.path.append('.')
+import app
+from bot.backtester import Backtester
+from bot.dashboard import DashboardCache
+from bot.strategy import MovingAverageCrossoverStrategy
+
+class GrowingFetcher:
+    """Serves a fixed price series, revealing `visible` candles of it."""
+    def __init__(self, data, visible):
+        self.data = data
+        self.visible = visible
+        self.calls = 0
+
+    def fetch_ohlcv(self, symbol='ETH/USD', timeframe='1d', since=None, limit=500):
+        self.calls += 1
+        return self.data.iloc[:self.visible].iloc[-limit:]
+
+class TestDashboardCache(unittest.TestCase):
+
+    def setUp(self):
+        """Set up a random-walk daily series and a cache that does not refresh on its own."""
+        rng = np.random.default_rng(9)
+        index = pd.date_range('2023-01-01', periods=300, freq='D')
+        self.data = pd.DataFrame({'close': 100 * np.exp(np.cumsum(rng.normal(0, 0.02, 300)))}, index=index)
+        self.fetcher = GrowingFetcher(self.data, visible=250)
+        self.dashboard = DashboardCache(self.fetcher, refresh_interval=3600)
+        self.key = self.dashboard.key(short_window=5, long_window=20)
+
+    def tearDown(self):
+        self.dashboard.stop(timeout=5)
+
+    def test_first_entry_matches_backtest(self):
+        """Test that the background worker computes the same results as a direct backtest."""
+        entry = self.dashboard.get(self.key, timeout=30)
+        self.assertIsNotNone(entry)
+
+        strategy = MovingAverageCrossoverStrategy(short_window=5, long_window=20)
+        portfolio = Backtester(strategy, self.data.iloc[:250], initial_cash=10000, commission=0.002).run()
+        self.assertEqual(entry['results']['final_value'], f"${portfolio['total'].iloc[-1]:,.2f}")
+        self.assertEqual(entry['last_timestamp'], self.data.index[249])
+        self.assertTrue(entry['plot'].startswith(b'\x89PNG'))
+
+    def test_refresh_only_on_new_candles(self):
+        """Test that entries are recomputed only when a newer candle arrives."""
+        entry = self.dashboard.get(self.key, timeout=30)
+        self.dashboard.refresh()
+        self.assertIs(self.dashboard.get(self.key), entry)
+
+        self.fetcher.visible = 260
+        self.dashboard.refresh()
+        refreshed = self.dashboard.get(self.key)
+        self.assertIsNot(refreshed, entry)
+        self.assertEqual(refreshed['last_timestamp'], self.data.index[259])
+
+    def test_invalid_parameters(self):
+        """Test that unknown strategies and invalid parameters are rejected."""
+        with self.assertRaises(ValueError):
+            self.dashboard.key(strategy='martingale')
+        with self.assertRaises(ValueError):
+            self.dashboard.key(short_window=50, long_window=20)
+        with self.assertRaises(ValueError):
+            self.dashboard.key(window=14)
+        with self.assertRaises(ValueError):
+            self.dashboard.key(symbol='DOGE/USD', short_window=5, long_window=20)
+        with self.assertRaises(ValueError):
+            self.dashboard.key(timeframe='1m', short_window=5, long_window=20)
+
+    def test_routes_serve_cached_results(self):
+        """Test that concurrent page and plot requests are served from the cache."""
+        client = app.app.test_client()
+        with patch.object(app, 'dashboard', self.dashboard):
+            with ThreadPoolExecutor(max_workers=4) as pool:
+                pages = list(pool.map(lambda _: client.get('/?short_window=5&long_window=20'), range(8)))
+            calls = self.fetcher.calls
+            plot = client.get('/plot.png?short_window=5&long_window=20')
+            bad = client.get('/?short_window=abc&long_window=20')
+
+        self.assertEqual({page.status_code for page in pages}, {200})
+        self.assertEqual(len({page.data for page in pages}), 1)
+        self.assertIn(b'/plot.png?short_window=5&amp;long_window=20', pages[0].data)
+        self.assertEqual(calls, 1)
+        self.assertEqual(plot.mimetype, 'image/png')
+        self.assertTrue(plot.data.startswith(b'\x89PNG'))
+        self.assertEqual(bad.status_code, 400)
+
+    def test_plot_route_does_not_schedule_backtests(self):
+        """Test that plots of uncached parameter sets and unknown symbols are refused without fetching."""
+        client = app.app.test_client()
+        with patch.object(app, 'dashboard', self.dashboard):
+            plot = client.get('/plot.png?short_window=7&long_window=30')
+            symbol = client.get('/?symbol=XYZ/USD&short_window=5&long_window=20')
+            timeframe = client.get('/plot.png?timeframe=1s&short_window=5&long_window=20')
+
+        self.assertEqual(plot.status_code, 404)
+        self.assertEqual(symbol.status_code, 400)
+        self.assertEqual(timeframe.status_code, 400)
+        self.assertIsNone(self.dashboard.peek(self.dashboard.key(short_window=7, long_window=30)))
+        self.assertEqual(self.fetcher.calls, 0)
+
+    def test_routes_reject_unbounded_parameters(self):
+        """Test that oversized, non-positive and reserved parameters are refused before anything is cached."""
+        client = app.app.test_client()
+        with patch.object(app, 'dashboard', self.dashboard):
+            for query in ['short_window=5&long_window=1000000000', 'short_window=0&long_window=20',
+                          'short_window=-5&long_window=20', 'short_window=5.5&long_window=20',
+                          'short_window=5&long_window=20&indicator_cache=1', 'strategy=rsi&sentiment=1']:
+                self.assertEqual(client.get(f'/?{query}').status_code, 400, msg=query)
+        self.assertEqual(self.dashboard._entries, {})
+        self.assertEqual(self.fetcher.calls, 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,9 +1,14 @@
+import os
+import shutil
+import tempfile
 import unittest
 from unittest.mock import patch, MagicMock
 import pandas as pd
 import sys
 sys.path.append('.')
+from bot.candle_store import CandleStore
 from bot.data_fetcher import DataFetcher
+from tests.fake_exchange import FakeExchange
 import ccxt
 
 class TestDataFetcher(unittest.TestCase):
@@ -56,5 +61,124 @@ class TestDataFetcher(unittest.TestCase):
         # --- Assert ---
         self.assertIsNone(result_df)
 
+    @patch('ccxt.kraken')
+    def test_fetch_ohlcv_tops_up_cache(self, mock_kraken):
+        """Test that a cached fetch only requests candles from the last cached one on."""
+        mock_exchange = MagicMock()
+        mock_exchange.has = {'fetchOHLCV': True}
+        mock_exchange.fetch_ohlcv.return_value = [
+            [1609459200000, 100, 105, 95, 102, 1000],
+            [1609459260000, 102, 108, 100, 105, 1200],
+        ]
+        mock_kraken.return_value = mock_exchange
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root)
+
+        fetcher = DataFetcher(exchange_name='kraken', store=CandleStore(root))
+        self.assertEqual(len(fetcher.fetch_ohlcv(limit=2)), 2)
+
+        # The second call refreshes the last candle and adds a new one.
+        mock_exchange.fetch_ohlcv.return_value = [
+            [1609459260000, 102, 108, 100, 106, 1300],
+            [1609459320000, 106, 110, 104, 109, 900],
+        ]
+        result_df = fetcher.fetch_ohlcv(limit=2)
+
+        mock_exchange.fetch_ohlcv.assert_any_call('ETH/USD', '1h', 1609459260000, 2)
+        self.assertEqual(list(result_df['close']), [106, 109])
+        self.assertEqual(list(fetcher.store.load('kraken', 'ETH/USD', '1h')['close']), [102, 106, 109])
+
+    @patch('ccxt.kraken')
+    def test_fetch_history_pages_past_the_page_size(self, mock_kraken):
+        """Test that fetch_history keeps paging until the requested end time."""
+        exchange = FakeExchange(count=2000, page_size=720)
+        mock_kraken.return_value = exchange
+
+        fetcher = DataFetcher(exchange_name='kraken')
+        result_df = fetcher.fetch_history('ETH/USD', '1h', since=1609459200000, until=1609459200000 + 1500 * 3600000)
+
+        self.assertEqual(len(result_df), 1500)
+        self.assertTrue(result_df.index.is_unique)
+        self.assertEqual(len(exchange.calls), 3)
+
+    @patch('ccxt.kraken')
+    def test_fetch_history_keeps_the_cache_contiguous(self, mock_kraken):
+        """Test that requests before or after the cached range also download the candles in between."""
+        hour = 3600000
+        start = 1609459200000
+        exchange = FakeExchange(start=start, count=200, page_size=720)
+        mock_kraken.return_value = exchange
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root)
+        fetcher = DataFetcher(exchange_name='kraken', store=CandleStore(root))
+
+        fetcher.fetch_history('ETH/USD', '1h', since=start + 50 * hour, until=start + 60 * hour)
+        later = fetcher.fetch_history('ETH/USD', '1h', since=start + 100 * hour, until=start + 120 * hour)
+        earlier = fetcher.fetch_history('ETH/USD', '1h', since=start, until=start + 10 * hour)
+
+        self.assertEqual(len(later), 20)
+        self.assertEqual(len(earlier), 10)
+        stored = fetcher.store.load('kraken', 'ETH/USD', '1h')
+        self.assertEqual(len(stored), 120)
+        self.assertTrue((stored.index.to_series().diff().dropna() == pd.Timedelta(hours=1)).all())
+
+    @patch('ccxt.kraken')
+    def test_fetch_history_does_not_store_gaps(self, mock_kraken):
+        """Test that candles the exchange only serves from a later time are not merged into the cache."""
+        hour = 3600000
+        start = 1609459200000
+        exchange = FakeExchange(start=start, count=200, page_size=720)
+        mock_kraken.return_value = exchange
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root)
+        fetcher = DataFetcher(exchange_name='kraken', store=CandleStore(root))
+        fetcher.fetch_history('ETH/USD', '1h', since=start, until=start + 10 * hour)
+
+        # Like Kraken, now only the most recent candles are served whatever `since` asks for
+        recent = exchange.candles('ETH/USD', '1h')[150:]
+        exchange.fetch_ohlcv = lambda symbol, timeframe, since=None, limit=None: recent
+        candles = fetcher.fetch_history('ETH/USD', '1h', since=start, until=start + 200 * hour)
+
+        self.assertEqual(len(candles), 60)
+        self.assertEqual(len(fetcher.store.load('kraken', 'ETH/USD', '1h')), 10)
+
+    @patch('ccxt.kraken')
+    def test_fetch_ohlcv_pages_back_to_the_cache(self, mock_kraken):
+        """Test that a request from before the cache pages up to it instead of storing one page."""
+        hour = 3600000
+        start = 1609459200000
+        mock_kraken.return_value = FakeExchange(start=start, count=110, page_size=30)
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root)
+        fetcher = DataFetcher(exchange_name='kraken', store=CandleStore(root))
+        fetcher.fetch_history('ETH/USD', '1h', since=start + 100 * hour, until=start + 110 * hour)
+
+        candles = fetcher.fetch_ohlcv(since=start, limit=30)
+        self.assertEqual(len(candles), 30)
+        stored = fetcher.store.load('kraken', 'ETH/USD', '1h')
+        self.assertEqual(len(stored), 110)
+        self.assertTrue((stored.index.to_series().diff().dropna() == pd.Timedelta(hours=1)).all())
+
+    @patch('ccxt.kraken')
+    def test_broken_cache_falls_back_to_the_exchange(self, mock_kraken):
+        """Test that a cache whose files are missing is refetched instead of raising."""
+        mock_kraken.return_value = FakeExchange(count=100, page_size=720)
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root)
+        store = CandleStore(root)
+        fetcher = DataFetcher(exchange_name='kraken', store=store)
+        until = 1609459200000 + 50 * 3600000
+        fetcher.fetch_history('ETH/USD', '1h', since=1609459200000, until=until)
+
+        directory = store._directory('kraken', 'ETH/USD', '1h')
+        for name in os.listdir(directory):
+            if name.startswith('timestamp.'):
+                os.remove(os.path.join(directory, name))
+
+        self.assertEqual(len(fetcher.fetch_history('ETH/USD', '1h', since=1609459200000, until=until)), 50)
+        self.assertEqual(len(fetcher.fetch_ohlcv(since=1609459200000, limit=20)), 20)
+        # The refetched candles repaired the cache
+        self.assertGreaterEqual(len(store.load('kraken', 'ETH/USD', '1h')), 50)
+
 if __name__ == '__main__':
     unittest.main()
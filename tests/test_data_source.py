@@ -0,0 +1,56 @@
+import shutil
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+import sys
+sys.path.append('.')
+from bot.backtester import Backtester
+from bot.candle_store import CandleStore, ohlcv_frame
+from bot.data_source import ColumnarData
+from bot.strategy import MovingAverageCrossoverStrategy
+
+class TestColumnarData(unittest.TestCase):
+
+    def setUp(self):
+        """Store a random-walk series as float32 columns."""
+        rng = np.random.default_rng(11)
+        prices = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, 1000)))
+        timestamps = 1609459200000 + 60000 * np.arange(1000)
+        self.candles = ohlcv_frame(timestamps, {'open': prices, 'high': prices, 'low': prices,
+                                                'close': prices, 'volume': np.ones(1000)})
+        self.root = tempfile.mkdtemp()
+        self.store = CandleStore(self.root)
+        self.store.write('kraken', 'ETH/USD', '1m', self.candles, dtype=np.float32)
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_from_store_maps_only_requested_columns(self):
+        """Test that only the requested columns are mapped, as float32."""
+        data = ColumnarData.from_store(self.store, 'kraken', 'ETH/USD', '1m', columns=['close'])
+        self.assertEqual(list(data.arrays), ['close'])
+        self.assertIsInstance(data['close'], np.memmap)
+        self.assertEqual(data['close'].dtype, np.float32)
+        pd.testing.assert_index_equal(data.index, self.candles.index)
+
+    def test_slice_is_zero_copy(self):
+        """Test that slicing by time range returns views of the mapped columns."""
+        data = ColumnarData.from_store(self.store, 'kraken', 'ETH/USD', '1m')
+        window = data.slice(self.candles.index[100], self.candles.index[200])
+        self.assertEqual(len(window), 100)
+        self.assertTrue(np.shares_memory(window['close'], data['close']))
+        self.assertEqual(window.index[0], self.candles.index[100])
+
+    def test_backtest_matches_dataframe(self):
+        """Test that a backtest on mapped columns matches one on the equivalent DataFrame."""
+        data = ColumnarData.from_store(self.store, 'kraken', 'ETH/USD', '1m')
+        frame = data.to_frame()
+        strategy = MovingAverageCrossoverStrategy(short_window=10, long_window=40)
+
+        columnar = Backtester(strategy, data, initial_cash=1000).run()
+        expected = Backtester(strategy, frame, initial_cash=1000).run()
+        pd.testing.assert_frame_equal(columnar, expected)
+
+if __name__ == '__main__':
+    unittest.main()
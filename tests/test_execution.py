@@ -0,0 +1,139 @@
+import unittest
+import numpy as np
+import pandas as pd
+import sys
+sys.path.append('.')
+from bot.backtester import Backtester, simulate_long_only
+from bot.execution import ExecutionModel, simulate_execution
+from bot.signals import BUY, HOLD, SELL
+from bot.strategy import MovingAverageCrossoverStrategy
+from bot.sweep import sweep_ma_crossover, sweep_strategy
+
+class TestSimulateExecution(unittest.TestCase):
+
+    def setUp(self):
+        """Set up a random-walk OHLCV series and a random target position."""
+        rng = np.random.default_rng(11)
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, 300)))
+        self.data = pd.DataFrame({
+            'open': close * np.exp(rng.normal(0, 0.005, 300)),
+            'close': close,
+            'volume': rng.uniform(5, 50, 300),
+        }, index=pd.date_range('2024-01-01', periods=300, freq='D'))
+        self.position = np.repeat(rng.random(30) < 0.5, 10)
+
+    def test_close_fills_match_simulate_long_only(self):
+        """Test that same-bar close fills without slippage reproduce the legacy engine."""
+        model = ExecutionModel(fill='close', taker_fee=0.003)
+        close = self.data['close'].to_numpy()
+        expected = simulate_long_only(close, self.position, 1000, 0.003)
+        for actual, wanted in zip(simulate_execution(close, self.position, 1000, model), expected):
+            np.testing.assert_allclose(actual, wanted, rtol=1e-12)
+
+    def test_next_open_with_slippage(self):
+        """Test a hand-computed trade filled at the next open with slippage and fees."""
+        open_prices = np.array([10.0, 11.0, 12.0, 13.0, 14.0])
+        close = open_prices + 0.5
+        position = np.array([True, True, False, False, False])
+        model = ExecutionModel(slippage_bps=100, taker_fee=0.01)
+        holdings, cash, total, trades = simulate_execution(close, position, 1000, model, open_prices)
+
+        buy_cost = 11 * 1.01 * 1.01
+        sell_proceeds = 13 * 0.99 * 0.99
+        np.testing.assert_allclose(total, [1000, 1000 * 11.5 / buy_cost, 1000 * 12.5 / buy_cost,
+                                           1000 * sell_proceeds / buy_cost, 1000 * sell_proceeds / buy_cost])
+        np.testing.assert_array_equal(trades, [0, 1, 0, 1, 0])
+        np.testing.assert_array_equal(holdings > 0, [False, True, True, False, False])
+        np.testing.assert_allclose(cash + holdings, total)
+
+    def test_limit_orders_pay_maker_fee_only(self):
+        """Test that limit orders skip the spread and slippage and pay the maker fee."""
+        close = self.data['close'].to_numpy()
+        limit = ExecutionModel(fill='close', order_type='limit', slippage_bps=50, spread_bps=20, maker_fee=0.001)
+        expected = simulate_long_only(close, self.position, 1000, 0.001)[2]
+        np.testing.assert_allclose(simulate_execution(close, self.position, 1000, limit)[2], expected)
+
+        market = ExecutionModel(fill='close', slippage_bps=50, spread_bps=20, taker_fee=0.001)
+        self.assertLess(simulate_execution(close, self.position, 1000, market)[2][-1], expected[-1])
+        self.assertAlmostEqual(market.price_impact, 0.006)
+
+    def test_volume_capped_partial_fills(self):
+        """Test that orders larger than the volume cap fill over several bars."""
+        close = np.array([10.0, 20.0, 20.0, 10.0, 10.0, 10.0])
+        position = np.array([True, True, True, False, False, False])
+        model = ExecutionModel(fill='close', taker_fee=0.0, max_volume_fraction=0.5)
+        holdings, cash, total, trades = simulate_execution(close, position, 1000, model, volume=np.full(6, 100.0))
+
+        # 50 units at 10, then the remaining 500 buys 25 units at 20; exits sell 50 then 25
+        np.testing.assert_allclose(cash, [500, 0, 0, 500, 750, 750])
+        np.testing.assert_allclose(holdings, [500, 1500, 1500, 250, 0, 0])
+        np.testing.assert_array_equal(trades, [1, 1, 0, 1, 1, 0])
+        np.testing.assert_allclose(total, cash + holdings)
+
+    def test_unbinding_cap_matches_uncapped(self):
+        """Test that a cap above every order size changes nothing, for one or many columns."""
+        close, open_prices, volume = (self.data[name].to_numpy() for name in ('close', 'open', 'volume'))
+        position = np.column_stack([self.position, np.roll(self.position, 5), ~self.position])
+        free = ExecutionModel(slippage_bps=5, spread_bps=4)
+        capped = ExecutionModel(slippage_bps=5, spread_bps=4, max_volume_fraction=1e6)
+        expected = simulate_execution(close, position, 1000, free, open_prices)
+        block = simulate_execution(close, position, 1000, capped, open_prices, volume)
+        for actual, wanted in zip(block, expected):
+            np.testing.assert_allclose(actual, wanted, rtol=1e-9)
+
+        tight = ExecutionModel(slippage_bps=5, spread_bps=4, max_volume_fraction=0.01)
+        totals = simulate_execution(close, position, 1000, tight, open_prices, volume)[2]
+        for column in range(3):
+            single = simulate_execution(close, position[:, column], 1000, tight, open_prices, volume)[2]
+            np.testing.assert_allclose(totals[:, column], single)
+
+    def test_invalid_models(self):
+        """Test that invalid settings and missing columns are rejected."""
+        for kwargs in [{'fill': 'vwap'}, {'order_type': 'stop'}, {'slippage_bps': -1},
+                       {'taker_fee': 1.5}, {'max_volume_fraction': 0}]:
+            with self.assertRaises(ValueError, msg=kwargs):
+                ExecutionModel(**kwargs)
+        with self.assertRaises(ValueError):
+            ExecutionModel().inputs(self.data[['close']])
+        with self.assertRaises(ValueError):
+            ExecutionModel(fill='close', max_volume_fraction=0.1).inputs(self.data[['open', 'close']])
+
+class TestExecutionIntegration(unittest.TestCase):
+
+    def setUp(self):
+        """Set up a random-walk OHLCV series."""
+        rng = np.random.default_rng(5)
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, 400)))
+        self.data = pd.DataFrame({'open': np.r_[close[0], close[:-1]], 'close': close,
+                                  'volume': rng.uniform(10, 100, 400)})
+        self.model = ExecutionModel(slippage_bps=10, spread_bps=10, max_volume_fraction=0.5)
+
+    def test_backtester_fills_on_next_bar(self):
+        """Test that the Backtester acts on a signal one bar later under next_open fills."""
+        data = pd.DataFrame({'open': [10.0, 10, 10, 10, 10], 'close': [10.0, 10, 10, 10, 10]})
+        backtester = Backtester(None, data, initial_cash=1000, execution=ExecutionModel(taker_fee=0.0))
+        portfolio = backtester.run(signals=np.array([BUY, HOLD, SELL, HOLD, HOLD], dtype=np.int8))
+        np.testing.assert_array_equal(portfolio['trades'], [0, 1, 0, 1, 0])
+        np.testing.assert_array_equal(portfolio['holdings'] > 0, [False, True, True, False, False])
+
+        with self.assertRaises(ValueError):
+            Backtester(None, data, engine='loop', execution=ExecutionModel())
+
+    def test_sweeps_match_backtester(self):
+        """Test that sweeps under an execution model agree with per-pair backtests."""
+        results = sweep_ma_crossover(self.data, [5, 10], [20, 40], initial_cash=1000, chunk_size=3,
+                                     performance=True, execution=self.model)
+        for row in results.itertuples():
+            strategy = MovingAverageCrossoverStrategy(short_window=row.short_window, long_window=row.long_window)
+            backtester = Backtester(strategy, self.data, initial_cash=1000, execution=self.model)
+            portfolio = backtester.run()
+            self.assertAlmostEqual(row.final_value, portfolio['total'].iloc[-1])
+            self.assertEqual(row.trades, portfolio['trades'].sum())
+            self.assertAlmostEqual(row.sharpe, backtester.performance(periods_per_year=365)['sharpe'])
+
+        generic = sweep_strategy(self.data, 'ma_crossover', {'short_window': [5, 10], 'long_window': [20, 40]},
+                                 initial_cash=1000, execution=self.model)
+        np.testing.assert_allclose(generic['final_value'], results['final_value'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+import unittest
+import numpy as np
+import sys
+sys.path.append('.')
+from bot.indicator_cache import IndicatorCache, fingerprint
+
+class TestIndicatorCache(unittest.TestCase):
+
+    def test_fingerprint(self):
+        """Test that equal arrays share a fingerprint and different ones do not."""
+        values = np.arange(10.0)
+        self.assertEqual(fingerprint(values), fingerprint(values.copy()))
+        self.assertNotEqual(fingerprint(values), fingerprint(values + 1))
+        self.assertNotEqual(fingerprint(values), fingerprint(values.astype(np.float32)))
+
+    def test_computes_once(self):
+        """Test that a cached indicator is not recomputed and cannot be modified."""
+        cache = IndicatorCache()
+        calls = []
+        compute = lambda: calls.append(1) or np.ones(5)
+        first = cache.get('key', 'sma', (3,), compute)
+        second = cache.get('key', 'sma', (3,), compute)
+        self.assertIs(first, second)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        with self.assertRaises(ValueError):
+            first[0] = 2.0
+
+    def test_lru_and_memory_bounds(self):
+        """Test that the least recently used entries are evicted to respect both bounds."""
+        cache = IndicatorCache(max_entries=2, max_bytes=850)
+        cache.get('a', 'sma', (1,), lambda: np.zeros(10))
+        cache.get('b', 'sma', (1,), lambda: np.zeros(10))
+        cache.get('a', 'sma', (1,), lambda: np.zeros(10))  # 'a' becomes most recent
+        cache.get('c', 'sma', (1,), lambda: np.zeros(10))
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.misses, 3)
+        cache.get('a', 'sma', (1,), lambda: np.zeros(10))
+        self.assertEqual(cache.misses, 3)
+
+        cache.get('d', 'sma', (1,), lambda: np.zeros(100))  # 800 bytes evicts both others
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(cache.nbytes, 800)
+        cache.get('e', 'sma', (1,), lambda: np.zeros(120))  # too large to cache at all
+        self.assertEqual(len(cache), 1)
+
+if __name__ == '__main__':
+    unittest.main()
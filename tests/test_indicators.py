@@ -0,0 +1,72 @@
+import unittest
+import numpy as np
+import pandas as pd
+import sys
+sys.path.append('.')
+from bot.indicators import (RunningMean, exponential_mean, relative_strength_index, rolling_mean,
+                            rolling_mean_table, rolling_std)
+
+class TestRollingMean(unittest.TestCase):
+
+    def setUp(self):
+        """Set up a random-walk price series."""
+        rng = np.random.default_rng(7)
+        self.close = 100 + np.cumsum(rng.normal(0, 1, 500))
+
+    def test_matches_pandas_rolling_mean(self):
+        """Test that the cumulative-sum mean matches pandas with min_periods=1."""
+        for window in [1, 5, 50, 499, 800]:
+            expected = pd.Series(self.close).rolling(window=window, min_periods=1).mean()
+            np.testing.assert_allclose(rolling_mean(self.close, window), expected, rtol=1e-10)
+
+    def test_table_columns_match_single_windows(self):
+        """Test that every table column equals the single-window computation."""
+        windows = [3, 10, 40]
+        table = rolling_mean_table(self.close, windows)
+        self.assertEqual(table.shape, (500, 3))
+        for i, window in enumerate(windows):
+            np.testing.assert_array_equal(table[:, i], rolling_mean(self.close, window))
+
+    def test_two_dimensional_input(self):
+        """Test that 2-D inputs are averaged column by column."""
+        block = np.column_stack([self.close, self.close[::-1]])
+        means = rolling_mean(block, 20)
+        np.testing.assert_array_equal(means[:, 0], rolling_mean(self.close, 20))
+        np.testing.assert_array_equal(means[:, 1], rolling_mean(self.close[::-1], 20))
+
+    def test_missing_values_are_skipped(self):
+        """Test that NaNs are skipped like pandas does, in batch and one value at a time."""
+        close = self.close.copy()
+        close[[0, 100, 101, 102, 300]] = np.nan
+        for window in [1, 2, 20]:
+            expected = pd.Series(close).rolling(window=window, min_periods=1).mean()
+            np.testing.assert_allclose(rolling_mean(close, window), expected, rtol=1e-10)
+            running = RunningMean(window)
+            np.testing.assert_allclose([running.update(value) for value in close], expected, rtol=1e-10)
+        np.testing.assert_allclose(rolling_mean_table(close, [5])[:, 0], rolling_mean(close, 5))
+        expected = pd.Series(close).rolling(window=20, min_periods=1).std(ddof=0)
+        np.testing.assert_allclose(rolling_std(close, 20), expected, rtol=1e-6, atol=1e-6)
+        # The means recover right after the gap
+        self.assertFalse(np.isnan(rolling_mean(close, 2)[103:]).any())
+
+    def test_rolling_std_matches_pandas(self):
+        """Test that the trailing deviation matches pandas' population std."""
+        for window in [2, 20, 300]:
+            expected = pd.Series(self.close).rolling(window=window, min_periods=1).std(ddof=0)
+            np.testing.assert_allclose(rolling_std(self.close, window), expected, rtol=1e-6, atol=1e-6)
+
+    def test_exponential_mean_matches_pandas(self):
+        """Test that the EMA matches pandas' recursive ewm."""
+        expected = pd.Series(self.close).ewm(span=12, adjust=False).mean()
+        np.testing.assert_allclose(exponential_mean(self.close, 12), expected, rtol=1e-12)
+
+    def test_relative_strength_index(self):
+        """Test RSI bounds and its value on monotonic series."""
+        rsi = relative_strength_index(self.close, 14)
+        self.assertTrue(((rsi >= 0) & (rsi <= 100)).all())
+        self.assertEqual(rsi[0], 50.0)
+        np.testing.assert_array_equal(relative_strength_index(np.arange(1.0, 30.0), 14)[1:], 100.0)
+        np.testing.assert_array_equal(relative_strength_index(np.arange(30.0, 1.0, -1), 14)[1:], 0.0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+import asyncio
+import os
+import pstats
+import tempfile
+import tracemalloc
+import unittest
+from unittest.mock import patch
+import numpy as np
+import pandas as pd
+import sys
+sys.path.append('.')
+import app
+from bot import instrumentation
+from bot.instrumentation import Metrics, timed
+from bot.strategy import MovingAverageCrossoverStrategy
+
+class TestMetrics(unittest.TestCase):
+
+    def test_timings_counters_and_gauges(self):
+        """Test that stages, counters and gauges are recorded."""
+        metrics = Metrics()
+        for _ in range(3):
+            with metrics.timer('stage'):
+                pass
+        metrics.increment('events')
+        metrics.increment('events', 4)
+        metrics.set_gauge('pending', 2)
+
+        snapshot = metrics.snapshot()
+        self.assertEqual(snapshot['timings']['stage']['count'], 3)
+        self.assertGreaterEqual(snapshot['timings']['stage']['max'], 0.0)
+        self.assertEqual(snapshot['counters'], {'events': 5})
+        self.assertEqual(snapshot['gauges'], {'pending': 2})
+
+        metrics.reset()
+        self.assertEqual(metrics.snapshot()['timings'], {})
+
+    def test_disabled_records_nothing(self):
+        """Test that disabled metrics ignore every hook."""
+        metrics = Metrics(enabled=False)
+        with metrics.timer('stage'):
+            metrics.increment('events')
+        metrics.set_gauge('pending', 1)
+        self.assertEqual(metrics.snapshot(), {'timings': {}, 'counters': {}, 'gauges': {}, 'peak_bytes': {}})
+
+    def test_prometheus_format(self):
+        """Test the Prometheus text exposition of every metric family."""
+        metrics = Metrics()
+        metrics.observe('fetch "ohlcv"', 0.5)
+        metrics.observe('fetch "ohlcv"', 0.25)
+        metrics.increment('fetch_errors')
+        text = metrics.to_prometheus()
+
+        self.assertIn('# TYPE bot_stage_seconds summary\n', text)
+        self.assertIn('bot_stage_seconds_count{stage="fetch \\"ohlcv\\""} 2\n', text)
+        self.assertIn('bot_stage_seconds_sum{stage="fetch \\"ohlcv\\""} 0.75\n', text)
+        self.assertIn('bot_stage_seconds_max{stage="fetch \\"ohlcv\\""} 0.5\n', text)
+        self.assertIn('# TYPE bot_events_total counter\nbot_events_total{event="fetch_errors"} 1\n', text)
+        self.assertNotIn('bot_gauge', text)
+        self.assertTrue(text.endswith('\n'))
+
+    def test_environment_configuration(self):
+        """Test the BOT_METRICS and BOT_PROFILE switches."""
+        if not tracemalloc.is_tracing():
+            self.addCleanup(tracemalloc.stop)
+        self.assertFalse(Metrics.from_environment({'BOT_METRICS': '0'}).enabled)
+        self.assertTrue(Metrics.from_environment({}).enabled)
+        self.assertEqual(Metrics.from_environment({'BOT_PROFILE': 'tracemalloc'}).profile, {'tracemalloc'})
+        with self.assertRaises(ValueError):
+            Metrics.from_environment({'BOT_PROFILE': 'perf'})
+
+    def test_profilers(self):
+        """Test that stages are profiled with cProfile and tracemalloc when requested."""
+        if not tracemalloc.is_tracing():
+            self.addCleanup(tracemalloc.stop)
+        metrics = Metrics(profile=('cprofile', 'tracemalloc'))
+        with metrics.timer('outer'):
+            with metrics.timer('inner'):  # nested stages are timed but not profiled
+                np.ones(1_000_000).sum()
+
+        snapshot = metrics.snapshot()
+        self.assertEqual(set(snapshot['timings']), {'outer', 'inner'})
+        self.assertGreaterEqual(snapshot['peak_bytes']['outer'], 8_000_000)
+        self.assertNotIn('inner', snapshot['peak_bytes'])
+        with tempfile.TemporaryDirectory() as directory:
+            paths = metrics.dump_profiles(directory)
+            self.assertEqual(paths, [os.path.join(directory, 'outer.prof')])
+            self.assertGreater(pstats.Stats(paths[0]).total_calls, 0)
+
+    def test_timed_decorator(self):
+        """Test that sync and async functions are timed through the module metrics."""
+        @timed('double')
+        def double(value):
+            return 2 * value
+
+        @timed('async_double')
+        async def async_double(value):
+            return 2 * value
+
+        metrics = Metrics()
+        with patch.object(instrumentation, 'metrics', metrics):
+            self.assertEqual(double(2), 4)
+            self.assertEqual(asyncio.run(async_double(3)), 6)
+            metrics.enabled = False
+            self.assertEqual(double(5), 10)
+        timings = metrics.snapshot()['timings']
+        self.assertEqual(timings['double']['count'], 1)
+        self.assertEqual(timings['async_double']['count'], 1)
+
+    def test_metrics_endpoint(self):
+        """Test that instrumented stages show up on /metrics."""
+        metrics = Metrics()
+        data = pd.DataFrame({'close': np.linspace(100, 200, 50)})
+        with patch.object(instrumentation, 'metrics', metrics), patch.object(app, 'metrics', metrics):
+            MovingAverageCrossoverStrategy(short_window=2, long_window=5).generate_signals(data)
+            response = app.app.test_client().get('/metrics')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.content_type.startswith('text/plain'))
+        self.assertIn(b'bot_stage_seconds_count{stage="generate_signals"} 1', response.data)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,184 @@
+import threading
+import unittest
+from unittest.mock import patch
+import numpy as np
+import pandas as pd
+import sys
+sys.path.append('.')
+import app
+from bot.backtester import Backtester
+from bot.instrumentation import metrics
+from bot.jobs import BacktestJobs, JobQueue, QueueFullError
+from bot.strategy import MovingAverageCrossoverStrategy
+from bot.sweep import sweep_strategy
+
+class HistoryFetcher:
+    """Serves a fixed daily series from fetch_history, counting the calls."""
+    def __init__(self, data):
+        self.data = data
+        self.calls = 0
+
+    def fetch_history(self, symbol, timeframe, since, until=None, page_limit=None):
+        self.calls += 1
+        return self.data
+
+class TestJobQueue(unittest.TestCase):
+
+    def setUp(self):
+        """Set up a queue whose jobs block until released."""
+        self.release = threading.Event()
+        self.runs = []
+
+        def run(params):
+            self.runs.append(params)
+            self.release.wait(10)
+            if params.get('fail'):
+                raise RuntimeError('boom')
+            return {'value': params['value'] * 2}
+
+        self.queue = JobQueue({'double': (dict, run)}, max_workers=1, max_pending=2)
+
+    def tearDown(self):
+        self.release.set()
+        self.queue.shutdown()
+
+    def test_deduplicates_and_caches(self):
+        """Test that identical submissions share one job and its result."""
+        first = self.queue.submit('double', {'value': 2})
+        self.assertEqual(self.queue.submit('double', {'value': 2})['id'], first['id'])
+        self.release.set()
+        done = self.queue.wait(first['id'], timeout=10)
+        self.assertEqual(done['status'], 'done')
+        self.assertEqual(done['result'], {'value': 4})
+
+        again = self.queue.submit('double', {'value': 2})
+        self.assertEqual(again['id'], first['id'])
+        self.assertEqual(again['status'], 'done')
+        self.assertEqual(len(self.runs), 1)
+
+    def test_bounded_queue_and_failures(self):
+        """Test that the queue rejects work beyond its bound and reports failures."""
+        failing = self.queue.submit('double', {'value': 1, 'fail': True})
+        self.queue.submit('double', {'value': 3})
+        with self.assertRaises(QueueFullError):
+            self.queue.submit('double', {'value': 5})
+        with self.assertRaises(ValueError):
+            self.queue.submit('triple', {'value': 5})
+
+        self.release.set()
+        failed = self.queue.wait(failing['id'], timeout=10)
+        self.assertEqual(failed['status'], 'failed')
+        self.assertIn('boom', failed['error'])
+        # A failed job is not reused: resubmitting runs it again
+        retry = self.queue.submit('double', {'value': 1, 'fail': True})
+        self.assertNotEqual(retry['id'], failing['id'])
+        self.assertIsNone(self.queue.status('missing'))
+
+    def test_shutdown_settles_queued_jobs(self):
+        """Test that jobs cancelled by shutdown leave the pending count and are reported as failed."""
+        running = self.queue.submit('double', {'value': 1})
+        queued = self.queue.submit('double', {'value': 2})
+        self.queue.shutdown(wait=False)
+        self.assertEqual(self.queue.status(queued['id'])['status'], 'failed')
+        self.assertIn('shut down', self.queue.status(queued['id'])['error'])
+
+        self.release.set()
+        self.assertEqual(self.queue.wait(running['id'], timeout=10)['status'], 'done')
+        self.assertEqual(self.queue._pending, 0)
+        self.assertEqual(metrics.snapshot()['gauges']['jobs_pending'], 0)
+
+class TestBacktestJobs(unittest.TestCase):
+
+    def setUp(self):
+        """Set up the job handlers on a random-walk daily series."""
+        rng = np.random.default_rng(4)
+        index = pd.date_range('2023-01-01', periods=400, freq='D')
+        self.data = pd.DataFrame({'close': 100 * np.exp(np.cumsum(rng.normal(0, 0.02, 400)))}, index=index)
+        self.fetcher = HistoryFetcher(self.data)
+        self.handlers = BacktestJobs(self.fetcher)
+
+    def test_normalize(self):
+        """Test that defaults are filled in and invalid parameters rejected."""
+        params = self.handlers.normalize_backtest({'params': {'short_window': 5, 'long_window': 20}})
+        self.assertEqual(params['symbol'], 'ETH/USD')
+        self.assertEqual(params['bars'], 500)
+        self.assertEqual(params['commission'], 0.002)
+        for invalid in [{'timeframe': '1x'}, {'bars': 1}, {'strategy': 'martingale'},
+                        {'params': {'window': 3}}, {'params': {'short_window': 30, 'long_window': 20}},
+                        {'commission': 'low'}, {'param_grid': {}}]:
+            with self.assertRaises(ValueError, msg=invalid):
+                self.handlers.normalize_backtest(invalid)
+        with self.assertRaises(ValueError):
+            self.handlers.normalize_optimization({'strategy': 'rsi', 'param_grid': {'short_window': [5]}})
+
+    def test_unbounded_parameters_are_rejected(self):
+        """Test that windows, reserved arguments and indicator tables are bounded before any work."""
+        for strategy_params in [{'short_window': 5, 'long_window': 30000000}, {'short_window': 0, 'long_window': 20},
+                                {'short_window': 5.5, 'long_window': 20}, {'indicator_cache': None},
+                                {'sentiment': [1]}, {'sentiment_analyzer': 'x'}]:
+            with self.assertRaises(ValueError, msg=strategy_params):
+                self.handlers.normalize_backtest({'params': strategy_params})
+        for grid in [{'short_window': [-5], 'long_window': [20]}, {'short_window': [5], 'long_window': [2.5]},
+                     {'short_window': list(range(1, 301)), 'long_window': [400]}]:
+            with self.assertRaises(ValueError, msg=grid):
+                self.handlers.normalize_optimization({'bars': 100000, 'param_grid': grid})
+        self.handlers.normalize_optimization({'bars': 100000, 'param_grid': {'short_window': [5], 'long_window': [20]}})
+
+    def test_backtest_matches_backtester(self):
+        """Test that a backtest job reports the same result as a direct run."""
+        params = self.handlers.normalize_backtest({'bars': 300, 'params': {'short_window': 5, 'long_window': 20}})
+        result = self.handlers.backtest(params)
+
+        strategy = MovingAverageCrossoverStrategy(short_window=5, long_window=20)
+        portfolio = Backtester(strategy, self.data.iloc[-300:], initial_cash=10000, commission=0.002).run()
+        self.assertAlmostEqual(result['final_value'], portfolio['total'].iloc[-1])
+        self.assertEqual(result['total_trades'], portfolio['trades'].sum())
+        self.assertEqual(len(result['equity']['total']), 300)
+        self.assertAlmostEqual(result['metrics']['total_return'], portfolio['total'].iloc[-1] / 10000 - 1)
+        self.assertEqual(result['metrics']['trades'], result['total_trades'])
+
+    def test_optimize_returns_best_results(self):
+        """Test that an optimization job returns the best parameter sets of its grid."""
+        grid = {'window': [10, 20], 'oversold': [25, 30], 'overbought': [70]}
+        params = self.handlers.normalize_optimization({'strategy': 'rsi', 'param_grid': grid, 'top': 2})
+        result = self.handlers.optimize(params)
+
+        expected = sweep_strategy(self.data.iloc[-1000:], 'rsi', grid).sort_values('return', ascending=False)
+        self.assertEqual(result['evaluated'], 4)
+        self.assertEqual([row['return'] for row in result['top']], list(expected['return'][:2]))
+        self.assertIn('sharpe', result['top'][0])
+
+    def test_api(self):
+        """Test submitting, deduplicating and polling jobs over HTTP."""
+        queue = JobQueue(self.handlers.handlers())
+        client = app.app.test_client()
+        with patch.object(app, 'jobs', queue):
+            body = {'bars': 200, 'params': {'short_window': 5, 'long_window': 20}}
+            submitted = client.post('/api/backtests', json=body)
+            self.assertIn(submitted.status_code, (200, 202))
+            job_id = submitted.get_json()['id']
+            self.assertEqual(submitted.headers['Location'], f"/api/jobs/{job_id}")
+
+            queue.wait(job_id, timeout=30)
+            polled = client.get(f"/api/jobs/{job_id}").get_json()
+            self.assertEqual(polled['status'], 'done')
+            self.assertEqual(polled['result']['bars'], 200)
+            self.assertEqual(len(polled['result']['equity']['total']), 200)
+            self.assertIsInstance(polled['result']['equity']['timestamps'][0], int)
+
+            repeated = client.post('/api/backtests', json=dict(body, symbol='ETH/USD'))
+            self.assertEqual(repeated.status_code, 200)
+            self.assertEqual(repeated.get_json()['id'], job_id)
+            self.assertEqual(self.fetcher.calls, 1)
+
+            optimization = client.post('/api/optimizations', json={'strategy': 'bollinger', 'top': 3})
+            done = queue.wait(optimization.get_json()['id'], timeout=30)
+            self.assertEqual(len(done['result']['top']), 3)
+
+            self.assertEqual(client.post('/api/backtests', json={'bars': 'all'}).status_code, 400)
+            self.assertEqual(client.post('/api/backtests', json=[1]).status_code, 400)
+            self.assertEqual(client.get('/api/jobs/missing').status_code, 404)
+        queue.shutdown()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+import asyncio
+import time
+import unittest
+from unittest.mock import patch
+import numpy as np
+import pandas as pd
+import sys
+sys.path.append('.')
+from bot.backtester import Backtester
+from bot.data_fetcher import DataFetcher
+from bot.live import PaperAccount, PaperTrader, PollingFeed, ReplayFeed, run_paper_trading
+from bot.strategy import MovingAverageCrossoverStrategy
+from tests.fake_exchange import FakeExchange
+
+def make_candles(seed, count=400):
+    rng = np.random.default_rng(seed)
+    index = pd.date_range('2024-01-01', periods=count, freq='min', name='timestamp')
+    return pd.DataFrame({'close': 100 * np.exp(np.cumsum(rng.normal(0, 0.01, count)))}, index=index)
+
+class GrowingExchange(FakeExchange):
+    """A FakeExchange that only serves its first `visible` candles."""
+    visible = 0
+
+    def candles(self, symbol, timeframe):
+        return super().candles(symbol, timeframe)[:self.visible]
+
+class TestPaperTrading(unittest.TestCase):
+
+    def test_replay_matches_backtester(self):
+        """Test that replaying candles for two symbols matches their backtests."""
+        candles = {'ETH/USD': make_candles(1), 'BTC/USD': make_candles(2)}
+        traders = [
+            PaperTrader(symbol, MovingAverageCrossoverStrategy(short_window=5, long_window=20),
+                        ReplayFeed(data), account=PaperAccount(initial_cash=1000, commission=0.002))
+            for symbol, data in candles.items()
+        ]
+
+        stats = asyncio.run(run_paper_trading(traders))
+
+        for trader in traders:
+            strategy = MovingAverageCrossoverStrategy(short_window=5, long_window=20)
+            expected = Backtester(strategy, candles[trader.symbol], initial_cash=1000, commission=0.002).run()
+            portfolio = trader.portfolio()
+            np.testing.assert_allclose(portfolio['total'], expected['total'], rtol=1e-12)
+            np.testing.assert_array_equal(portfolio['trades'], expected['trades'])
+            self.assertEqual(stats[trader.symbol]['count'], 400)
+            self.assertGreaterEqual(stats[trader.symbol]['p99_ms'], 0)
+
+    def test_warmup_candles_do_not_trade(self):
+        """Test that no trades happen during the warm-up candles."""
+        trader = PaperTrader('ETH/USD', MovingAverageCrossoverStrategy(short_window=5, long_window=20),
+                             ReplayFeed(make_candles(3)), warmup=50)
+        asyncio.run(trader.run())
+        self.assertEqual(trader.portfolio()['trades'].iloc[:50].sum(), 0)
+
+    @patch('ccxt.kraken')
+    def test_polling_feed_emits_each_closed_candle_once(self, mock_kraken):
+        """Test that polls emit the warm-up history, then only newly closed candles."""
+        exchange = GrowingExchange(start=1704067200000, count=100)
+        exchange.visible = 10
+        mock_kraken.return_value = exchange
+        feed = PollingFeed(DataFetcher(), 'ETH/USD', timeframe='1m', poll_interval=0, history=5)
+
+        async def collect():
+            candles = []
+            async for candle in feed:
+                candles.append(candle)
+                if len(candles) >= 6:
+                    exchange.visible += 1  # one more candle opens before the next poll
+                if len(candles) == 9:
+                    return candles
+
+        started = time.perf_counter()
+        candles = asyncio.run(collect())
+        rows = exchange.candles('ETH/USD', '1m')
+        self.assertEqual([int(timestamp.timestamp() * 1000) for timestamp, _, _ in candles],
+                         [row[0] for row in rows[3:12]])
+        self.assertEqual([close for _, close, _ in candles], [row[4] for row in rows[3:12]])
+        received = [received for _, _, received in candles]
+        self.assertEqual(len(set(received[:6])), 1)  # the warm-up candles arrive in one poll
+        self.assertTrue(started <= received[0] <= received[-1] <= time.perf_counter())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+import unittest
+import numpy as np
+import pandas as pd
+import sys
+sys.path.append('.')
+from bot.backtester import Backtester
+from bot.performance import SWEEP_METRICS, bars_per_year, performance_metrics, rank_results
+from bot.signals import BUY, HOLD, SELL
+from bot.strategy import MovingAverageCrossoverStrategy
+from bot.sweep import sweep_ma_crossover, sweep_strategy
+
+class TestPerformanceMetrics(unittest.TestCase):
+
+    def test_known_curve(self):
+        """Test every metric on a small hand-checked equity curve."""
+        total = np.array([110.0, 99.0, 99.0, 120.0])
+        position = np.array([True, True, False, True])
+        stats = performance_metrics(total, 100.0, position, periods_per_year=4)
+
+        returns = np.array([0.1, -0.1, 0.0, 120 / 99 - 1])
+        self.assertAlmostEqual(stats['total_return'], 0.2)
+        self.assertAlmostEqual(stats['cagr'], 0.2)  # exactly one year of bars
+        self.assertAlmostEqual(stats['sharpe'], returns.mean() / returns.std(ddof=1) * 2)
+        self.assertAlmostEqual(stats['sortino'], returns.mean() / np.sqrt(0.01 / 4) * 2)
+        self.assertAlmostEqual(stats['max_drawdown'], 0.1)
+        self.assertEqual(stats['max_drawdown_duration'], 2)
+        self.assertAlmostEqual(stats['exposure'], 0.75)
+        # Round trips: 100 -> 99 (a loss), then 99 -> 120 still open (a win)
+        self.assertAlmostEqual(stats['win_rate'], 0.5)
+        self.assertEqual(stats['trades'], 3)
+        self.assertAlmostEqual(stats['turnover'], (110 + 99 + 120) / total.mean())
+
+    def test_block_matches_single_curves(self):
+        """Test that a 2-D block gives the same metrics as each curve on its own."""
+        rng = np.random.default_rng(2)
+        total = 1000 * np.exp(np.cumsum(rng.normal(0, 0.01, (250, 6)), axis=0))
+        position = rng.random((250, 6)) < 0.5
+        block = performance_metrics(total, 1000, position)
+        for column in range(6):
+            single = performance_metrics(total[:, column], 1000, position[:, column])
+            for name, value in single.items():
+                np.testing.assert_allclose(block[name][column], value, rtol=1e-12, err_msg=name)
+
+    def test_flat_curve(self):
+        """Test that metrics without a meaningful value are NaN rather than errors."""
+        stats = performance_metrics(np.full(10, 100.0), 100.0, np.zeros(10, dtype=bool))
+        self.assertTrue(np.isnan(stats['sharpe']))
+        self.assertTrue(np.isnan(stats['win_rate']))
+        self.assertEqual(stats['max_drawdown'], 0.0)
+        self.assertEqual(stats['trades'], 0)
+
+    def test_bars_per_year(self):
+        """Test the annualization factor inferred from timestamps."""
+        self.assertAlmostEqual(bars_per_year(pd.date_range('2024-01-01', periods=10, freq='D')), 365)
+        self.assertAlmostEqual(bars_per_year(pd.date_range('2024-01-01', periods=10, freq='h')), 365 * 24)
+        self.assertEqual(bars_per_year(pd.RangeIndex(10)), 365)
+
+    def test_backtester_performance(self):
+        """Test that Backtester reports the metrics of its portfolio."""
+        data = pd.DataFrame({'close': [100, 110, 120, 110, 100, 90]})
+        backtester = Backtester(None, data, initial_cash=1000, commission=0.01)
+        backtester.run(signals=np.array([BUY, HOLD, HOLD, SELL, HOLD, HOLD], dtype=np.int8))
+        stats = backtester.performance()
+        self.assertEqual(stats['trades'], 2)
+        self.assertEqual(stats['win_rate'], 1.0)
+        self.assertAlmostEqual(stats['total_return'], 0.0782178, places=6)
+
+class TestSweepMetrics(unittest.TestCase):
+
+    def setUp(self):
+        """Set up a random-walk price series."""
+        rng = np.random.default_rng(8)
+        self.data = pd.DataFrame({'close': 100 * np.exp(np.cumsum(rng.normal(0, 0.02, 400)))})
+
+    def test_sweep_metrics_match_backtests(self):
+        """Test that the block-wise sweep metrics equal each pair's own backtest metrics."""
+        results = sweep_ma_crossover(self.data, [5, 10], [20, 40], initial_cash=1000, chunk_size=3,
+                                     performance=True)
+        self.assertEqual(list(results.columns[5:]), list(SWEEP_METRICS))
+        for row in results.itertuples():
+            strategy = MovingAverageCrossoverStrategy(short_window=row.short_window, long_window=row.long_window)
+            backtester = Backtester(strategy, self.data, initial_cash=1000, commission=0.002)
+            backtester.run()
+            stats = backtester.performance()
+            for name in SWEEP_METRICS:
+                np.testing.assert_allclose(getattr(row, name), stats[name], rtol=1e-9, err_msg=name)
+
+        generic = sweep_strategy(self.data, 'ma_crossover', {'short_window': [5, 10], 'long_window': [20, 40]},
+                                 initial_cash=1000, performance=True)
+        np.testing.assert_allclose(generic[list(SWEEP_METRICS)], results[list(SWEEP_METRICS)], rtol=1e-9)
+
+    def test_rank_results(self):
+        """Test ranking by metrics where higher or lower is better."""
+        results = sweep_ma_crossover(self.data, [5, 10, 15], [20, 40], performance=True)
+        by_sharpe = rank_results(results, 'sharpe', top=3)
+        self.assertEqual(len(by_sharpe), 3)
+        self.assertTrue(by_sharpe['sharpe'].is_monotonic_decreasing)
+        self.assertTrue(rank_results(results, 'max_drawdown')['max_drawdown'].is_monotonic_increasing)
+        with self.assertRaises(ValueError):
+            rank_results(results, 'calmar')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import unittest
+import numpy as np
+import pandas as pd
+import sys
+sys.path.append('.')
+from bot.backtester import Backtester
+from bot.portfolio import PortfolioBacktester
+from bot.strategy import MovingAverageCrossoverStrategy
+
+class TestPortfolioBacktester(unittest.TestCase):
+
+    def setUp(self):
+        """Set up random-walk candles for three symbols."""
+        rng = np.random.default_rng(9)
+        index = pd.date_range('2024-01-01', periods=300, freq='h', name='timestamp')
+        self.panel = {
+            symbol: pd.DataFrame({'close': 100 * np.exp(np.cumsum(rng.normal(0, 0.02, 300)))}, index=index)
+            for symbol in ['ETH/USD', 'BTC/USD', 'SOL/USD']
+        }
+        self.strategy = MovingAverageCrossoverStrategy(short_window=5, long_window=20)
+
+    def test_each_symbol_matches_single_backtest(self):
+        """Test that every sleeve matches a single-symbol backtest with its allocation."""
+        backtester = PortfolioBacktester(self.strategy, self.panel, initial_cash=3000, commission=0.002)
+        portfolio = backtester.run()
+
+        for symbol, data in self.panel.items():
+            expected = Backtester(self.strategy, data, initial_cash=1000, commission=0.002).run()
+            np.testing.assert_allclose(backtester.symbol_equity[symbol], expected['total'], rtol=1e-12)
+
+        np.testing.assert_allclose(portfolio['total'], backtester.symbol_equity.sum(axis=1))
+        np.testing.assert_allclose(portfolio['total'], portfolio['cash'] + portfolio['holdings'])
+
+    def test_unallocated_capital_stays_in_cash(self):
+        """Test that capital outside the weights is kept as cash."""
+        backtester = PortfolioBacktester(self.strategy, self.panel, initial_cash=1000,
+                                         weights={'ETH/USD': 0.5})
+        portfolio = backtester.run()
+        self.assertTrue((portfolio['cash'] >= 500).all())
+        self.assertTrue((backtester.symbol_equity['BTC/USD'] == 0).all())
+
+    def test_invalid_weights_and_sentiment(self):
+        """Test that negative weights and a single sentiment series for many symbols are rejected."""
+        with self.assertRaises(ValueError):
+            PortfolioBacktester(self.strategy, self.panel, weights={'ETH/USD': 0.8, 'BTC/USD': -0.3})
+        index = self.panel['ETH/USD'].index
+        strategy = MovingAverageCrossoverStrategy(short_window=5, long_window=20,
+                                                  sentiment=pd.Series(-1.0, index=index))
+        with self.assertRaises(ValueError):
+            PortfolioBacktester(strategy, self.panel)
+
+    def test_sentiment_is_applied_as_of_each_bar(self):
+        """Test that per-symbol sentiment columns override signals like single-symbol backtests do."""
+        index = self.panel['ETH/USD'].index
+        rng = np.random.default_rng(2)
+        sentiment = pd.DataFrame({symbol: rng.choice([-0.9, 0.0, 0.9], size=30) for symbol in ['ETH/USD', 'BTC/USD']},
+                                 index=index[::10])
+        strategy = MovingAverageCrossoverStrategy(short_window=5, long_window=20, sentiment=sentiment)
+        backtester = PortfolioBacktester(strategy, self.panel, initial_cash=3000, commission=0.002)
+        backtester.run()
+
+        for symbol, data in self.panel.items():
+            single = MovingAverageCrossoverStrategy(short_window=5, long_window=20,
+                                                    sentiment=sentiment[symbol] if symbol in sentiment else None)
+            expected = Backtester(single, data, initial_cash=1000, commission=0.002).run()
+            np.testing.assert_allclose(backtester.symbol_equity[symbol], expected['total'], rtol=1e-12)
+
+    def test_symbol_listed_later_stays_flat(self):
+        """Test that a symbol does not trade before its first price."""
+        self.panel['SOL/USD'].iloc[:100] = np.nan
+        backtester = PortfolioBacktester(self.strategy, self.panel)
+        backtester.run()
+        self.assertFalse(backtester.symbol_positions['SOL/USD'].iloc[:100].any())
+
+    def test_symbol_listed_later_matches_its_own_backtest(self):
+        """Test that a late symbol's signals ignore the bars before its first price."""
+        self.panel['SOL/USD'].iloc[:100] = np.nan
+        backtester = PortfolioBacktester(self.strategy, self.panel, initial_cash=3000, commission=0.002)
+        backtester.run()
+
+        expected = Backtester(self.strategy, self.panel['SOL/USD'].iloc[100:], initial_cash=1000,
+                              commission=0.002).run()
+        np.testing.assert_allclose(backtester.symbol_equity['SOL/USD'].iloc[100:], expected['total'], rtol=1e-12)
+        self.assertTrue((backtester.symbol_equity['SOL/USD'].iloc[:100] == 1000).all())
+        expected = Backtester(self.strategy, self.panel['ETH/USD'], initial_cash=1000, commission=0.002).run()
+        np.testing.assert_allclose(backtester.symbol_equity['ETH/USD'], expected['total'], rtol=1e-12)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,153 @@
+import contextlib
+import io
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+import numpy as np
+import pandas as pd
+import sys
+sys.path.append('.')
+from bot.candle_store import CandleStore, to_milliseconds
+from bot.data_fetcher import DataFetcher
+from bot.data_source import ColumnarData
+from bot.resample import Resampler, align_to_bars, bucket_milliseconds, resample_ohlcv
+from bot.strategy import MovingAverageCrossoverStrategy
+from tests.fake_exchange import FakeExchange
+
+HOUR = 3600000
+START = 1609459200000  # 2021-01-01 00:00 UTC
+
+def hourly_candles(count, start=START, seed=0):
+    """Builds random hourly OHLCV candles."""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, count)))
+    index = pd.to_datetime(start + HOUR * np.arange(count), unit='ms')
+    return pd.DataFrame({'open': close * 1.001, 'high': close * 1.01, 'low': close * 0.99, 'close': close,
+                         'volume': rng.uniform(1, 10, count)}, index=pd.DatetimeIndex(index, name='timestamp'))
+
+class TestResampling(unittest.TestCase):
+
+    def test_matches_pandas_resample(self):
+        """Test that bars aggregate like pandas' UTC-aligned resampling, for frames and columns."""
+        candles = hourly_candles(100).iloc[3:]  # start mid-bucket
+        expected = candles.resample('4h').agg({'open': 'first', 'high': 'max', 'low': 'min',
+                                               'close': 'last', 'volume': 'sum'})
+        bars = resample_ohlcv(candles, '4h')
+        np.testing.assert_array_equal(to_milliseconds(bars.index), to_milliseconds(expected.index))
+        np.testing.assert_allclose(bars.to_numpy(), expected.to_numpy())
+        pd.testing.assert_frame_equal(resample_ohlcv(ColumnarData.from_frame(candles), '4h'), bars)
+
+        daily = resample_ohlcv(candles, '1d')
+        self.assertEqual(list(daily.index), list(pd.to_datetime(['2021-01-01', '2021-01-02', '2021-01-03',
+                                                                  '2021-01-04', '2021-01-05'])))
+
+    def test_invalid_timeframes(self):
+        """Test that calendar and non-tiling timeframes are rejected."""
+        self.assertEqual(bucket_milliseconds('4h', '1h'), 4 * HOUR)
+        for timeframe, base in [('1w', None), ('7m', None), ('5m', '2m'), ('1h', '7m')]:
+            with self.assertRaises(ValueError, msg=timeframe):
+                bucket_milliseconds(timeframe, base)
+
+    def test_alignment_has_no_look_ahead(self):
+        """Test that hourly bars only see daily values once the day has closed."""
+        candles = hourly_candles(72)
+        daily = resample_ohlcv(candles, '1d')
+        hourly_timestamps = to_milliseconds(candles.index)
+        aligned = align_to_bars(daily['close'].to_numpy(), to_milliseconds(daily.index), '1d',
+                                hourly_timestamps, '1h')
+
+        self.assertTrue(np.isnan(aligned[:23]).all())
+        # The last hour of a day closes with the day, so from then on it sees that day's close
+        self.assertEqual(aligned[23], candles['close'].iloc[23])
+        np.testing.assert_array_equal(aligned[24:47], candles['close'].iloc[23])
+        self.assertEqual(aligned[47], candles['close'].iloc[47])
+
+    def test_strategy_higher_timeframe(self):
+        """Test that strategies can request aligned indicators of coarser bars."""
+        candles = hourly_candles(24 * 30)
+        strategy = MovingAverageCrossoverStrategy(short_window=5, long_window=10)
+        trend = strategy.higher_timeframe(candles, '1d', 'sma', 3)
+
+        daily_close = candles['close'].iloc[23::24].to_numpy()
+        expected_sma = pd.Series(daily_close).rolling(3, min_periods=1).mean().to_numpy()
+        self.assertEqual(len(trend), len(candles))
+        np.testing.assert_allclose(trend[23::24], expected_sma)
+        np.testing.assert_allclose(trend[24:47], expected_sma[0])
+        self.assertTrue(np.isnan(trend[:23]).all())
+
+class HistoryFetcher:
+    """Serves fixed hourly candles through fetch_history, recording the requests."""
+    def __init__(self, candles):
+        self.candles = candles
+        self.requests = []
+
+    def fetch_history(self, symbol, timeframe, since, until=None, page_limit=None):
+        self.requests.append((timeframe, since, until))
+        index = to_milliseconds(self.candles.index)
+        return self.candles[(index >= since) & (index < (until if until is not None else index[-1] + 1))]
+
+class TestResampler(unittest.TestCase):
+
+    def test_incremental_updates(self):
+        """Test that repeat requests only re-aggregate candles since the newest bar."""
+        candles = hourly_candles(24 * 10 + 5)
+        fetcher = HistoryFetcher(candles.iloc[:24 * 5 + 7])
+        resampler = Resampler(fetcher, base_timeframe='1h')
+        until = START + 24 * 20 * HOUR
+
+        first = resampler.fetch_history('ETH/USD', '1d', START, until)
+        self.assertEqual(len(first), 6)  # five full days and the current one
+
+        fetcher.candles = candles
+        second = resampler.fetch_history('ETH/USD', '1d', START, until)
+        self.assertEqual(fetcher.requests[-1][1], START + 5 * 24 * HOUR)
+        pd.testing.assert_frame_equal(second, resample_ohlcv(candles, '1d'))
+
+        # A range that is already covered is served without fetching
+        resampler.fetch_history('ETH/USD', '1d', START + 24 * HOUR, START + 3 * 24 * HOUR)
+        self.assertEqual(len(fetcher.requests), 2)
+
+        # Timeframes that cannot be built from the base candles are passed through
+        resampler.fetch_history('ETH/USD', '90m', START, until)
+        self.assertEqual(fetcher.requests[-1], ('90m', START, until))
+
+    def test_short_base_history_falls_back(self):
+        """Test that a range starting before the base candles is fetched in its own timeframe."""
+        fetcher = HistoryFetcher(hourly_candles(24 * 10, start=START + 24 * 30 * HOUR))
+        resampler = Resampler(fetcher, base_timeframe='1h')
+        until = START + 24 * 40 * HOUR
+
+        with contextlib.redirect_stdout(io.StringIO()) as output:
+            resampler.fetch_history('ETH/USD', '1d', START, until)
+        self.assertIn('WARNING', output.getvalue())
+        self.assertEqual([request[0] for request in fetcher.requests], ['1h', '1d'])
+
+        # The known start of the base history spares the hourly request next time
+        resampler.fetch_history('ETH/USD', '4h', START + 24 * HOUR, until)
+        self.assertEqual(fetcher.requests[-1], ('4h', START + 24 * HOUR, until))
+        daily = resampler.fetch_history('ETH/USD', '1d', START + 24 * 31 * HOUR, until)
+        self.assertEqual(fetcher.requests[-1][0], '1h')
+        self.assertEqual(len(daily), 9)
+
+    @patch('ccxt.kraken')
+    def test_one_store_feeds_every_timeframe(self, mock_kraken):
+        """Test that coarse timeframes are served from the stored base candles only."""
+        exchange = FakeExchange(start=START, count=24 * 20, page_size=720)
+        mock_kraken.return_value = exchange
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        resampler = Resampler(DataFetcher(store=CandleStore(directory)), base_timeframe='1h')
+        until = START + 24 * 20 * HOUR
+
+        four_hour = resampler.fetch_history('ETH/USD', '4h', START, until)
+        daily = resampler.fetch_ohlcv('ETH/USD', '1d', since=START, limit=10)
+        self.assertEqual(len(four_hour), 120)
+        self.assertEqual(len(daily), 10)
+        self.assertEqual({call[1] for call in exchange.calls}, {'1h'})
+
+        hourly = CandleStore(directory).load('kraken', 'ETH/USD', '1h')
+        pd.testing.assert_frame_equal(daily, resample_ohlcv(hourly, '1d').iloc[:10])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+import sys
+sys.path.append('.')
+from bot.execution import ExecutionModel
+from bot.performance import rank_results
+from bot.result_store import ResultStore, data_fingerprint, resumable_sweep
+from bot.sweep import sweep_strategy
+
+class TestResultStore(unittest.TestCase):
+
+    def setUp(self):
+        """Set up a store in a temporary directory and a random-walk series."""
+        self.directory = tempfile.mkdtemp()
+        self.store = ResultStore(os.path.join(self.directory, 'results.sqlite'))
+        rng = np.random.default_rng(6)
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, 500)))
+        self.data = pd.DataFrame({'open': close, 'close': close, 'volume': rng.uniform(1, 10, 500)})
+        self.grid = {'window': [10, 14, 20], 'oversold': [25, 30], 'overbought': [70, 75]}
+
+    def tearDown(self):
+        self.store.close()
+        shutil.rmtree(self.directory)
+
+    def test_interrupted_sweep_resumes(self):
+        """Test that a sweep interrupted after a checkpoint only runs the rest when restarted."""
+        def interrupt(done, total):
+            raise KeyboardInterrupt
+
+        with self.assertRaises(KeyboardInterrupt):
+            resumable_sweep(self.store, self.data, 'rsi', self.grid, checkpoint=5, progress=interrupt)
+
+        progress = []
+        key, config, ran = resumable_sweep(self.store, self.data, 'rsi', self.grid, checkpoint=5,
+                                           progress=lambda done, total: progress.append((done, total)))
+        self.assertEqual(ran, 7)
+        self.assertEqual(progress, [(10, 12), (12, 12)])
+        self.assertEqual(resumable_sweep(self.store, self.data, 'rsi', self.grid)[2], 0)
+
+        # Reopening the file finds the same results
+        reopened = ResultStore(self.store.path)
+        self.addCleanup(reopened.close)
+        self.assertEqual(len(reopened.completed(key, 'rsi', config)), 12)
+
+    def test_top_matches_ranked_sweep(self):
+        """Test that stored results rank like a fresh sweep, for any metric."""
+        key, config, _ = resumable_sweep(self.store, self.data, 'rsi', self.grid)
+        expected = sweep_strategy(self.data, 'rsi', self.grid, performance=True)
+        for metric in ('return', 'sharpe', 'max_drawdown', 'win_rate'):
+            top = self.store.top(metric, 4, data=key, strategy='rsi', config=config)
+            ranked = rank_results(expected, metric, top=4)
+            np.testing.assert_allclose(top[metric], ranked[metric], err_msg=metric)
+            self.assertEqual(list(top['window']), list(ranked['window']), msg=metric)
+        with self.assertRaises(ValueError):
+            self.store.top('calmar')
+
+    def test_keys_separate_data_and_configuration(self):
+        """Test that other data, fees or execution models are not mistaken for stored results."""
+        resumable_sweep(self.store, self.data, 'rsi', self.grid)
+        self.assertEqual(resumable_sweep(self.store, self.data, 'rsi', self.grid, commission=0.001)[2], 12)
+        self.assertEqual(resumable_sweep(self.store, self.data.iloc[1:], 'rsi', self.grid)[2], 12)
+        self.assertEqual(resumable_sweep(self.store, self.data, 'rsi', self.grid,
+                                         execution=ExecutionModel(max_volume_fraction=0.5))[2], 12)
+        self.assertEqual(len(self.store.top('return', 100, strategy='rsi')), 48)
+        self.assertNotEqual(data_fingerprint(self.data), data_fingerprint(self.data, ('close', 'volume')))
+
+    def test_mixed_int_and_float_parameters_resume(self):
+        """Test that integer values in a grid with float values are matched when resuming."""
+        grid = {'window': [20], 'num_std': [2, 2.5]}
+        self.assertEqual(resumable_sweep(self.store, self.data, 'bollinger', grid)[2], 2)
+        self.assertEqual(resumable_sweep(self.store, self.data, 'bollinger', grid)[2], 0)
+        self.assertEqual(sorted(self.store.top('return', strategy='bollinger')['num_std']), [2, 2.5])
+
+    def test_moving_average_sweep(self):
+        """Test that the crossover grid is stored with the same results as a generic sweep."""
+        grid = {'short_window': [5, 10, 20], 'long_window': [20, 40]}
+        key, config, ran = resumable_sweep(self.store, self.data, 'ma_crossover', grid, checkpoint=2)
+        self.assertEqual(ran, 5)
+        top = self.store.top('final_value', 10, data=key, strategy='ma_crossover', config=config)
+        expected = sweep_strategy(self.data, 'ma_crossover', grid).sort_values('final_value', ascending=False)
+        np.testing.assert_allclose(top['final_value'], expected['final_value'])
+        self.assertEqual(list(top['short_window']), list(expected['short_window']))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import unittest
+import numpy as np
+import pandas as pd
+import sys
+sys.path.append('.')
+from bot.backtester import positions_from_signals, simulate_long_only
+from bot.execution import ExecutionModel
+from bot.performance import performance_metrics
+from bot.robustness import bootstrap_indices, monte_carlo, robustness_summary, simulate_paths
+from bot.strategy import RSIStrategy
+
+class TestRobustness(unittest.TestCase):
+
+    def setUp(self):
+        """Set up a random-walk series."""
+        rng = np.random.default_rng(4)
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, 400)))
+        self.data = pd.DataFrame({'open': close, 'close': close, 'volume': rng.uniform(1, 10, 400)})
+
+    def test_bootstrap_keeps_blocks_of_returns(self):
+        """Test that bootstrapped paths are made of consecutive historical returns."""
+        indices = bootstrap_indices(399, 50, 20, np.random.default_rng(0))
+        self.assertEqual(indices.shape, (399, 50))
+        self.assertTrue(((indices >= 0) & (indices < 399)).all())
+        blocks = indices[:380].reshape(19, 20, 50)
+        self.assertTrue((np.diff(blocks, axis=1) == 1).all())
+
+        close = self.data['close'].to_numpy()
+        paths, volumes = simulate_paths(close, 50, block_size=20, rng=np.random.default_rng(0),
+                                        volume=self.data['volume'].to_numpy())
+        np.testing.assert_array_equal(paths[0], close[0])
+        np.testing.assert_allclose(np.diff(np.log(paths), axis=0), np.diff(np.log(close))[indices])
+        np.testing.assert_array_equal(volumes[1:], self.data['volume'].to_numpy()[1:][indices])
+
+    def test_unperturbed_paths_reproduce_the_backtest(self):
+        """Test that paths without resampling or noise give the historical backtest's metrics."""
+        close = self.data['close'].to_numpy()
+        _, buy, sell = RSIStrategy().entry_exit(close)
+        position = positions_from_signals(buy, sell)
+        _, _, total, _ = simulate_long_only(close, position, 10000, 0.002)
+        expected = performance_metrics(total, 10000, position)
+
+        results = monte_carlo(self.data, RSIStrategy(), n_paths=3, method='noise', batch_size=2)
+        self.assertEqual(len(results), 3)
+        for name in ('total_return', 'max_drawdown', 'sharpe', 'trades'):
+            np.testing.assert_allclose(results[name], expected[name], err_msg=name)
+
+    def test_seeded_and_independent_of_workers(self):
+        """Test that a seed fixes the paths however the batches are run."""
+        first = monte_carlo(self.data, 'ma_crossover', {'short_window': 10, 'long_window': 40},
+                            n_paths=60, noise=0.5, seed=1, batch_size=25)
+        second = monte_carlo(self.data, 'ma_crossover', {'short_window': 10, 'long_window': 40},
+                             n_paths=60, noise=0.5, seed=1, batch_size=25, workers=2)
+        pd.testing.assert_frame_equal(first, second)
+        other = monte_carlo(self.data, 'ma_crossover', {'short_window': 10, 'long_window': 40},
+                            n_paths=60, noise=0.5, seed=2, batch_size=25)
+        self.assertFalse(np.allclose(first['total_return'], other['total_return']))
+
+    def test_summary_and_execution(self):
+        """Test the quantile summary and that volume-capped fills run on resampled volumes."""
+        results = monte_carlo(self.data, 'rsi', n_paths=200, execution=ExecutionModel(max_volume_fraction=0.5))
+        summary = robustness_summary(results, quantiles=(0.05, 0.5, 0.95))
+        self.assertEqual(list(summary.index), ['total_return', 'max_drawdown'])
+        self.assertEqual(list(summary.columns), ['mean', 'std', 'q05', 'q50', 'q95'])
+        self.assertLessEqual(summary.loc['total_return', 'q05'], summary.loc['total_return', 'q95'])
+        self.assertTrue((results['max_drawdown'] >= 0).all())
+        with self.assertRaises(ValueError):
+            monte_carlo(self.data, 'rsi', method='shuffle')
+        with self.assertRaises(ValueError):
+            monte_carlo(self.data.drop(columns='volume'), 'rsi', execution=ExecutionModel(max_volume_fraction=0.5))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import unittest
+import numpy as np
+import pandas as pd
+import sys
+sys.path.append('.')
+from bot.indicator_cache import IndicatorCache
+from bot.search import halving_schedule, successive_halving
+from bot.sweep import sweep_strategy
+
+class TestSuccessiveHalving(unittest.TestCase):
+
+    def setUp(self):
+        """Set up a noisy series with slow up and down swings."""
+        rng = np.random.default_rng(0)
+        bars = np.arange(1500)
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, 1500)) + 0.3 * np.sin(bars / 60))
+        self.data = pd.DataFrame({'close': close})
+
+    def test_schedule(self):
+        """Test that rungs shrink the candidates and grow the prefix by eta."""
+        self.assertEqual(halving_schedule(1500, 90, eta=3, min_bars=100), [(90, 166), (30, 500), (10, 1500)])
+        self.assertEqual(halving_schedule(1500, 2, eta=3), [(2, 1500)])
+        self.assertEqual(halving_schedule(250, 90, eta=3, min_bars=100), [(90, 250)])
+
+    def test_reaches_grid_optimum_within_budget(self):
+        """Test that a quarter of the grid's cost finds the grid's best parameters."""
+        grid = sweep_strategy(self.data, 'ma_crossover')
+        budget = len(grid) / 4
+        trials = successive_halving(self.data, 'ma_crossover', budget=budget, seed=0)
+
+        self.assertLessEqual((trials['bars'] / len(self.data)).sum(), budget)
+        self.assertGreaterEqual(trials['final_value'].iloc[0], 0.99 * grid['final_value'].max())
+        self.assertEqual(trials['bars'].iloc[0], len(self.data))
+
+    def test_prefix_backtests_match_sweeps(self):
+        """Test that each rung's results equal a sweep of the same prefix."""
+        grid = {'window': [10, 20], 'num_std': [1.5, 2.0, 2.5]}
+        cache = IndicatorCache()
+        trials = successive_halving(self.data, 'bollinger', grid, eta=2, min_bars=300, cache=cache)
+        for bars, rows in trials.groupby('bars'):
+            expected = sweep_strategy(self.data.iloc[:bars], 'bollinger', grid).set_index(['window', 'num_std'])
+            for row in rows.itertuples():
+                self.assertAlmostEqual(row.final_value, expected.loc[(row.window, row.num_std), 'final_value'])
+        # The indicators are computed once for all rungs
+        self.assertEqual(cache.misses, 4)
+
+    def test_seeded_and_by_metric(self):
+        """Test that a seed makes the search repeatable and that drawdowns select smallest first."""
+        first = successive_halving(self.data, 'rsi', budget=10, seed=3, metric='max_drawdown')
+        second = successive_halving(self.data, 'rsi', budget=10, seed=3, metric='max_drawdown')
+        pd.testing.assert_frame_equal(first, second)
+
+        finalists = first[first['bars'] == len(self.data)]
+        self.assertTrue(finalists['max_drawdown'].is_monotonic_increasing)
+        self.assertEqual(len(first), len(first.drop_duplicates(['window', 'oversold', 'overbought', 'bars'])))
+        with self.assertRaises(ValueError):
+            successive_halving(self.data, 'rsi', metric='calmar')
+
+if __name__ == '__main__':
+    unittest.main()
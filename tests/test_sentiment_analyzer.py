@@ -0,0 +1,113 @@
+import asyncio
+import shutil
+import tempfile
+import threading
+import unittest
+import pandas as pd
+import sys
+sys.path.append('.')
+from bot.candle_store import CandleStore
+from bot.sentiment_analyzer import SentimentAnalyzer, StubSentimentBackend
+
+class TestSentimentAnalyzer(unittest.TestCase):
+
+    def test_scores_are_cached_within_ttl(self):
+        """Test that repeated requests are served from the cache."""
+        backend = StubSentimentBackend({'ETH/USD': 0.7})
+        analyzer = SentimentAnalyzer(backend=backend, ttl=60)
+
+        self.assertEqual(analyzer.get_sentiment('ETH/USD'), 0.7)
+        self.assertEqual(analyzer.get_sentiment('ETH/USD'), 0.7)
+        self.assertEqual(len(backend.calls), 1)
+
+    def test_expired_scores_are_refreshed(self):
+        """Test that scores older than the TTL are requested again."""
+        backend = StubSentimentBackend()
+        analyzer = SentimentAnalyzer(backend=backend, ttl=0)
+        analyzer.get_sentiment('ETH/USD')
+        analyzer.get_sentiment('ETH/USD')
+        self.assertEqual(len(backend.calls), 2)
+
+    def test_least_recently_used_symbol_is_evicted(self):
+        """Test that the cache keeps at most max_size symbols."""
+        backend = StubSentimentBackend()
+        analyzer = SentimentAnalyzer(backend=backend, max_size=2)
+        analyzer.get_sentiments(['ETH/USD', 'BTC/USD'])
+        analyzer.get_sentiment('ETH/USD')
+        analyzer.get_sentiment('SOL/USD')  # Evicts BTC/USD
+        analyzer.get_sentiments(['ETH/USD', 'BTC/USD'])
+        self.assertEqual(backend.calls, [['ETH/USD', 'BTC/USD'], ['SOL/USD'], ['BTC/USD']])
+
+    def test_batch_scores_misses_in_one_call(self):
+        """Test that a batch request sends all cache misses to the backend at once."""
+        backend = StubSentimentBackend({'BTC/USD': -0.6})
+        analyzer = SentimentAnalyzer(backend=backend)
+        analyzer.get_sentiment('ETH/USD')
+
+        scores = analyzer.get_sentiments(['ETH/USD', 'BTC/USD', 'SOL/USD'])
+
+        self.assertEqual(scores, {'ETH/USD': 0.0, 'BTC/USD': -0.6, 'SOL/USD': 0.0})
+        self.assertEqual(backend.calls[-1], ['BTC/USD', 'SOL/USD'])
+
+    def test_concurrent_requests_are_coalesced(self):
+        """Test that simultaneous requests for one symbol share a backend call."""
+        backend = StubSentimentBackend({'ETH/USD': 0.3}, delay=0.1)
+        analyzer = SentimentAnalyzer(backend=backend)
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(analyzer.get_sentiment('ETH/USD')))
+                   for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(results, [0.3] * 8)
+        self.assertEqual(len(backend.calls), 1)
+
+    def test_symbols_without_scores_are_not_left_in_flight(self):
+        """Test that symbols missing from the backend's result fail instead of blocking later requests."""
+        class ShortBackend(StubSentimentBackend):
+            def score(self, symbols):
+                return super().score(symbols)[:1]
+
+        backend = ShortBackend({'ETH/USD': 0.5})
+        analyzer = SentimentAnalyzer(backend=backend)
+        with self.assertRaises(ValueError):
+            analyzer.get_sentiments(['ETH/USD', 'BTC/USD'])
+
+        self.assertEqual(analyzer.get_sentiment('ETH/USD'), 0.5)
+        backend.score = lambda symbols: [0.1] * len(symbols)
+        self.assertEqual(analyzer.get_sentiment('BTC/USD'), 0.1)
+        self.assertEqual(len(backend.calls), 1)
+
+    def test_async_requests(self):
+        """Test that async callers are coalesced too."""
+        backend = StubSentimentBackend({'ETH/USD': 0.3}, delay=0.05)
+        analyzer = SentimentAnalyzer(backend=backend)
+
+        async def run():
+            return await asyncio.gather(*(analyzer.aget_sentiment('ETH/USD') for _ in range(5)))
+
+        self.assertEqual(asyncio.run(run()), [0.3] * 5)
+        self.assertEqual(len(backend.calls), 1)
+
+    def test_sentiment_series_is_computed_once_and_stored(self):
+        """Test that stored scores are reused and only new timestamps are scored."""
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root)
+        store = CandleStore(root)
+        backend = StubSentimentBackend(series={'ETH/USD': lambda timestamps: timestamps % 7 / 10})
+        analyzer = SentimentAnalyzer(backend=backend)
+        index = pd.date_range('2024-01-01', periods=100, freq='h')
+
+        first = analyzer.get_sentiment_series('ETH/USD', index[:80], store=store)
+        second = analyzer.get_sentiment_series('ETH/USD', index, store=store)
+
+        self.assertEqual(len(first), 80)
+        self.assertEqual(len(second), 100)
+        self.assertEqual(backend.calls, [('ETH/USD', 80), ('ETH/USD', 20)])
+        pd.testing.assert_series_equal(second.iloc[:80], first, check_index_type=False)
+        self.assertIsNotNone(store.load_series('kraken', 'ETH/USD', 'sentiment', 'sentiment'))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,34 @@
+import unittest
+import numpy as np
+import pandas as pd
+import sys
+sys.path.append('.')
+from bot.signals import BUY, HOLD, SELL, decode_signals, encode_signals
+
+class TestSignals(unittest.TestCase):
+
+    def test_encode_labels(self):
+        """Test that string labels map to int8 codes."""
+        codes = encode_signals(['buy', 'hold', 'sell', 'hold'])
+        self.assertEqual(codes.dtype, np.int8)
+        self.assertEqual(list(codes), [BUY, HOLD, SELL, HOLD])
+        np.testing.assert_array_equal(encode_signals(pd.Categorical(['sell', 'buy'])), [SELL, BUY])
+
+    def test_encode_rejects_unknown(self):
+        """Test that unknown labels and out-of-range codes are rejected."""
+        with self.assertRaises(ValueError):
+            encode_signals(['buy', 'strong buy'])
+        with self.assertRaises(ValueError):
+            encode_signals(np.array([0, 3]))
+
+    def test_decode_round_trip(self):
+        """Test that decoding keeps the Series index and name."""
+        codes = pd.Series(np.array([SELL, HOLD, BUY], dtype=np.int8), index=[5, 6, 7], name='signal')
+        labels = decode_signals(codes)
+        self.assertEqual(list(labels), ['sell', 'hold', 'buy'])
+        self.assertEqual(list(labels.index), [5, 6, 7])
+        self.assertEqual(labels.name, 'signal')
+        np.testing.assert_array_equal(encode_signals(labels), codes)
+
+if __name__ == '__main__':
+    unittest.main()
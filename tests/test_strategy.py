@@ -1,10 +1,14 @@
+import tracemalloc
 import unittest
 from unittest.mock import MagicMock
+import numpy as np
 import pandas as pd
 import sys
 # Add the root directory to the Python path
 sys.path.append('.')
-from bot.strategy import MovingAverageCrossoverStrategy
+from bot.indicator_cache import IndicatorCache
+from bot.strategy import STRATEGIES, BollingerBandsStrategy, MovingAverageCrossoverStrategy, create_strategy
+from bot.signals import BUY, HOLD, SELL, decode_signals
 
 class TestMovingAverageCrossoverStrategy(unittest.TestCase):
 
@@ -18,7 +22,7 @@ class TestMovingAverageCrossoverStrategy(unittest.TestCase):
         """Test that signals are generated correctly without sentiment analysis."""
         signals_df = self.base_strategy.generate_signals(self.data)
         expected_signals = ['hold', 'hold', 'buy', 'buy', 'buy', 'buy', 'sell', 'sell', 'sell']
-        pd.testing.assert_series_equal(pd.Series(expected_signals, name='signal'), signals_df['signal'], check_names=False)
+        self.assertEqual(list(decode_signals(signals_df['signal'])), expected_signals)
 
     def test_sentiment_override_buy_to_hold(self):
         """Test that negative sentiment overrides a buy signal."""
@@ -30,7 +34,7 @@ class TestMovingAverageCrossoverStrategy(unittest.TestCase):
 
         # The 'buy' signals should now be 'hold'
         expected_signals = ['hold', 'hold', 'hold', 'hold', 'hold', 'hold', 'sell', 'sell', 'sell']
-        pd.testing.assert_series_equal(pd.Series(expected_signals, name='signal'), signals_df['signal'], check_names=False)
+        self.assertEqual(list(decode_signals(signals_df['signal'])), expected_signals)
 
     def test_sentiment_override_sell_to_hold(self):
         """Test that positive sentiment overrides a sell signal."""
@@ -42,12 +46,92 @@ class TestMovingAverageCrossoverStrategy(unittest.TestCase):
 
         # The 'sell' signals should now be 'hold'
         expected_signals = ['hold', 'hold', 'buy', 'buy', 'buy', 'buy', 'hold', 'hold', 'hold']
-        pd.testing.assert_series_equal(pd.Series(expected_signals, name='signal'), signals_df['signal'], check_names=False)
+        self.assertEqual(list(decode_signals(signals_df['signal'])), expected_signals)
 
     def test_short_window_validation(self):
         """Test that the short window must be less than the long window."""
         with self.assertRaises(ValueError):
             MovingAverageCrossoverStrategy(short_window=10, long_window=5)
 
+    def test_sentiment_series_is_applied_as_of_each_bar(self):
+        """Test that a timestamped sentiment series only overrides bars at or after each score."""
+        data = self.data.set_index(pd.date_range('2024-01-01', periods=9, freq='D', name='timestamp'))
+        sentiment = pd.Series([0.0, -0.8, 0.9], index=pd.to_datetime(['2023-12-30 00:00', '2024-01-04 12:00', '2024-01-07 00:00']))
+
+        strategy = MovingAverageCrossoverStrategy(short_window=2, long_window=5, sentiment=sentiment)
+        signals_df = strategy.generate_signals(data)
+
+        expected_signals = ['hold', 'hold', 'buy', 'buy', 'hold', 'hold', 'hold', 'hold', 'hold']
+        self.assertEqual(list(decode_signals(signals_df['signal'])), expected_signals)
+
+    def test_incremental_update_matches_batch(self):
+        """Test that replaying bars through update reproduces generate_signals exactly."""
+        rng = np.random.default_rng(5)
+        data = pd.DataFrame({'close': 100 * np.exp(np.cumsum(rng.normal(0, 0.02, 1000)))})
+        strategy = MovingAverageCrossoverStrategy(short_window=7, long_window=30)
+
+        batch = strategy.generate_signals(data)
+        replay = strategy.update_many(data['close'][:600]) + strategy.update_many(data['close'][600:])
+        short_mavg, long_mavg, signal = map(list, zip(*replay))
+
+        np.testing.assert_array_equal(short_mavg, batch['short_mavg'])
+        np.testing.assert_array_equal(long_mavg, batch['long_mavg'])
+        self.assertEqual(signal, list(batch['signal']))
+
+    def test_construction_does_not_allocate_the_windows(self):
+        """Test that the streaming buffers only grow with the bars actually seen."""
+        tracemalloc.start()
+        try:
+            strategy = create_strategy('ma_crossover', short_window=10, long_window=20_000_000)
+            strategy.update_many([100.0, 101.0, 102.0])
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        self.assertLess(peak, 2 ** 20)
+        self.assertEqual(strategy.update(103.0)[1], 101.5)
+
+    def test_incremental_sentiment_override(self):
+        """Test that a sentiment score overrides incremental signals like batch ones."""
+        strategy = MovingAverageCrossoverStrategy(short_window=2, long_window=5)
+        signals = [strategy.update(price, sentiment_score=-0.8)[2] for price in self.data['close']]
+        self.assertEqual(signals, [HOLD, HOLD, HOLD, HOLD, HOLD, HOLD, SELL, SELL, SELL])
+
+    def test_signal_column_is_int8(self):
+        """Test that signals are stored as compact int8 codes."""
+        signals_df = self.base_strategy.generate_signals(self.data)
+        self.assertEqual(signals_df['signal'].dtype, np.int8)
+        self.assertEqual(list(signals_df['signal']), [HOLD, HOLD, BUY, BUY, BUY, BUY, SELL, SELL, SELL])
+
+    def test_registry(self):
+        """Test that every registered strategy produces int8 signals and its indicator columns."""
+        self.assertEqual(set(STRATEGIES), {'ma_crossover', 'ema_crossover', 'rsi', 'bollinger'})
+        self.assertIsInstance(create_strategy('ma_crossover', short_window=2, long_window=5), MovingAverageCrossoverStrategy)
+        with self.assertRaises(ValueError):
+            create_strategy('martingale')
+
+        rng = np.random.default_rng(3)
+        data = pd.DataFrame({'close': 100 * np.exp(np.cumsum(rng.normal(0, 0.02, 400)))})
+        for name in STRATEGIES:
+            signals_df = create_strategy(name).generate_signals(data)
+            self.assertEqual(signals_df['signal'].dtype, np.int8)
+            self.assertGreater(len(signals_df.columns), 2)
+            self.assertTrue(signals_df['signal'].isin([BUY, HOLD, SELL]).all())
+
+    def test_shared_indicator_cache(self):
+        """Test that strategies sharing a cache compute a common indicator only once."""
+        cache = IndicatorCache()
+        crossover = MovingAverageCrossoverStrategy(short_window=2, long_window=5, indicator_cache=cache)
+        bollinger = BollingerBandsStrategy(window=5, indicator_cache=cache)
+
+        uncached = MovingAverageCrossoverStrategy(short_window=2, long_window=5).generate_signals(self.data)
+        signals_df = crossover.generate_signals(self.data)
+        pd.testing.assert_frame_equal(signals_df, uncached)
+        self.assertEqual((cache.hits, cache.misses), (0, 2))
+
+        bollinger.generate_signals(self.data)  # SMA(5) is reused, only the deviation is new
+        self.assertEqual((cache.hits, cache.misses), (1, 3))
+        crossover.generate_signals(self.data.copy())
+        self.assertEqual((cache.hits, cache.misses), (3, 3))
+
 if __name__ == '__main__':
     unittest.main()
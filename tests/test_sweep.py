@@ -0,0 +1,106 @@
+import unittest
+import numpy as np
+import pandas as pd
+import sys
+sys.path.append('.')
+from bot.backtester import Backtester
+from bot.strategy import MovingAverageCrossoverStrategy
+from bot.indicator_cache import IndicatorCache
+from bot.strategy import create_strategy
+from bot.parallel import SharedArrays
+from bot import sweep
+from bot.sweep import parallel_sweep, parameter_grid, sweep_ma_crossover, sweep_strategy
+
+class TestSweep(unittest.TestCase):
+
+    def setUp(self):
+        """Set up a random-walk price series."""
+        rng = np.random.default_rng(3)
+        self.data = pd.DataFrame({'close': 100 * np.exp(np.cumsum(rng.normal(0, 0.02, 400)))})
+
+    def test_parameter_grid_skips_invalid_pairs(self):
+        """Test that only pairs with short < long are kept, in product order."""
+        self.assertEqual(parameter_grid([5, 10, 20], [10, 20]), [(5, 10), (5, 20), (10, 20)])
+
+    def test_sweep_matches_individual_backtests(self):
+        """Test that the batch sweep reproduces one Backtester run per pair."""
+        results = sweep_ma_crossover(self.data, [5, 10, 20], [10, 30, 60], initial_cash=1000,
+                                     commission=0.002, chunk_size=2)
+        self.assertEqual(len(results), 7)
+
+        for row in results.itertuples():
+            strategy = MovingAverageCrossoverStrategy(short_window=row.short_window, long_window=row.long_window)
+            backtester = Backtester(strategy, self.data, initial_cash=1000, commission=0.002, engine='loop')
+            portfolio = backtester.run()
+            self.assertAlmostEqual(row.final_value, portfolio['total'].iloc[-1], places=8)
+            self.assertEqual(row.trades, portfolio['trades'].sum())
+
+    def test_missing_closes_keep_results_finite(self):
+        """Test that gaps in the closes neither drop pairs from the ranking nor diverge from backtests."""
+        data = self.data.copy()
+        data.iloc[[50, 51, 200]] = np.nan
+        results = sweep_ma_crossover(data, [5, 10], [20, 40], initial_cash=1000, commission=0.002,
+                                     performance=True)
+        self.assertTrue(np.isfinite(results['final_value']).all())
+
+        for row in results.itertuples():
+            strategy = MovingAverageCrossoverStrategy(short_window=row.short_window, long_window=row.long_window)
+            portfolio = Backtester(strategy, data, initial_cash=1000, commission=0.002, engine='loop').run()
+            self.assertAlmostEqual(row.final_value, portfolio['total'].iloc[-1], places=8)
+            self.assertEqual(row.trades, portfolio['trades'].sum())
+
+    def test_parallel_sweep_matches_serial_sweep(self):
+        """Test that the process-pool sweep returns the serial results in grid order."""
+        short_windows, long_windows = range(5, 40, 3), range(10, 120, 7)
+        serial = sweep_ma_crossover(self.data, short_windows, long_windows)
+
+        progress = []
+        parallel = parallel_sweep(self.data, short_windows, long_windows, workers=2, chunk_size=4,
+                                  progress=lambda done, total: progress.append((done, total)))
+
+        pd.testing.assert_frame_equal(parallel, serial)
+        self.assertEqual(progress[-1], (len(serial), len(serial)))
+
+    def test_worker_mean_cache_is_bounded(self):
+        """Test that a sweep worker keeps at most `cache_bytes` of rolling means."""
+        short_windows, long_windows = range(5, 40, 3), range(10, 120, 7)
+        pairs = parameter_grid(short_windows, long_windows)
+        serial = sweep_ma_crossover(self.data, short_windows, long_windows)
+        limit = 5 * 400 * 8  # five windows
+        with SharedArrays(close=self.data['close'].to_numpy()) as shared:
+            sweep._init_sweep_worker(shared.spec, limit)
+            try:
+                results = pd.concat([sweep._sweep_task(pairs[start:start + 10], 10000, 0.002, 4)
+                                     for start in range(0, len(pairs), 10)], ignore_index=True)
+                self.assertLessEqual(sweep._worker['means'].nbytes, limit)
+            finally:
+                for block in sweep._worker.pop('blocks'):
+                    block.close()
+                sweep._worker.clear()
+        pd.testing.assert_frame_equal(results, serial)
+
+        parallel = parallel_sweep(self.data, short_windows, long_windows, workers=2, chunk_size=4,
+                                  cache_bytes=limit)
+        pd.testing.assert_frame_equal(parallel, serial)
+
+    def test_sweep_strategy_matches_backtests(self):
+        """Test that a generic strategy sweep reproduces Backtester runs and shares indicators."""
+        cache = IndicatorCache()
+        grid = {'window': [10, 20], 'num_std': [1.0, 2.0]}
+        results = sweep_strategy(self.data, 'bollinger', grid, initial_cash=1000, commission=0.002, cache=cache)
+        self.assertEqual(list(results.columns), ['window', 'num_std', 'final_value', 'return', 'trades'])
+        self.assertEqual(len(results), 4)
+        self.assertEqual(cache.misses, 4)  # SMA and deviation per window
+
+        for row in results.itertuples():
+            strategy = create_strategy('bollinger', window=row.window, num_std=row.num_std)
+            portfolio = Backtester(strategy, self.data, initial_cash=1000, commission=0.002).run()
+            self.assertAlmostEqual(row.final_value, portfolio['total'].iloc[-1], places=8)
+            self.assertEqual(row.trades, portfolio['trades'].sum())
+
+        ma = sweep_strategy(self.data, 'ma_crossover', {'short_window': [5, 10, 20], 'long_window': [10, 30]})
+        expected = sweep_ma_crossover(self.data, [5, 10, 20], [10, 30])
+        np.testing.assert_allclose(ma['final_value'], expected['final_value'], rtol=1e-12)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,43 @@
+import unittest
+import numpy as np
+import pandas as pd
+import sys
+sys.path.append('.')
+from bot.sweep import sweep_ma_crossover
+from bot.walk_forward import walk_forward_optimize, walk_forward_splits
+
+class TestWalkForward(unittest.TestCase):
+
+    def setUp(self):
+        """Set up a random-walk price series."""
+        rng = np.random.default_rng(21)
+        index = pd.date_range('2022-01-01', periods=600, freq='D', name='timestamp')
+        self.data = pd.DataFrame({'close': 100 * np.exp(np.cumsum(rng.normal(0, 0.02, 600)))}, index=index)
+
+    def test_splits_roll_forward(self):
+        """Test that the test windows follow their training windows and tile the series."""
+        self.assertEqual(walk_forward_splits(100, 40, 20), [(0, 40, 60), (20, 60, 80), (40, 80, 100)])
+        self.assertEqual(walk_forward_splits(100, 40, 20, step=30), [(0, 40, 60), (30, 70, 90)])
+
+    def test_folds_pick_in_sample_best_and_stitch_equity(self):
+        """Test that each fold uses its training optimum and the equity curve is chained."""
+        folds, equity = walk_forward_optimize(self.data, [5, 10, 20], [30, 50], train_size=300, test_size=100,
+                                              initial_cash=1000)
+
+        self.assertEqual(len(folds), 3)
+        self.assertEqual(len(equity), 300)
+        train = self.data.iloc[:300]
+        best = sweep_ma_crossover(train, [5, 10, 20], [30, 50], initial_cash=1000).sort_values('return').iloc[-1]
+        self.assertEqual((folds['short_window'][0], folds['long_window'][0]),
+                         (best['short_window'], best['long_window']))
+        self.assertAlmostEqual(equity.iloc[-1] / 1000, np.prod(1 + folds['test_return']))
+
+    def test_parallel_folds_match_serial(self):
+        """Test that running the folds in worker processes gives the same table."""
+        serial, serial_equity = walk_forward_optimize(self.data, [5, 10], [30, 50], 300, 100)
+        parallel, parallel_equity = walk_forward_optimize(self.data, [5, 10], [30, 50], 300, 100, workers=2)
+        pd.testing.assert_frame_equal(serial, parallel)
+        pd.testing.assert_series_equal(serial_equity, parallel_equity)
+
+if __name__ == '__main__':
+    unittest.main()